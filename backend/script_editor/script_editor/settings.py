@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -71,6 +73,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    "scripts.telemetry.telemetry_middleware",  # 요청별 span, 단계별 지연 시간 지표 (/api/metrics/)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -116,6 +119,22 @@ DATABASES = {
     }
 }
 
+# 서버 시작 시 문제은행 FAISS 인덱스와 임베딩 모델을 미리 로드할지 여부
+# (wsgi.py / asgi.py에서 사용, manage.py 명령 실행 시에는 로드하지 않음)
+QUESTION_INDEX_PRELOAD = True
+
+# QuestionMeta 저장/삭제 시 문제은행 FAISS 인덱스(벡터)에 자동 반영할지 여부 (scripts/signals.py)
+# 꺼도 변경은 저널에 기록되어 키워드(BM25) 검색에는 반영됨
+QUESTION_INDEX_AUTO_UPDATE = True
+
+# 문제 생성 작업 (scripts/question_jobs.py, run_question_workers 명령)
+QUESTION_GENERATOR_DIR = BASE_DIR.parent.parent / "question-generator"  # job_runner.py 위치
+# question-generator 의존성(langchain, openai>=1)이 설치된 파이썬 (기본값: 현재 파이썬)
+QUESTION_GENERATOR_PYTHON = os.getenv("QUESTION_GENERATOR_PYTHON", sys.executable)
+QUESTION_JOB_MAX_ATTEMPTS = 3  # 실패/워커 중단 시 다시 시도할 최대 횟수
+QUESTION_JOB_HEARTBEAT_TIMEOUT = 300  # 이 시간(초) 동안 heartbeat가 없으면 워커가 죽은 것으로 보고 다시 대기열에 넣음
+QUESTION_JOB_TIMEOUT = 600  # 작업 하나가 이 시간(초)을 넘기면 job_runner를 종료하고 실패(재시도)로 처리
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'script_editor.settings')
 
 application = get_wsgi_application()
+
+# 문제은행 FAISS 인덱스를 서버 시작 시 한 번만 로드 (gunicorn --preload 사용 시 워커 fork 전에 로드됨)
+from django.conf import settings
+
+if settings.QUESTION_INDEX_PRELOAD:
+    from scripts.search_question_index import registry
+
+    registry.warm_up()
@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class ScriptsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scripts'
+
+    def ready(self):
+        # QuestionMeta 저장/삭제 시 문제은행 인덱스를 갱신하는 시그널 등록
+        from . import signals  # noqa: F401
+
+        # 모든 DB 연결의 쿼리를 db.query span으로 기록하고, 설정되어 있으면 span을 OTLP로 내보냄
+        from django.db.backends.signals import connection_created
+
+        from .telemetry import configure_tracing, trace_query
+
+        def install_query_tracing(sender, connection, **kwargs):
+            if trace_query not in connection.execute_wrappers:
+                connection.execute_wrappers.append(trace_query)
+
+        connection_created.connect(install_query_tracing, weak=False)
+        configure_tracing("script-editor")
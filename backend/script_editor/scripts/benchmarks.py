@@ -0,0 +1,201 @@
+"""
+    문제은행 검색, 인덱스 빌드, 적재 오프라인 벤치마크 (manage.py benchmark).
+
+    네트워크와 실제 모델 없이 결정적인 가짜 임베딩(같은 문장 → 같은 벡터, 호출당 지연 latency초)으로
+    다음을 측정합니다.
+    - write_faiss_index: 문제은행 FAISS 인덱스 빌드
+    - search_faiss_index / search_faiss_index_batch: 문제은행 검색 (질문별 / 한 번에)
+    - add_json_data_to_faiss_index: 문법 오류 인덱스에 추가
+    - save_metadata_to_db: CSV → QuestionMeta 적재 (트랜잭션을 되돌리므로 DB는 바뀌지 않음)
+
+    인덱스, 임베딩 캐시, CSV는 모두 임시 디렉터리에서 만들고 끝나면 지웁니다.
+    측정과 기준값 비교는 question-generator/benchmarking.py를 함께 사용합니다.
+"""
+
+import contextlib
+import csv
+import hashlib
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+import openai
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from scripts import embedding_cache, faiss_index, search_question_index
+from scripts.index_factory import create_faiss_index
+from scripts.question_generator_modules import load_module
+
+benchmarking = load_module("benchmarking")
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+
+# 가짜 문장 인코더의 차원 (all-MiniLM-L6-v2와 같음)
+question_dimension = 384
+
+
+def fake_vector(text, dimension):
+    """text의 해시로 만든 단위 벡터"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeSentenceEncoder:
+    """SentenceTransformer 대신 쓰는 인코더. encode 호출마다 question_embedding 호출로 셉니다."""
+
+    def __init__(self, counter, latency=0.0, dimension=question_dimension):
+        self.counter = counter
+        self.latency = latency
+        self.dimension = dimension
+
+    def encode(self, texts):
+        self.counter.count("question_embedding")
+        if self.latency:
+            time.sleep(self.latency)
+        return np.stack([fake_vector(text, self.dimension) for text in texts])
+
+
+class FakeEmbeddingAPI:
+    """openai.Embedding.create 대신 쓰는 함수. 요청마다 grammar_embedding 호출로 셉니다."""
+
+    def __init__(self, counter, latency=0.0):
+        self.counter = counter
+        self.latency = latency
+
+    def __call__(self, input, model, **kwargs):
+        self.counter.count("grammar_embedding")
+        if self.latency:
+            time.sleep(self.latency)
+        return {
+            "data": [
+                {"index": i, "embedding": fake_vector(text, faiss_index.dimension).tolist()}
+                for i, text in enumerate(input)
+            ]
+        }
+
+
+def write_question_csv(path, rows):
+    """실제 수능 CSV를 rows행이 될 때까지 반복하여 씁니다 (반복된 행은 id와 본문을 바꿈)."""
+    with open(search_question_index.csv_path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        source = [row for row in reader if len(row) >= len(header)]
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i, row in zip(range(rows), itertools.cycle(source)):
+            row = list(row)
+            if i >= len(source):
+                row[2] = f"{row[2]} ({i})"
+            row[0] = str(i)
+            writer.writerow(row)
+
+
+def grammar_entries(count):
+    return [
+        {"incorrect": f"{entry['incorrect']}({i})", "corrected": entry["corrected"]}
+        for i, entry in zip(range(count), itertools.cycle(faiss_index.json_data))
+    ]
+
+
+@contextlib.contextmanager
+def offline_environment(workdir, counter, latency=0.0, rows=100):
+    """인덱스 경로, 레지스트리, 임베딩 캐시, 임베딩 모델을 workdir 안의 가짜로 바꿉니다."""
+    csv_path = os.path.join(workdir, "suneung_data.CSV")
+    index_path = os.path.join(workdir, "faiss_index.index")
+    ids_path = os.path.join(workdir, "ids.json")
+    write_question_csv(csv_path, rows)
+
+    registry = search_question_index.QuestionIndexRegistry(index_path=index_path, ids_path=ids_path)
+    registry._model = FakeSentenceEncoder(counter, latency)
+
+    with contextlib.ExitStack() as stack:
+        for name, value in [
+            ("csv_path", csv_path),
+            ("faiss_index_path", index_path),
+            ("ids_path", ids_path),
+            ("registry", registry),
+        ]:
+            stack.enter_context(mock.patch.object(search_question_index, name, value))
+        stack.enter_context(
+            mock.patch.object(
+                embedding_cache,
+                "_default_cache",
+                embedding_cache.EmbeddingCache(cache_dir=os.path.join(workdir, "embedding_cache")),
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(openai.Embedding, "create", FakeEmbeddingAPI(counter, latency))
+        )
+        stack.enter_context(mock.patch.object(faiss_index, "metadata", []))
+        stack.enter_context(mock.patch.object(faiss_index, "index", None))
+        yield csv_path
+
+
+def run_benchmarks(rows=100, queries=20, grammar_rows=300, latency=0.0, repeat=1):
+    """모든 벤치마크를 실행하고 {이름: 결과} dict를 반환합니다."""
+    counter = benchmarking.CallCounter()
+    measure = benchmarking.measure
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    results = {}
+    try:
+        with offline_environment(workdir, counter, latency, rows) as csv_path:
+            results["write_faiss_index"] = measure(
+                search_question_index.write_faiss_index, rows, counter, repeat
+            )
+
+            with open(csv_path, encoding="utf-8", newline="") as f:
+                passages = [row["question"] for row in csv.DictReader(f)]
+            query_texts = [passage[:120] for passage in passages[:queries]]
+
+            def search_one_by_one():
+                for query in query_texts:
+                    search_question_index.search_faiss_index(query)
+
+            results["search_faiss_index"] = measure(
+                search_one_by_one, len(query_texts), counter, repeat
+            )
+            # 같은 질문이 캐시에 남지 않도록 다른 질문으로 측정
+            batch_texts = [f"{query} ?" for query in query_texts]
+            results["search_faiss_index_batch"] = measure(
+                lambda: search_question_index.search_faiss_index_batch(batch_texts, k=5),
+                len(batch_texts),
+                counter,
+                repeat,
+            )
+
+            entries = grammar_entries(grammar_rows)
+
+            def add_grammar_data():
+                faiss_index.index = create_faiss_index(
+                    faiss_index.dimension, faiss_index.index_factory_string
+                )
+                faiss_index.metadata.clear()
+                faiss_index.add_json_data_to_faiss_index(entries)
+
+            results["add_json_data_to_faiss_index"] = measure(
+                add_grammar_data, len(entries), counter, repeat
+            )
+
+            from scripts.save_q_metadata import save_metadata_to_db
+
+            def save_metadata():
+                with transaction.atomic(), CaptureQueriesContext(connection) as queries_run:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        stats = save_metadata_to_db(csv_path)
+                    counter.count("db_queries", len(queries_run))
+                    transaction.set_rollback(True)  # 벤치마크가 DB를 바꾸지 않도록 되돌림
+                return {"created": stats["created"], "updated": stats["updated"]}
+
+            results["save_metadata_to_db"] = measure(save_metadata, rows, counter, repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
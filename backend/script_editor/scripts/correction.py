@@ -0,0 +1,245 @@
+"""
+    발표 대본 문법 교정 파이프라인 (비동기).
+
+    1. 입력받은 글을 문장 단위로 파싱
+    2. 문장 안에서 문법적으로 틀린 부분 찾기 (LLM)
+    3. 문법 오류 FAISS 인덱스(faiss_index.py)에서 유사한 오류와 수정본 검색
+    4. 검색된 수정 제안을 참고하여 LLM으로 문장 수정
+
+    모든 문장을 동시에 처리하되, 동시에 처리하는 문장 수는 CORRECTION_CONCURRENCY로 제한합니다.
+    전체 지연 시간은 문장 수의 합이 아니라 가장 느린 문장에 가까워집니다.
+
+    문장은 정규화한 원문의 해시(sentence_hash)로 구분하며, 이전에 교정한 결과(reuse)가 있는
+    문장과 같은 대본 안에서 반복되는 문장은 LLM에 다시 보내지 않습니다.
+
+    단계마다 span을 남깁니다 (scripts/telemetry.py): correction.sentence 아래에
+    correction.identify_errors(2), correction.search(3, 임베딩/FAISS 검색 포함), correction.rewrite(4)와
+    각 단계의 LLM 호출(<단계>.llm, 모델 이름과 토큰 수 포함)
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+
+import faiss
+import numpy as np
+import openai
+
+from scripts.embedding_cache import normalize_text
+from scripts.faiss_index import create_embeddings, faiss_index_path, metadata_path
+from scripts.index_factory import set_search_params
+from scripts.llm_scheduler import get_scheduler
+from scripts.metadata_store import MetadataStore
+from scripts.telemetry import current_span, record_llm_call, span, traced
+
+correction_model = os.getenv("CORRECTION_MODEL", "gpt-3.5-turbo")
+correction_concurrency = int(os.getenv("CORRECTION_CONCURRENCY", "8"))  # 동시에 교정할 문장 수
+correction_search_k = int(os.getenv("CORRECTION_SEARCH_K", "5"))  # 오류당 검색할 수정 예시 수
+
+
+class GrammarIndex:
+    """문법 오류 FAISS 인덱스와 메타데이터 저장소를 프로세스당 한 번만 로드합니다."""
+
+    def __init__(self, index_path=faiss_index_path, metadata_path=metadata_path):
+        self.index_path = index_path
+        self.metadata = MetadataStore(metadata_path)
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    index = faiss.read_index(self.index_path)
+                    set_search_params(index)  # nprobe / efSearch (FAISS_NPROBE, FAISS_EF_SEARCH)
+                    self._index = index
+        return self._index
+
+    def search(self, vectors, k=correction_search_k):
+        """오류 임베딩별로 가장 유사한 오류의 메타데이터 [{"incorrect", "corrected", "tag"?}, ...]를 반환"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with span(
+            "faiss.search",
+            **{"faiss.index": "grammar", "faiss.queries": len(vectors), "faiss.k": k},
+        ):
+            _, indices = self.index.search(vectors, k)
+            return [[item for item in self.metadata.get_many(row) if item] for row in indices]
+
+
+grammar_index = GrammarIndex()
+
+
+# 1. 입력받은 글을 문장 단위로 파싱
+def parse_text_into_sentences(text):
+    """전체 텍스트를 문장 단위로 파싱합니다."""
+    # 문장 분할을 위한 정규 표현식 사용
+    return [sentence for sentence in re.split(r"(?<=[.!?]) +", text.strip()) if sentence]
+
+
+def sentence_hash(sentence):
+    """공백/유니코드 정규화 후의 문장 sha256 (공백만 바뀐 문장은 같은 문장으로 봄)"""
+    return hashlib.sha256(normalize_text(sentence).encode("utf-8")).hexdigest()
+
+
+async def create_chat_completion(**kwargs):
+    """
+    RPM/TPM 한도 안의 차례(llm_scheduler)를 기다린 뒤 ChatCompletion을 호출합니다.
+    호출 하나를 <바깥 단계>.llm span(모델 이름, 토큰 수)으로, 차례를 기다린 시간은 llm_scheduler.wait로 기록합니다.
+    """
+    outer = current_span()
+    stage = f"{outer.stage}.llm" if outer is not None else "llm"
+    with span("openai.chat_completion", stage=stage) as current:
+        with span("llm_scheduler.wait"):
+            await get_scheduler().aacquire(
+                kwargs["model"], messages=kwargs["messages"], max_tokens=kwargs.get("max_tokens")
+            )
+        response = await openai.ChatCompletion.acreate(**kwargs)
+        usage = response.get("usage") or {}
+        current.set_attribute("gen_ai.response.model", response.get("model"))
+        record_llm_call(
+            current, kwargs["model"], usage.get("prompt_tokens"), usage.get("completion_tokens")
+        )
+    return response
+
+
+# 2. 문장 안에서 문법적으로 틀린 부분 찾기
+@traced("correction.identify_errors")
+async def identify_grammatical_errors(sentence):
+    """문장 내에서 문법적으로 틀린 부분을 식별합니다."""
+    response = await create_chat_completion(
+        model=correction_model,
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant."},
+            {
+                "role": "user",
+                "content": f"문장에서 문법적으로 틀린 부분을 찾아주세요:\n\n{sentence}",
+            },
+        ],
+        max_tokens=100,
+        temperature=0.5,
+    )
+    errors = response.choices[0].message["content"].strip().split("\n")
+    return [error for error in errors if error.strip()]
+
+
+# 3. FAISS 인덱스를 사용하여 유사한 오류와 수정본 검색
+@traced("correction.search")
+async def search_faiss_for_corrections(errors):
+    """
+    발견된 오류에 대해 FAISS에서 유사한 오류와 수정할 내용을 검색합니다.
+    한 문장의 오류들은 한 번의 임베딩 요청(캐시 사용)과 한 번의 검색으로 처리합니다.
+    """
+    if not errors:
+        return []
+    # 임베딩 요청과 FAISS 검색은 블로킹 호출이므로 스레드에서 실행
+    vectors = await asyncio.to_thread(create_embeddings, errors)
+    return await asyncio.to_thread(grammar_index.search, vectors)
+
+
+# 4. LLM을 사용하여 문장 수정
+@traced("correction.rewrite")
+async def correct_sentence_with_llm(sentence, errors, corrections):
+    """LLM을 사용하여 문장과 검색된 수정 사항을 기반으로 문장을 수정합니다."""
+    prompt = f'문장: "{sentence}"\n\n발견된 문법 오류와 수정 제안:\n'
+    for i, (error, matches) in enumerate(zip(errors, corrections), start=1):
+        suggestion = matches[0]["corrected"] if matches else ""
+        prompt += f'{i}. 오류: "{error}" -> 수정: "{suggestion}"\n'
+
+    prompt += (
+        "\n위 제안을 참고하여 문장을 수정해주세요. 수정된 문장만 간단하게 반환하세요."
+    )
+
+    response = await create_chat_completion(
+        model=correction_model,
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=100,
+    )
+    return response.choices[0].message["content"].strip().replace('"', "")
+
+
+async def correct_sentence(index, sentence, semaphore):
+    """한 문장에 대해 2~4단계를 수행하고 결과 dict를 반환합니다."""
+    async with semaphore:
+        # 세마포어를 기다린 시간은 빼고 실제 교정 시간만 기록
+        with span("correction.sentence") as current:
+            errors = await identify_grammatical_errors(sentence)
+            corrections = await search_faiss_for_corrections(errors)
+            corrected = await correct_sentence_with_llm(sentence, errors, corrections)
+            current.set_attribute("correction.errors", len(errors))
+
+    tags = sorted({match["tag"] for matches in corrections for match in matches if match.get("tag")})
+    return {"index": index, "original": sentence, "corrected": corrected, "tags": tags}
+
+
+# 5. 전체 텍스트의 모든 문장을 수정
+async def iter_corrections(text, concurrency=None, reuse=None):
+    """
+    입력된 전체 텍스트를 문장 단위로 동시에 수정하면서, 문장이 끝나는 순서대로 결과 dict
+    {"index", "original", "corrected", "tags", "sentence_hash", "reused"}를 내보냅니다.
+    세마포어는 요청마다 만들어 한 요청이 동시에 보내는 문장 수를 제한합니다.
+
+    reuse: {sentence_hash: {"corrected": ..., "tags": [...]}} 이전 교정 결과.
+    여기에 있는 문장은 다시 교정하지 않고 가장 먼저 내보냅니다 ("reused": True).
+    """
+    semaphore = asyncio.Semaphore(concurrency or correction_concurrency)
+    reuse = reuse or {}
+    sentences = parse_text_into_sentences(text)
+    hashes = [sentence_hash(sentence) for sentence in sentences]
+
+    # 해시 → 문장 위치 목록 (대본 안에서 반복되는 문장은 한 번만 교정)
+    positions = {}
+    for i, digest in enumerate(hashes):
+        positions.setdefault(digest, []).append(i)
+
+    def results_for(digest, source):
+        return [
+            {
+                "index": i,
+                "original": sentences[i],
+                "corrected": source["corrected"],
+                "tags": list(source["tags"]),
+                "sentence_hash": digest,
+                "reused": digest in reuse,
+            }
+            for i in positions[digest]
+        ]
+
+    for digest in positions:
+        if digest in reuse:
+            for result in results_for(digest, reuse[digest]):
+                yield result
+
+    tasks = [
+        asyncio.ensure_future(correct_sentence(indices[0], sentences[indices[0]], semaphore))
+        for digest, indices in positions.items()
+        if digest not in reuse
+    ]
+    try:
+        for future in asyncio.as_completed(tasks):
+            corrected = await future
+            for result in results_for(hashes[corrected["index"]], corrected):
+                yield result
+    finally:
+        # 스트리밍 중 클라이언트 연결이 끊기면 남은 LLM 요청을 취소
+        for task in tasks:
+            task.cancel()
+
+
+async def correct_text(text, concurrency=None, reuse=None):
+    """iter_corrections()의 결과를 모두 모아 문장 순서대로 반환합니다."""
+    results = [result async for result in iter_corrections(text, concurrency, reuse)]
+    return sorted(results, key=lambda result: result["index"])
+
+
+# 6. 최종 수정된 텍스트를 반환
+async def process_user_text(text):
+    """전체 텍스트를 받아 수정된 텍스트를 반환합니다."""
+    results = await correct_text(text)
+    # 모든 수정된 문장을 하나의 문자열로 결합
+    return " ".join(result["corrected"] for result in results)
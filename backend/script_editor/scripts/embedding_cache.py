@@ -0,0 +1,307 @@
+"""
+    모든 인덱스 빌더와 검색기가 공유하는 디스크 임베딩 캐시.
+
+    - 키: sha256(모델 이름 + 정규화된 텍스트)
+    - 벡터: 모델별 float32 행렬 파일(np.memmap)에 한 행씩 저장
+    - 키 → 행 번호 매핑과 마지막 사용 시각: SQLite (index.sqlite3)
+    - 모델별 행렬 크기가 EMBEDDING_CACHE_MAX_MB를 넘으면 가장 오래 사용하지 않은 행부터 재사용 (LRU)
+    - 행마다 벡터의 체크섬을 함께 저장하고, 읽은 벡터가 체크섬과 다르면(다른 프로세스가 그 행을 비우고
+      새 벡터를 쓰는 중) 캐시에 없는 것으로 처리하므로 다른 텍스트의 벡터를 돌려주지 않음
+    - 캐시 적중 시각은 메모리에 모아 두었다가 EMBEDDING_CACHE_TOUCH_INTERVAL초마다(또는 새 벡터를 저장할 때)
+      한 번에 기록하므로, 검색 경로의 조회는 SQLite 쓰기 잠금을 잡지 않음 (LRU 순서는 그만큼 근사치)
+    - 조회마다 embedding span(캐시 적중/실패 수 포함)을 남기고 cache_lookups_total{cache="embedding"}에 더함
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from scripts.telemetry import count_cache_lookups, span
+
+cache_dir = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "modules", "embedding_cache"),
+)
+max_megabytes = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512"))  # 모델별 최대 크기
+touch_interval = float(os.getenv("EMBEDDING_CACHE_TOUCH_INTERVAL", "60"))  # 사용 시각 기록 주기(초)
+
+# SQLite 한 쿼리에 넣을 최대 파라미터 수
+query_chunk_size = 500
+
+
+def normalize_text(text):
+    """유니코드 정규화(NFC) 후 앞뒤 공백을 제거하고 연속된 공백을 하나로 합칩니다."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(model, text):
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def vector_checksum(vector):
+    return hashlib.blake2b(np.ascontiguousarray(vector, dtype=np.float32).tobytes(), digest_size=8).digest()
+
+
+def chunked(items, size=query_chunk_size):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class EmbeddingCache:
+    """
+    (모델 이름, 텍스트) → 임베딩 벡터 캐시.
+    get_or_compute()는 캐시에 없는 텍스트만 compute 함수로 임베딩하고 저장합니다.
+    """
+
+    def __init__(self, cache_dir=cache_dir, max_megabytes=max_megabytes, touch_interval=touch_interval):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_megabytes * 1024 * 1024)
+        self.touch_interval = touch_interval
+        self._lock = threading.RLock()
+        self._conn = None
+        self._matrices = {}  # 모델 이름 → np.memmap
+        self._touched = {}  # 아직 기록하지 않은 캐시 적중: 키 → 마지막 사용 시각
+        self._touched_at = time.monotonic()  # 마지막으로 사용 시각을 기록한 때
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(
+                os.path.join(self.cache_dir, "index.sqlite3"),
+                timeout=30,
+                isolation_level=None,  # 트랜잭션은 직접 BEGIN / COMMIT
+                check_same_thread=False,  # 접근은 self._lock으로 직렬화
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if columns and "checksum" not in columns:
+                # 체크섬이 없는 이전 형식의 캐시는 비우고 다시 채움 (행렬 파일은 덮어써서 재사용)
+                conn.executescript("DROP TABLE entries; DELETE FROM models;")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS models (
+                    model TEXT PRIMARY KEY,
+                    dimension INTEGER NOT NULL,
+                    next_slot INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    slot INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    checksum BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_lru ON entries (model, last_used);
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _matrix_path(self, model):
+        name = hashlib.sha1(model.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{name}.f32")
+
+    def _matrix(self, model, dimension, rows):
+        """최소 rows개의 행을 담는 모델별 memmap 행렬을 반환합니다 (필요하면 파일을 늘림)."""
+        matrix = self._matrices.get(model)
+        if matrix is not None and matrix.shape[0] >= rows:
+            return matrix
+
+        path = self._matrix_path(model)
+        row_bytes = dimension * 4
+        file_rows = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if file_rows < rows:
+            # 자주 늘리지 않도록 두 배씩 키우되 크기 상한은 넘지 않음
+            limit = max(rows, self.max_bytes // row_bytes)
+            file_rows = min(limit, max(rows, file_rows * 2, 1024))
+            with open(path, "ab") as f:
+                f.truncate(file_rows * row_bytes)
+
+        matrix = np.memmap(path, dtype=np.float32, mode="r+", shape=(file_rows, dimension))
+        self._matrices[model] = matrix
+        return matrix
+
+    def _lookup(self, conn, keys):
+        """키 → (행 번호, 벡터 체크섬)"""
+        found = {}
+        for chunk in chunked(keys):
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, slot, checksum FROM entries WHERE key IN ({placeholders})", chunk
+            )
+            found.update((key, (slot, checksum)) for key, slot, checksum in rows)
+        return found
+
+    def _dimension(self, conn, model):
+        row = conn.execute("SELECT dimension FROM models WHERE model = ?", (model,)).fetchone()
+        return row[0] if row else None
+
+    def _read(self, conn, model, keys):
+        """캐시에 있는 키의 벡터를 읽습니다. 마지막 사용 시각은 메모리에 모아 두고 주기적으로 기록합니다."""
+        found = self._lookup(conn, keys)
+        if not found:
+            return {}
+
+        dimension = self._dimension(conn, model)
+        slots = np.fromiter((slot for slot, _ in found.values()), dtype=np.int64)
+        matrix = self._matrix(model, dimension, int(slots.max()) + 1)
+        vectors = np.array(matrix[slots])  # memmap에서 복사
+
+        # 조회와 복사 사이에 다른 프로세스가 그 행을 비우고 다른 벡터를 쓰고 있을 수 있으므로
+        # 복사한 벡터가 조회한 체크섬과 같을 때만 적중으로 봄 (다르면 다시 계산)
+        result = {
+            key: vector
+            for (key, (_, checksum)), vector in zip(found.items(), vectors)
+            if vector_checksum(vector) == checksum
+        }
+        self._touched.update(dict.fromkeys(result, time.time()))
+        if time.monotonic() - self._touched_at >= self.touch_interval:
+            self.flush()
+        return result
+
+    def _flush_touched(self, conn):
+        """모아 둔 마지막 사용 시각을 기록합니다. 트랜잭션 안에서 호출해야 합니다."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE entries SET last_used = MAX(last_used, ?) WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+            self._touched = {}
+        self._touched_at = time.monotonic()
+
+    def _store(self, conn, model, keys, vectors):
+        """새 벡터를 저장합니다. 모델별 상한을 넘으면 LRU 행을 비워 재사용합니다."""
+        dimension = vectors.shape[1]
+        capacity = max(1, self.max_bytes // (dimension * 4))
+
+        conn.execute("BEGIN IMMEDIATE")  # 다른 프로세스와의 행 번호 할당 충돌 방지
+        try:
+            row = conn.execute(
+                "SELECT dimension, next_slot FROM models WHERE model = ?", (model,)
+            ).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO models VALUES (?, ?, 0)", (model, dimension))
+                next_slot = 0
+            elif row[0] != dimension:
+                raise ValueError(f"{model}의 임베딩 차원이 캐시({row[0]})와 다릅니다: {dimension}")
+            else:
+                next_slot = row[1]
+
+            # 비울 행을 고르기 전에 모아 둔 사용 시각을 반영
+            self._flush_touched(conn)
+
+            # 그 사이 다른 프로세스가 저장한 키는 제외
+            existing = self._lookup(conn, keys)
+            pending = [(key, vector) for key, vector in zip(keys, vectors) if key not in existing]
+            pending = pending[:capacity]
+
+            fresh = max(0, min(len(pending), capacity - next_slot))
+            slots = list(range(next_slot, next_slot + fresh))
+            if len(pending) > fresh:
+                evicted = conn.execute(
+                    "SELECT key, slot FROM entries WHERE model = ? ORDER BY last_used LIMIT ?",
+                    (model, len(pending) - fresh),
+                ).fetchall()
+                for chunk in chunked([key for key, _ in evicted]):
+                    placeholders = ",".join("?" * len(chunk))
+                    conn.execute(f"DELETE FROM entries WHERE key IN ({placeholders})", chunk)
+                slots += [slot for _, slot in evicted]
+                pending = pending[: len(slots)]
+
+            if pending:
+                # 벡터를 먼저 디스크에 쓴 뒤 매핑을 커밋하여, 커밋된 키는 항상 유효한 벡터를 가리킴
+                matrix = self._matrix(model, dimension, next_slot + fresh)
+                matrix[np.array(slots, dtype=np.int64)] = np.stack([vector for _, vector in pending])
+                matrix.flush()
+
+                now = time.time()
+                conn.executemany(
+                    "INSERT INTO entries (key, model, slot, last_used, checksum) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (key, model, slot, now, vector_checksum(vector))
+                        for (key, vector), slot in zip(pending, slots)
+                    ],
+                )
+                conn.execute(
+                    "UPDATE models SET next_slot = ? WHERE model = ?", (next_slot + fresh, model)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_or_compute(self, model, texts, compute):
+        """
+        texts의 임베딩을 (len(texts), dimension) float32 행렬로 반환합니다.
+        캐시에 없는 텍스트(중복 제거)만 compute(list_of_texts)로 임베딩합니다.
+        """
+        texts = list(texts)
+        keys = [make_key(model, text) for text in texts]
+
+        with span("embedding", **{"embedding.model": model, "embedding.texts": len(texts)}) as current:
+            with self._lock:
+                vectors = self._read(self._connect(), model, keys)
+
+            # 캐시에 없는 텍스트만 (중복 없이) 계산. 느린 모델/API 호출 동안은 잠금을 풀어 둠
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in vectors:
+                    missing.setdefault(key, text)
+            current.set_attributes(
+                {
+                    "embedding.cache_hits": len(texts) - len(missing),
+                    "embedding.cache_misses": len(missing),
+                    "embedding.cache_hit": not missing,
+                }
+            )
+            if missing:
+                computed = np.asarray(compute(list(missing.values())), dtype=np.float32)
+                with self._lock:
+                    self._store(self._connect(), model, list(missing), computed)
+                vectors.update(zip(missing, computed))
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        count_cache_lookups("embedding", hits=len(texts) - len(missing), misses=len(missing))
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def flush(self):
+        """모아 둔 마지막 사용 시각을 즉시 기록합니다."""
+        with self._lock:
+            if self._touched:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._flush_touched(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """프로세스 전역에서 공유하는 기본 임베딩 캐시를 반환합니다."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = EmbeddingCache()
+    return _default_cache
@@ -2,16 +2,46 @@ import openai
 import faiss
 import numpy as np
 import json
+import contextvars
 from dotenv import load_dotenv
 import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.embedding_cache import get_embedding_cache
+from scripts.index_factory import create_faiss_index, train_faiss_index
+from scripts.metadata_store import write_metadata_store
+from scripts.telemetry import span
 
 # 환경 변수 로드
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# 임베딩 요청 설정
+embedding_model = "text-embedding-ada-002"
+embedding_api_base = os.getenv("EMBEDDING_API_BASE")  # 로컬 대체 임베딩 서버 주소 (없으면 OpenAI)
+embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))  # 요청 한 번에 보낼 텍스트 수
+embedding_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # 동시에 보낼 요청 수
+embedding_max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))  # 요청당 최대 재시도 횟수
+embedding_retry_delay = float(os.getenv("EMBEDDING_RETRY_DELAY", "1.0"))  # 첫 재시도 대기 시간(초)
+embedding_max_retry_delay = 30.0
+
+# 재시도할 가치가 있는 일시적 오류
+retryable_errors = (
+    openai.error.RateLimitError,
+    openai.error.APIError,
+    openai.error.Timeout,
+    openai.error.ServiceUnavailableError,
+    openai.error.APIConnectionError,
+)
+
 # 임베딩 차원 설정 (text-embedding-ada-002 모델은 1536차원)
 dimension = 1536
-index = faiss.IndexFlatL2(dimension)  # FAISS 인덱스 생성
+# 인덱스 타입 (FAISS factory 문자열, 예: "Flat", "IVF64,Flat", "IVF256,PQ64", "HNSW32")
+index_factory_string = os.getenv("GRAMMAR_INDEX_FACTORY", "Flat")
+index = create_faiss_index(dimension, index_factory_string)  # FAISS 인덱스 생성
 metadata = []  # 메타데이터 저장 리스트
 
 # FAISS 인덱스와 메타데이터 저장 경로 설정
@@ -20,15 +50,78 @@ os.makedirs(output_dir, exist_ok=True)  # modules 디렉터리가 없으면 생
 
 # 파일 경로 설정
 faiss_index_path = os.path.join(output_dir, "faiss_index.index")
-metadata_path = os.path.join(output_dir, "metadata.json")
+metadata_path = os.path.join(output_dir, "metadata.bin")  # FAISS 행 번호 → 메타데이터 (metadata_store.py)
+
+
+def embed_chunk(texts):
+    """
+    텍스트 묶음을 한 번의 요청으로 임베딩합니다.
+    일시적 오류는 지수 백오프(+지터)로 최대 embedding_max_retries번 재시도합니다.
+    요청(재시도 포함) 하나를 embedding.request span으로 기록합니다.
+    """
+    with span(
+        "embedding.request", **{"embedding.model": embedding_model, "embedding.texts": len(texts)}
+    ) as current:
+        for attempt in range(embedding_max_retries + 1):
+            try:
+                response = openai.Embedding.create(
+                    input=texts, model=embedding_model, api_base=embedding_api_base
+                )
+                break
+            except retryable_errors as e:
+                if attempt == embedding_max_retries:
+                    raise
+                delay = min(embedding_max_retry_delay, embedding_retry_delay * 2**attempt)
+                delay *= 0.5 + random.random() / 2
+                print(f"임베딩 요청 실패 ({e.__class__.__name__}), {delay:.1f}초 후 재시도 ({attempt + 1}/{embedding_max_retries})")
+                time.sleep(delay)
+        current.set_attribute("embedding.retries", attempt)
+        usage = response.get("usage") or {}
+        current.set_attribute("gen_ai.usage.input_tokens", usage.get("prompt_tokens"))
+
+    # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준으로 정렬
+    data = sorted(response["data"], key=lambda item: item["index"])
+    return np.array([item["embedding"] for item in data], dtype=np.float32)
+
+
+def request_embeddings(texts, batch_size=None, concurrency=None):
+    """
+    텍스트 목록을 batch_size개씩 나누어 최대 concurrency개의 요청을 동시에 보내 임베딩합니다.
+    결과는 입력 순서대로 (len(texts), dimension) 행렬로 반환합니다.
+    """
+    batch_size = batch_size or embedding_batch_size
+    concurrency = concurrency or embedding_concurrency
+    chunks = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    if not chunks:
+        return np.empty((0, dimension), dtype=np.float32)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # 요청 span이 호출한 쪽 span(embedding 등) 아래에 기록되도록 요청마다 현재 context를 복사
+        futures = [
+            executor.submit(contextvars.copy_context().run, embed_chunk, chunk) for chunk in chunks
+        ]
+        results = [future.result() for future in futures]  # 입력 순서 유지
+    return np.vstack(results)
+
+
+def create_embeddings(texts, batch_size=None, concurrency=None):
+    """
+    임베딩 캐시를 거쳐 텍스트 목록을 임베딩합니다. 캐시에 없는 텍스트만 API로 요청합니다.
+    """
+    if not texts:
+        return np.empty((0, dimension), dtype=np.float32)
+    return get_embedding_cache().get_or_compute(
+        embedding_model,
+        texts,
+        lambda missing: request_embeddings(missing, batch_size, concurrency),
+    )
 
 
 def create_embedding(text):
     """
     텍스트 임베딩을 생성하여 FAISS 검색에 사용합니다.
     """
-    response = openai.Embedding.create(input=[text], model="text-embedding-ada-002")
-    return np.array(response["data"][0]["embedding"], dtype=np.float32)
+    return create_embeddings([text])[0]
 
 
 # JSON 데이터를 사용하여 FAISS 인덱스와 메타데이터 저장
@@ -36,20 +129,32 @@ def add_json_data_to_faiss_index(json_data):
     """
     JSON 형식의 {문법 틀린 부분, 수정본} 데이터를 사용하여 FAISS 인덱스에 추가하고, 메타데이터와 함께 저장합니다.
     """
-    embeddings = []
+    # 문법 틀린 부분을 묶음 단위로 임베딩하여 인덱스에 추가
+    embeddings = create_embeddings([entry["incorrect"] for entry in json_data])
     for entry in json_data:
-        incorrect_text = entry["incorrect"]
-        corrected_text = entry["corrected"]
-
-        # 문법 틀린 부분을 임베딩하여 인덱스에 추가
-        embedding = create_embedding(incorrect_text)
-        embeddings.append(embedding)
-        metadata.append({"incorrect": incorrect_text, "corrected": corrected_text})
+        item = {"incorrect": entry["incorrect"], "corrected": entry["corrected"]}
+        if entry.get("tag"):
+            item["tag"] = entry["tag"]
+        metadata.append(item)
 
-    embeddings = np.array(embeddings)
+    train_faiss_index(index, embeddings)  # IVF/PQ 등 학습이 필요한 타입이면 첫 데이터로 학습
     index.add(embeddings)
 
 
+def load_grammar_data(path):
+    """
+    spread_sheet_to_json.py가 만든 grammar_data.json(Sheety 비문 데이터)을
+    [{"incorrect": 문장, "corrected": 수정, "tag": tag}, ...] 형식으로 변환합니다.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        grammar_data = json.load(f)
+    return [
+        {"incorrect": sentence["문장"], "corrected": sentence["수정"], "tag": data["tag"]}
+        for data in grammar_data
+        for sentence in data["오류_예문_목록"]
+    ]
+
+
 # JSON 데이터 예시
 json_data = [
     {"incorrect": "She go ", "corrected": "She goes "},
@@ -83,12 +188,19 @@ json_data = [
     {"incorrect": "You is ", "corrected": "You are "},
     {"incorrect": "It have ", "corrected": "It has "},
 ]
-# JSON 데이터를 사용하여 인덱스 추가 및 저장
-add_json_data_to_faiss_index(json_data)
-
-# FAISS 인덱스와 메타데이터를 파일로 저장
-faiss.write_index(
-    index, faiss_index_path
-)  # FAISS 인덱스를 modules/faiss_index.index 파일로 저장
-with open(metadata_path, "w", encoding="utf-8") as f:
-    json.dump(metadata, f, ensure_ascii=False, indent=4)
+
+if __name__ == "__main__":
+    # 사용법 (backend/script_editor에서): python -m scripts.faiss_index [grammar_data.json]
+    if len(sys.argv) > 1:
+        json_data = load_grammar_data(sys.argv[1])
+
+    # JSON 데이터를 사용하여 인덱스 추가 및 저장
+    started = time.perf_counter()
+    add_json_data_to_faiss_index(json_data)
+    print(f"{len(json_data)}개 문장 임베딩 완료 ({time.perf_counter() - started:.1f}초)")
+
+    # FAISS 인덱스와 메타데이터를 파일로 저장
+    faiss.write_index(
+        index, faiss_index_path
+    )  # FAISS 인덱스를 modules/faiss_index.index 파일로 저장
+    write_metadata_store(metadata_path, metadata)  # 행 번호 순서 그대로 modules/metadata.bin에 저장
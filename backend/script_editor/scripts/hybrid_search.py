@@ -0,0 +1,129 @@
+"""
+    문제은행 하이브리드 검색: FAISS 벡터 검색 + BM25 키워드 검색.
+
+    mode
+        "vector"  : 기존 FAISS 검색 (search_faiss_index_batch)
+        "lexical" : BM25 키워드 검색만 사용 (임베딩 호출 없음, 인코더와 FAISS 인덱스도 로드하지 않음)
+        "hybrid"  : 두 결과를 합침
+    fusion (hybrid일 때)
+        "rrf"      : Reciprocal Rank Fusion, 순위만 사용 (점수 스케일이 달라도 안전)
+        "weighted" : 질문별로 0~1 정규화한 두 점수의 가중합
+    question_types
+        주어지면 해당 유형(예: "글의 목적", "어법")의 문제 안에서만 검색 (FAISS는 ID selector 사용)
+
+    모든 모드의 결과에는 클수록 가까운 "score"가 있어 같은 기준으로 정렬할 수 있습니다.
+    vector 모드의 score는 FAISS 유사도(L2 거리는 부호를 뒤집은 값, 내적은 그대로)이며,
+    기존 클라이언트를 위해 작을수록 가까운 "distance"도 함께 반환합니다.
+"""
+
+import os
+
+import faiss
+
+from scripts.lexical_index import lexical_registry
+from scripts.search_question_index import encode_texts, registry, search_faiss_index_batch
+
+search_modes = ("vector", "lexical", "hybrid")
+fusion_methods = ("rrf", "weighted")
+
+rrf_k = int(os.getenv("HYBRID_RRF_K", "60"))  # RRF 상수 (클수록 하위 순위의 영향이 커짐)
+vector_weight = float(os.getenv("HYBRID_VECTOR_WEIGHT", "0.5"))  # weighted fusion의 벡터 점수 비중
+# 합치기 전에 각 검색기에서 가져올 후보 수 = k * candidate_multiplier
+candidate_multiplier = int(os.getenv("HYBRID_CANDIDATE_MULTIPLIER", "4"))
+
+def question_ids_for_types(question_types):
+    """question_type이 question_types 중 하나인 QuestionMeta id 집합"""
+    from scripts.models import QuestionMeta
+
+    return set(
+        QuestionMeta.objects.filter(question_type__in=question_types).values_list("id", flat=True)
+    )
+
+
+def vector_score(distance):
+    """FAISS 검색 거리를 클수록 가까운 점수로 바꿉니다 (L2 거리는 부호를 뒤집고, 내적은 그대로)."""
+    sign = 1.0 if registry.index.metric_type == faiss.METRIC_INNER_PRODUCT else -1.0
+    return sign * float(distance)
+
+
+def vector_candidates(queries, k, allowed_ids=None):
+    """질문별 [(id, 유사도 점수), ...] (점수는 클수록 가까움)"""
+    if registry.ntotal == 0:
+        return [[] for _ in queries]
+    matches = registry.search(encode_texts(list(queries)), k, allowed_ids)
+    return [[(int(label), vector_score(d)) for d, label in row] for row in matches]
+
+
+def lexical_candidates(queries, k, allowed_ids=None):
+    """질문별 [(id, BM25 점수), ...] (저널의 새 변경은 키워드 인덱스가 직접 읽어 반영)"""
+    return [lexical_registry.search(query, k, allowed_ids) for query in queries]
+
+
+def rrf_fuse(rankings, k, rrf_k=rrf_k):
+    """여러 순위 목록 [(id, score), ...]를 RRF 점수 순으로 합칩니다."""
+    scores = {}
+    for ranking in rankings:
+        for rank, (question_id, _) in enumerate(ranking, start=1):
+            scores[question_id] = scores.get(question_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def normalize_scores(ranking):
+    """점수를 0~1로 min-max 정규화합니다 (모두 같으면 1)."""
+    if not ranking:
+        return {}
+    values = [score for _, score in ranking]
+    low, high = min(values), max(values)
+    if high == low:
+        return {question_id: 1.0 for question_id, _ in ranking}
+    return {question_id: (score - low) / (high - low) for question_id, score in ranking}
+
+
+def weighted_fuse(vector_ranking, lexical_ranking, k, vector_weight=vector_weight):
+    """정규화한 벡터 점수와 BM25 점수의 가중합 순으로 합칩니다. 한쪽에만 있는 문서는 다른 쪽 점수를 0으로 봅니다."""
+    vector_scores = normalize_scores(vector_ranking)
+    lexical_scores = normalize_scores(lexical_ranking)
+    scores = {
+        question_id: vector_weight * vector_scores.get(question_id, 0.0)
+        + (1 - vector_weight) * lexical_scores.get(question_id, 0.0)
+        for question_id in vector_scores.keys() | lexical_scores.keys()
+    }
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def hybrid_search_batch(queries, k=5, mode="hybrid", fusion="rrf", question_types=None):
+    """
+    여러 질문을 검색하여 질문별 top-k 목록 [{"id": ..., "score": ...}, ...]을 반환합니다.
+    score는 모든 모드에서 클수록 가까우며, vector 모드는 "distance"(작을수록 가까움)도 포함합니다.
+    """
+    if mode not in search_modes:
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+    if fusion not in fusion_methods:
+        raise ValueError(f"지원하지 않는 fusion 방식입니다: {fusion}")
+    if not queries:
+        return []
+
+    allowed_ids = question_ids_for_types(question_types) if question_types else None
+    if mode == "vector":
+        return [
+            [{**match, "score": vector_score(match["distance"])} for match in row]
+            for row in search_faiss_index_batch(queries, k=k, allowed_ids=allowed_ids)
+        ]
+
+    if mode == "lexical":
+        return [
+            [{"id": question_id, "score": score} for question_id, score in row]
+            for row in lexical_candidates(queries, k, allowed_ids)
+        ]
+
+    depth = k * candidate_multiplier
+    vector_rows = vector_candidates(queries, depth, allowed_ids)
+    lexical_rows = lexical_candidates(queries, depth, allowed_ids)
+    results = []
+    for vector_ranking, lexical_ranking in zip(vector_rows, lexical_rows):
+        if fusion == "rrf":
+            fused = rrf_fuse([vector_ranking, lexical_ranking], k)
+        else:
+            fused = weighted_fuse(vector_ranking, lexical_ranking, k)
+        results.append([{"id": question_id, "score": score} for question_id, score in fused])
+    return results
@@ -0,0 +1,119 @@
+"""
+    FAISS 인덱스 타입을 factory 문자열로 설정하기 위한 공용 함수 모음.
+    문제은행 인덱스(search_question_index.py)와 문법 오류 인덱스(faiss_index.py)가 함께 사용함.
+
+    factory 문자열 예시:
+        "Flat"              : 전수 탐색 (기존 IndexFlatL2와 동일)
+        "IVF256,Flat"       : IVF-Flat, 학습 필요 (nprobe로 정확도/속도 조절)
+        "IVF1024,PQ32"      : IVF-PQ, 학습 필요, 벡터를 32바이트로 압축
+        "HNSW32"            : HNSW 그래프, 학습 불필요 (efSearch로 정확도/속도 조절)
+"""
+
+import os
+
+import faiss
+import numpy as np
+
+# 검색 파라미터 기본값 (환경 변수로 조정, 값이 없으면 faiss 기본값 사용)
+default_nprobe = os.getenv("FAISS_NPROBE")
+default_ef_search = os.getenv("FAISS_EF_SEARCH")
+
+
+def create_faiss_index(dimension, factory_string="Flat", metric=faiss.METRIC_L2):
+    """factory 문자열로 비어 있는 FAISS 인덱스를 생성합니다."""
+    return faiss.index_factory(dimension, factory_string, metric)
+
+
+def train_faiss_index(index, vectors):
+    """
+    IVF, PQ처럼 학습이 필요한 인덱스라면 주어진 벡터로 학습합니다.
+    이미 학습된 인덱스(Flat, HNSW 등)는 그대로 둡니다.
+    """
+    if index.is_trained:
+        return index
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    try:
+        index.train(vectors)
+    except RuntimeError as e:
+        raise ValueError(
+            f"{len(vectors)}개의 벡터로는 인덱스를 학습할 수 없습니다. "
+            "IVF의 리스트 수나 PQ 크기를 줄이거나 'Flat'/'HNSW32'를 사용하세요."
+        ) from e
+    return index
+
+
+def build_faiss_index(vectors, factory_string="Flat", metric=faiss.METRIC_L2, ids=None):
+    """
+    인덱스를 생성하고, 필요하면 학습한 뒤 벡터를 추가하여 반환합니다.
+    ids가 주어지면 IndexIDMap2로 감싸 검색 결과가 행 번호 대신 해당 id를 반환하도록 합니다.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    index = create_faiss_index(vectors.shape[1], factory_string, metric)
+    train_faiss_index(index, vectors)
+    if ids is None:
+        index.add(vectors)
+        return index
+
+    index = faiss.IndexIDMap2(index)
+    index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+    return index
+
+
+def base_index(index):
+    """IndexIDMap으로 감싼 인덱스라면 안쪽 인덱스를 반환합니다."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def extract_ivf(index):
+    """IVF 계열이면 IndexIVF를, 아니면 None을 반환합니다."""
+    try:
+        return faiss.extract_index_ivf(base_index(index))
+    except RuntimeError:
+        return None
+
+
+def make_search_params(index, selector, exhaustive=False):
+    """
+    id selector를 담은 검색 파라미터를 만듭니다.
+    IVF/HNSW는 전용 파라미터 타입이 필요하고, 파라미터를 넘기면 인덱스에 설정된
+    nprobe/efSearch 대신 파라미터 값이 쓰이므로 현재 설정값을 그대로 옮겨 담습니다.
+    exhaustive=True이면 모든 리스트(nprobe=nlist) / 모든 노드(efSearch>=ntotal)를 탐색하도록 하여,
+    selector가 허용하는 벡터가 적어도 결과가 모자라지 않게 합니다.
+    """
+    base = base_index(index)
+    ivf = extract_ivf(base)
+    if ivf is not None:
+        nprobe = ivf.nlist if exhaustive else ivf.nprobe
+        return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    if isinstance(base, faiss.IndexHNSW):
+        ef_search = max(base.hnsw.efSearch, base.ntotal) if exhaustive else base.hnsw.efSearch
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+    return faiss.SearchParameters(sel=selector)
+
+
+def is_exact_index(index):
+    """selector를 써도 허용된 벡터를 모두 탐색하는 전수 탐색(Flat) 인덱스인지 확인합니다."""
+    return isinstance(base_index(index), faiss.IndexFlat)
+
+
+def set_search_params(index, nprobe=default_nprobe, ef_search=default_ef_search):
+    """
+    검색 파라미터를 설정합니다.
+    - nprobe: IVF 계열에서 검색할 리스트 수
+    - ef_search: HNSW 계열에서 탐색 후보 수
+    인덱스 타입에 해당하지 않는 파라미터는 무시합니다.
+    """
+    params = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if value is None:
+            continue
+        try:
+            params.set_index_parameter(index, name, int(value))
+        except RuntimeError:
+            # 예: Flat 인덱스에 nprobe를 설정하려는 경우
+            pass
+    return index
@@ -0,0 +1,160 @@
+"""
+    QuestionMeta(question, vocabulary, explanation)에 대한 BM25 키워드 인덱스.
+
+    - 임베딩 호출 없이 단어 일치로 검색 (단어 목록, 문법 용어처럼 임베딩이 약한 질의에 유리)
+    - 처음 검색할 때 DB에서 한 번 만들고, 이후 변경은 문제은행 FAISS 인덱스의 저널을 직접 따라 읽어 반영
+      (JournalTail: 인코더나 FAISS 스냅샷을 로드하지 않음)
+    - hybrid_search.py에서 FAISS 결과와 합쳐 사용함
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from scripts import search_question_index
+from scripts.search_question_index import JournalTail
+
+logger = logging.getLogger(__name__)
+
+# BM25 파라미터 (일반적인 기본값)
+bm25_k1 = 1.2
+bm25_b = 0.75
+
+token_pattern = re.compile(r"\w+", re.UNICODE)
+stopwords = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were with".split()
+)
+
+
+def tokenize(text):
+    """소문자로 바꾸어 단어 단위로 나누고 흔한 영어 불용어를 제외합니다."""
+    return [token for token in token_pattern.findall((text or "").lower()) if token not in stopwords]
+
+
+def question_document(question, vocabulary="", explanation=""):
+    """키워드 인덱스에 넣을 문서 본문 (본문 + 어휘 + 해설)"""
+    return " ".join(part for part in (question, vocabulary, explanation) if part)
+
+
+class BM25Index:
+    """
+    역색인(단어 → {문서 id: 빈도}) 기반 BM25 인덱스.
+    문서 단위로 추가/삭제할 수 있어 전체를 다시 만들지 않고 갱신합니다.
+    """
+
+    def __init__(self, k1=bm25_k1, b=bm25_b):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term → {doc_id: tf}
+        self.doc_terms = {}  # doc_id → {term: tf}
+        self.doc_lengths = {}  # doc_id → 단어 수
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def add(self, doc_id, text):
+        """문서를 추가합니다. 같은 id가 있으면 교체합니다."""
+        self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[doc_id]
+        for term, tf in terms.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        for term in terms:
+            docs = self.postings[term]
+            docs.pop(doc_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def search(self, query, k=5, allowed_ids=None):
+        """
+        질의와 BM25 점수가 높은 순으로 [(doc_id, score), ...]를 최대 k개 반환합니다.
+        allowed_ids가 주어지면 그 안의 문서만 점수를 매깁니다.
+        """
+        n = len(self.doc_terms)
+        if n == 0:
+            return []
+        average_length = self.total_length / n
+
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                if allowed_ids is not None and doc_id not in allowed_ids:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+class LexicalIndexRegistry:
+    """
+    프로세스 전역 BM25 인덱스.
+    검색할 때마다 문제은행 인덱스의 저널에서 새로 기록된 upsert/remove를 읽어 반영합니다.
+    """
+
+    def __init__(self, journal_path=None):
+        self.journal_path = journal_path  # None이면 문제은행 레지스트리의 저널
+        self._lock = threading.RLock()
+        self._index = None
+        self._tail = None
+
+    def _build(self):
+        from scripts.models import QuestionMeta
+
+        index = BM25Index()
+        rows = QuestionMeta.objects.values_list("id", "question", "vocabulary", "explanation")
+        for question_id, question, vocabulary, explanation in rows.iterator(chunk_size=2000):
+            index.add(question_id, question_document(question, vocabulary, explanation))
+        logger.info("BM25 키워드 인덱스 생성 (%d개 문제)", len(index))
+        return index
+
+    def sync(self):
+        """
+        저널에 새로 기록된 변경을 반영합니다. 처음 호출되었거나 놓친 변경이 있을 수 있으면
+        (저널이 두 번 이상 회전 등) DB에서 다시 만듭니다.
+        """
+        with self._lock:
+            journal_path = self.journal_path or search_question_index.registry.journal_path
+            ops = None
+            if self._index is not None and self._tail.journal_path == journal_path:
+                ops = self._tail.read()
+            if ops is None:
+                # 저널은 DB 커밋 뒤에 기록되므로, DB를 읽기 전에 저널 끝을 잡아 두면 빠지는 변경이 없음
+                self._tail = JournalTail(journal_path)
+                self._tail.seek_end()
+                self._index = self._build()
+                return self._index
+            for op in ops:
+                question_id = int(op["id"])
+                if op["op"] == "upsert":
+                    self._index.add(question_id, question_document(op["text"], op.get("extra_text", "")))
+                else:
+                    self._index.remove(question_id)
+            return self._index
+
+    @property
+    def index(self):
+        return self.sync()
+
+    def search(self, query, k=5, allowed_ids=None):
+        with self._lock:
+            return self.sync().search(query, k, allowed_ids)
+
+
+lexical_registry = LexicalIndexRegistry()
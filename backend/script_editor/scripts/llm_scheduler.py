@@ -0,0 +1,17 @@
+"""
+    question-generator/llm_scheduler.py의 RPM/TPM 스케줄러를 백엔드에서 불러옵니다.
+
+    스케줄러는 표준 라이브러리만 사용하므로 같은 파일을 경로로 불러 씁니다. LLM_SCHEDULER_PATH를 같은
+    파일로 설정하면 Django 프로세스와 문제 생성 워커(job_runner)가 하나의 한도를 나눠 씁니다.
+"""
+
+from scripts.question_generator_modules import load_module
+
+_module = load_module("llm_scheduler")
+
+LLMScheduler = _module.LLMScheduler
+estimate_cost = _module.estimate_cost
+get_scheduler = _module.get_scheduler
+use_priority = _module.use_priority
+INTERACTIVE = _module.INTERACTIVE
+BATCH = _module.BATCH
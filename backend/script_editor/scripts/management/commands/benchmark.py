@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scripts.benchmarks import BASELINE_PATH, benchmarking, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "가짜 임베딩으로 문제은행 검색/인덱스 빌드/적재를 측정하고 기준값과 비교합니다 (네트워크 불필요)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="문제은행 문항 수 (실제 CSV를 반복)")
+        parser.add_argument("--queries", type=int, default=20, help="검색할 질문 수")
+        parser.add_argument("--grammar-rows", type=int, default=300, help="문법 오류 인덱스에 추가할 문장 수")
+        parser.add_argument("--latency", type=float, default=0.0, help="가짜 임베딩 호출당 지연(초)")
+        parser.add_argument("--repeat", type=int, default=1, help="반복 횟수 (가장 빠른 시간 사용)")
+        parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 파일")
+        parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=benchmarking.DEFAULT_TOLERANCE,
+            help="시간/메모리 허용 증가율 (0.25 = 25%%)",
+        )
+
+    def handle(self, *args, **options):
+        results = run_benchmarks(
+            rows=options["rows"],
+            queries=options["queries"],
+            grammar_rows=options["grammar_rows"],
+            latency=options["latency"],
+            repeat=options["repeat"],
+        )
+        ok = benchmarking.report(
+            results,
+            options["baseline"],
+            update=options["update_baseline"],
+            tolerance=options["tolerance"],
+            write=self.stdout.write,
+        )
+        if not ok:
+            raise CommandError("기준값보다 성능이 나빠졌습니다.")
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from scripts import search_question_index
+
+
+class Command(BaseCommand):
+    help = "수능 CSV(db/suneung_data.CSV)로 문제은행 FAISS 인덱스를 새로 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="CSV를 묶음 단위로 읽어 인코딩/추가하는 스트리밍 모드 (메모리 사용량 제한)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=256, help="스트리밍 모드 묶음 크기")
+        parser.add_argument(
+            "--factory",
+            default=search_question_index.index_factory_string,
+            help='FAISS factory 문자열 (예: "Flat", "IVF1024,PQ32", "HNSW32")',
+        )
+        parser.add_argument(
+            "--train-size",
+            type=int,
+            default=search_question_index.train_size,
+            help="학습이 필요한 인덱스를 학습할 벡터 수 (스트리밍 모드)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["stream"]:
+            ids = search_question_index.write_faiss_index(options["factory"])
+            self.stdout.write(self.style.SUCCESS(f"인덱스 생성 완료: {len(ids)}개 문제"))
+            return
+
+        def progress(stats):
+            peak = stats["peak_memory_mb"]
+            self.stdout.write(
+                f"{stats['rows']}행 처리, {stats['rows_per_second']:.1f} rows/s"
+                + (f", 최대 메모리 {peak:.0f}MB" if peak is not None else "")
+            )
+
+        stats = search_question_index.write_faiss_index_streaming(
+            chunk_size=options["chunk_size"],
+            factory_string=options["factory"],
+            train_size=options["train_size"],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"인덱스 생성 완료: {stats['rows']}개 문제, {stats['seconds']:.1f}초 "
+                f"({stats['rows_per_second']:.1f} rows/s)"
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from scripts.search_question_index import registry, snapshot_every
+
+
+class Command(BaseCommand):
+    help = (
+        "문제은행 FAISS 인덱스의 저널(추가/수정/삭제)을 스냅샷 파일에 합치고 저널을 비웁니다. "
+        "주기적으로(cron 등) --if-needed와 함께 실행하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-needed",
+            action="store_true",
+            help=f"저널에 쌓인 변경이 QUESTION_INDEX_SNAPSHOT_EVERY({snapshot_every})개 미만이면 건너뜀",
+        )
+
+    def handle(self, *args, **options):
+        registry.load()
+        pending = registry.journal_ops
+        if options["if_needed"] and pending < snapshot_every:
+            self.stdout.write(f"저널 변경 {pending}개: 스냅샷을 건너뜁니다.")
+            return
+        before = registry.ntotal
+        registry.snapshot()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"스냅샷 완료: {registry.index.ntotal}개 벡터 (compaction 전 main+delta {before}개)"
+            )
+        )
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from scripts.question_loader import load_question_meta
+
+
+class Command(BaseCommand):
+    help = "수능 문제 CSV/XLSX 파일을 QuestionMeta에 대량 upsert합니다 (다시 실행해도 안전)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV 또는 XLSX 파일 경로 (예: ../../db/suneung_data.CSV)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="트랜잭션 하나에 쓸 행 수")
+        parser.add_argument(
+            "--sync-index",
+            action="store_true",
+            help="바뀐 문제를 문제은행 FAISS/키워드 인덱스에도 반영 (bulk_create는 시그널을 보내지 않음)",
+        )
+
+    def handle(self, *args, **options):
+        on_changed = None
+        if options["sync_index"]:
+            from scripts.search_question_index import registry
+            from scripts.signals import question_extra_text
+
+            def on_changed(rows):
+                registry.upsert_many(
+                    [
+                        (
+                            row["id"],
+                            row["question"],
+                            question_extra_text(row["vocabulary"], row["explanation"]),
+                        )
+                        for row in rows
+                    ]
+                )
+
+        def progress(stats):
+            self.stdout.write(f"{stats['rows']}행 처리, {stats['rows_per_second']:.0f} rows/s")
+
+        stats = load_question_meta(
+            options["path"],
+            batch_size=options["batch_size"],
+            on_changed=on_changed,
+            progress=progress,
+        )
+        if options["sync_index"]:
+            # 저널에 기록한 문제를 여기서 인코딩해 두면 (공유 임베딩 캐시) 웹 워커는 모델 호출 없이 반영함
+            try:
+                registry.load()
+            except FileNotFoundError:
+                self.stdout.write("문제은행 FAISS 인덱스가 없어 저널에만 기록했습니다.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"적재 완료: {stats['rows']}행 (추가 {stats['created']}, 수정 {stats['updated']}, "
+                f"변경 없음 {stats['unchanged']}), {stats['seconds']:.2f}초 "
+                f"({stats['rows_per_second']:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from scripts.question_jobs import QuestionWorkerPool
+
+
+class Command(BaseCommand):
+    help = "문제 생성 작업(QuestionJob) 워커를 실행합니다. 여러 프로세스/서버에서 동시에 실행해도 됩니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="동시에 실행할 작업 수 (워커 스레드 수)")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="대기열이 비었을 때 확인 간격(초)")
+        parser.add_argument(
+            "--once", action="store_true", help="대기 중인 작업을 모두 처리하면 종료 (테스트/배치용)"
+        )
+        parser.add_argument(
+            "--fake-llm",
+            action="store_true",
+            help="네트워크 없이 가짜 LLM(question-generator/fake_llm.py)으로 실행",
+        )
+        parser.add_argument("--fake-latency", type=float, default=0.0, help="가짜 LLM 호출당 지연(초)")
+
+    def handle(self, *args, **options):
+        pool = QuestionWorkerPool(
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            fake_llm=options["fake_llm"],
+            fake_latency=options["fake_latency"],
+        )
+        self.stdout.write(f"문제 생성 워커 {options['concurrency']}개 시작 ({pool.name})")
+        pool.run(drain=options["once"])
+        self.stdout.write(self.style.SUCCESS("워커 종료"))
@@ -0,0 +1,148 @@
+"""
+    FAISS 행 번호로 메타데이터를 읽는 바이너리 저장소 (metadata.json 대체).
+
+    파일 구조 (리틀 엔디언):
+        [레코드 0 JSON][레코드 1 JSON]...[offsets: uint64 × (n + 1)][n: uint64][magic: b"MDS1"]
+    레코드 i는 data[offsets[i]:offsets[i + 1]]입니다.
+
+    - 파일을 mmap으로 열고 끝의 offsets만 참조하므로 시작 시 파싱 비용이 없음
+    - 검색 결과로 나온 행만 JSON 디코딩
+    - 쓰기는 레코드를 하나씩 이어 쓰는 스트리밍 방식, 임시 파일에 쓴 뒤 교체
+
+    사용법 (기존 metadata.json 변환, backend/script_editor에서):
+        python -m scripts.metadata_store scripts/modules/metadata.json scripts/modules/metadata.bin
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+import numpy as np
+
+magic = b"MDS1"
+footer = struct.Struct("<Q4s")  # 레코드 수, magic
+
+
+class MetadataStoreWriter:
+    """레코드를 FAISS에 추가한 순서대로 append()하고 close()하면 파일이 완성됩니다."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path + ".tmp", "wb")
+        self._offsets = array("Q", [0])
+
+    @property
+    def count(self):
+        return len(self._offsets) - 1
+
+    def append(self, record):
+        """레코드를 추가하고 행 번호를 반환합니다."""
+        data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return self.count - 1
+
+    def close(self):
+        if sys.byteorder != "little":
+            self._offsets.byteswap()
+        self._file.write(self._offsets.tobytes())
+        self._file.write(footer.pack(self.count, magic))
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self.path + ".tmp")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_metadata_store(path, records):
+    """records(순회 가능한 dict 목록)를 저장소 파일로 씁니다. 레코드 수를 반환합니다."""
+    with MetadataStoreWriter(path) as writer:
+        for record in records:
+            writer.append(record)
+    return writer.count
+
+
+class MetadataStore:
+    """
+    행 번호 → 메타데이터 dict 조회. 처음 조회할 때 파일을 mmap으로 엽니다.
+    파일이 새로 쓰이면(os.replace) reload()로 다시 열 수 있습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._mmap = None
+        self._offsets = None
+
+    def _open(self):
+        with self._lock:
+            if self._mmap is not None:
+                return
+            f = open(self.path, "rb")
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # 빈 파일
+                f.close()
+                raise ValueError(f"메타데이터 저장소 파일이 비어 있습니다: {self.path}")
+            count, file_magic = footer.unpack_from(data, len(data) - footer.size)
+            if file_magic != magic:
+                data.close()
+                f.close()
+                raise ValueError(f"메타데이터 저장소 파일이 아닙니다: {self.path}")
+            start = len(data) - footer.size - (count + 1) * 8
+            self._offsets = np.frombuffer(data, dtype="<u8", count=count + 1, offset=start)
+            self._file, self._mmap = f, data
+
+    def __len__(self):
+        self._open()
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row):
+        self._open()
+        if not 0 <= row < len(self._offsets) - 1:
+            raise IndexError(row)
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return json.loads(self._mmap[start:end].decode("utf-8"))
+
+    def get_many(self, rows):
+        """여러 행을 조회합니다. FAISS가 결과를 채우지 못한 -1 행은 None을 반환합니다."""
+        return [self[int(row)] if row >= 0 else None for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._offsets = None  # mmap을 참조하는 배열을 먼저 해제
+                self._mmap.close()
+                self._file.close()
+                self._file = self._mmap = None
+
+    def reload(self):
+        self.close()
+        self._open()
+
+
+def convert_json(json_path, store_path):
+    """기존 metadata.json(레코드 리스트)을 저장소 파일로 변환합니다."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    return write_metadata_store(store_path, records)
+
+
+if __name__ == "__main__":
+    count = convert_json(sys.argv[1], sys.argv[2])
+    print(f"{count}개 레코드를 {sys.argv[2]}에 저장했습니다.")
@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0005_alter_questionmeta_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionmeta',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
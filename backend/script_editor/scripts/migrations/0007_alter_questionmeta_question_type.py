@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0006_questionmeta_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='questionmeta',
+            name='question_type',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-16 21:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0007_alter_questionmeta_question_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScriptSentence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('sentence_hash', models.CharField(max_length=64)),
+                ('original', models.TextField()),
+                ('corrected', models.TextField()),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('script', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentences', to='scripts.script')),
+            ],
+            options={
+                'ordering': ['script', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('script', 'position'), name='unique_script_sentence_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def fill_tokens(apps, schema_editor):
+    QuestionJob = apps.get_model("scripts", "QuestionJob")
+    for job in QuestionJob.objects.only("id"):
+        job.token = uuid.uuid4()
+        job.save(update_fields=["token"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scripts', '0009_questionjob'),
+    ]
+
+    # 기존 행마다 서로 다른 token을 넣은 뒤 unique 제약을 겁니다.
+    operations = [
+        migrations.AddField(
+            model_name='questionjob',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='questionjob',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
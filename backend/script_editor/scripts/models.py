@@ -1,5 +1,7 @@
 # scripts/models.py
 
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -18,6 +20,27 @@ class Script(models.Model):
         return f"Script by {self.user.username} at {self.created_at}"
 
 
+class ScriptSentence(models.Model):
+    # 대본의 문장별 교정 결과 (다음 제출 때 바뀌지 않은 문장의 교정을 재사용)
+    script = models.ForeignKey(
+        Script, on_delete=models.CASCADE, related_name="sentences"
+    )  # 문장이 속한 대본 버전
+    position = models.PositiveIntegerField()  # 대본 안에서의 문장 순서
+    sentence_hash = models.CharField(max_length=64)  # 정규화한 원문 문장의 sha256
+    original = models.TextField()  # 원문 문장
+    corrected = models.TextField()  # 교정된 문장
+    tags = models.JSONField(default=list, blank=True)  # 검색된 문법 규칙 태그
+
+    class Meta:
+        ordering = ["script", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["script", "position"], name="unique_script_sentence_position")
+        ]
+
+    def __str__(self):
+        return f"{self.script_id}-{self.position}: {self.original[:30]}"
+
+
 class GrammarRule(models.Model):
     # 문법 규칙 모델
     tag = models.CharField(
@@ -43,12 +66,50 @@ class ExampleSentence(models.Model):
 class QuestionMeta(models.Model):
     # 수능 영어 문제 메타데이터
     id = models.IntegerField(primary_key=True)
-    question_type = models.CharField(max_length=100)  # 문제 유형
+    question_type = models.CharField(max_length=100, db_index=True)  # 문제 유형 (유형별 검색 필터)
     question = models.TextField()              # 문제 본문
     options = models.TextField()                   # 보기 (콤마로 구분된 텍스트)
     vocabulary = models.CharField(max_length=100)   # 어휘
     answer = models.CharField(max_length=10)        # 정답
     explanation = models.TextField()                # 해설
+    content_hash = models.CharField(max_length=64, blank=True, default="")  # 적재 시 변경 여부 확인용 해시
 
     def __str__(self):
         return f"{self.problem_type}: {self.question_text[:50]}"
+
+
+class QuestionJob(models.Model):
+    # 문제 생성(qa.process_question) 백그라운드 작업
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "대기"),
+        (RUNNING, "실행 중"),
+        (SUCCEEDED, "완료"),
+        (FAILED, "실패"),
+    ]
+
+    token = models.UUIDField(
+        default=uuid.uuid4, unique=True, editable=False
+    )  # API에서 작업을 가리키는 추측 불가능한 식별자 (순차 id는 노출하지 않음)
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True
+    )  # 작업을 요청한 사용자 (비로그인 요청은 None)
+    question_text = models.TextField()  # 분석할 원본 문제
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)  # process_question 결과
+    error = models.TextField(blank=True, default="")  # 마지막 실패 사유
+    attempts = models.PositiveIntegerField(default=0)  # 실행 시도 횟수
+    worker_id = models.CharField(max_length=100, blank=True, default="")  # 실행 중인 워커
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # 워커가 마지막으로 살아 있음을 알린 시각
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"], name="question_job_queue")]
+
+    def __str__(self):
+        return f"QuestionJob {self.id} ({self.status})"
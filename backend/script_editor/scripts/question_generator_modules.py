@@ -0,0 +1,37 @@
+"""
+    question-generator 디렉터리의 표준 라이브러리 전용 모듈을 백엔드에서 불러옵니다.
+
+    백엔드와 question-generator는 서로 다른 openai 버전을 쓰는 별도 환경이므로 sys.path에 추가하지
+    않고, 필요한 파일 하나만 경로로 불러옵니다 (llm_scheduler.py, benchmarking.py, telemetry.py).
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Django 설정 없이 실행하는 스크립트(python -m scripts.faiss_index 등)에서 쓰는 기본 위치
+default_question_generator_dir = Path(__file__).resolve().parents[3] / "question-generator"
+
+
+def question_generator_dir():
+    try:
+        return settings.QUESTION_GENERATOR_DIR
+    except ImproperlyConfigured:
+        return default_question_generator_dir
+
+
+def load_module(name):
+    """question-generator/<name>.py를 한 번만 불러와 모듈 객체를 반환합니다."""
+    module_name = f"question_generator_{name}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(
+            module_name, question_generator_dir() / f"{name}.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
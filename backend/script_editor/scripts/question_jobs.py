@@ -0,0 +1,283 @@
+"""
+    문제 생성 작업 대기열과 워커 풀.
+
+    - 작업 상태는 QuestionJob 테이블에 저장 (queued → running → succeeded / failed)
+    - 워커는 조건부 UPDATE(status=queued인 행만)로 작업을 가져가므로 여러 프로세스가 동시에 실행해도
+      같은 작업을 두 번 가져가지 않음
+    - 실행 중에는 heartbeat_at을 주기적으로 갱신하고, QUESTION_JOB_HEARTBEAT_TIMEOUT 동안 갱신이
+      없는 작업(워커 프로세스 중단)은 다시 대기열에 넣음 (QUESTION_JOB_MAX_ATTEMPTS번까지)
+    - job_runner가 QUESTION_JOB_TIMEOUT 안에 응답하지 않으면(LLM 호출 멈춤 등) 프로세스를 종료하고
+      실패로 처리 (heartbeat는 워커 스레드가 보내므로 멈춘 작업도 heartbeat만으로는 재시도되지 않음)
+    - 실제 문제 생성은 question-generator/job_runner.py 프로세스에서 실행
+      (question-generator는 langchain과 openai>=1을 사용하므로 백엔드와 별도 프로세스)
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import subprocess
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from scripts.models import QuestionJob
+from scripts.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+def submit_job(question_text, user=None):
+    """문제 생성 작업을 대기열에 추가합니다."""
+    return QuestionJob.objects.create(question_text=question_text, user=user)
+
+
+def claim_next_job(worker_id):
+    """가장 오래된 대기 작업을 이 워커의 실행 중 작업으로 가져옵니다. 없으면 None"""
+    while True:
+        job_id = (
+            QuestionJob.objects.filter(status=QuestionJob.QUEUED)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = QuestionJob.objects.filter(id=job_id, status=QuestionJob.QUEUED).update(
+            status=QuestionJob.RUNNING,
+            worker_id=worker_id,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return QuestionJob.objects.get(id=job_id)
+        # 다른 워커가 먼저 가져감 → 다음 작업 시도
+
+
+def owned_job(job_id, worker_id):
+    """아직 이 워커가 실행 중인 작업만 갱신하기 위한 queryset"""
+    return QuestionJob.objects.filter(id=job_id, worker_id=worker_id, status=QuestionJob.RUNNING)
+
+
+def heartbeat(job_id, worker_id):
+    """작업이 아직 이 워커의 것이면 heartbeat_at을 갱신하고 True를 반환합니다."""
+    return bool(owned_job(job_id, worker_id).update(heartbeat_at=timezone.now()))
+
+
+def complete_job(job_id, worker_id, result):
+    return bool(
+        owned_job(job_id, worker_id).update(
+            status=QuestionJob.SUCCEEDED, result=result, error="", finished_at=timezone.now()
+        )
+    )
+
+
+def fail_job(job_id, worker_id, error):
+    """시도 횟수가 남아 있으면 다시 대기열에 넣고, 아니면 실패로 기록합니다."""
+    job = owned_job(job_id, worker_id)
+    retried = job.filter(attempts__lt=settings.QUESTION_JOB_MAX_ATTEMPTS).update(
+        status=QuestionJob.QUEUED, worker_id="", heartbeat_at=None, error=error
+    )
+    if not retried:
+        job.update(status=QuestionJob.FAILED, error=error, finished_at=timezone.now())
+
+
+def requeue_stale_jobs(timeout=None):
+    """heartbeat가 timeout초 넘게 끊긴 실행 중 작업을 다시 대기열에 넣습니다 (시도 횟수 초과 시 실패)."""
+    timeout = timeout or settings.QUESTION_JOB_HEARTBEAT_TIMEOUT
+    stale = QuestionJob.objects.filter(
+        status=QuestionJob.RUNNING, heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout)
+    )
+    failed = stale.filter(attempts__gte=settings.QUESTION_JOB_MAX_ATTEMPTS).update(
+        status=QuestionJob.FAILED, error="워커 응답 없음", finished_at=timezone.now()
+    )
+    requeued = stale.update(status=QuestionJob.QUEUED, worker_id="", heartbeat_at=None)
+    if failed or requeued:
+        logger.warning("중단된 작업 처리: 재시도 %d개, 실패 %d개", requeued, failed)
+    return requeued, failed
+
+
+class JobRunnerProcess:
+    """question-generator/job_runner.py 프로세스 하나. 죽으면 다음 작업 때 다시 띄웁니다."""
+
+    def __init__(self, fake_llm=False, fake_latency=0.0, timeout=None):
+        self.args = [
+            str(settings.QUESTION_GENERATOR_PYTHON),
+            "job_runner.py",
+            *(["--fake-llm", "--fake-latency", str(fake_latency)] if fake_llm else []),
+        ]
+        self.timeout = timeout or settings.QUESTION_JOB_TIMEOUT
+        self._process = None
+        self._lines = None
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            self.args,
+            cwd=settings.QUESTION_GENERATOR_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+        # readline()에는 시간 제한이 없으므로 응답 줄은 읽기 스레드가 큐로 넘김 (Windows 파이프에서도 동작)
+        # 큐는 프로세스마다 새로 만들어, 종료한 프로세스의 늦은 응답이 다음 작업의 응답으로 읽히지 않게 함
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._read_lines, args=(self._process.stdout, self._lines), daemon=True
+        ).start()
+
+    @staticmethod
+    def _read_lines(stdout, lines):
+        for line in stdout:
+            lines.put(line)
+        lines.put("")  # 프로세스 종료
+
+    def run(self, question_text):
+        """
+        문제 하나를 실행하고 결과 dict를 반환합니다. 실패하면 RuntimeError,
+        self.timeout초 안에 응답이 없으면 프로세스를 종료하고 TimeoutError
+        """
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        try:
+            request = json.dumps({"question": question_text}, ensure_ascii=False)
+            self._process.stdin.write(request + "\n")
+            self._process.stdin.flush()
+            line = self._lines.get(timeout=self.timeout)
+        except queue.Empty:
+            self.kill()
+            raise TimeoutError(f"job_runner가 {self.timeout}초 안에 응답하지 않았습니다.")
+        except (BrokenPipeError, OSError) as e:
+            line = ""
+            logger.warning("job_runner 통신 실패: %s", e)
+        if not line:
+            self.stop()
+            raise RuntimeError("job_runner 프로세스가 종료되었습니다.")
+        try:
+            response = json.loads(line)
+        except json.JSONDecodeError:
+            # 요청과 응답 줄이 어긋났으므로 다음 작업이 이 응답을 읽지 않도록 프로세스를 다시 띄움
+            self.stop()
+            raise RuntimeError(f"job_runner 응답을 해석할 수 없습니다: {line[:200]!r}")
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def kill(self):
+        """응답하지 않는 프로세스를 바로 종료합니다."""
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+    def stop(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.stdin.close()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+            self._process = None
+
+
+class QuestionWorkerPool:
+    """
+    concurrency개의 워커 스레드가 각자 job_runner 프로세스를 하나씩 맡아 작업을 실행합니다.
+    메인 스레드는 주기적으로 중단된 작업을 다시 대기열에 넣습니다.
+    """
+
+    def __init__(
+        self,
+        concurrency=2,
+        poll_interval=1.0,
+        heartbeat_interval=None,
+        fake_llm=False,
+        fake_latency=0.0,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval or max(
+            1.0, settings.QUESTION_JOB_HEARTBEAT_TIMEOUT / 5
+        )
+        self.fake_llm = fake_llm
+        self.fake_latency = fake_latency
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def _heartbeat_loop(self, job_id, worker_id, done):
+        while not done.wait(self.heartbeat_interval):
+            heartbeat(job_id, worker_id)
+        connections.close_all()
+
+    def _run_job(self, runner, job, worker_id):
+        done = threading.Event()
+        beat = threading.Thread(
+            target=self._heartbeat_loop, args=(job.id, worker_id, done), daemon=True
+        )
+        beat.start()
+        try:
+            # job_runner 안의 분석/생성 단계는 워커 프로세스가 따로 기록 (TELEMETRY_METRICS_PATH 공유)
+            with span(
+                "question_job.run",
+                **{"question_job.id": job.id, "question_job.attempt": job.attempts},
+            ):
+                result = runner.run(job.question_text)
+        except Exception as e:
+            logger.warning("작업 %s 실패 (%d번째 시도): %s", job.id, job.attempts, e)
+            fail_job(job.id, worker_id, str(e))
+        else:
+            if not complete_job(job.id, worker_id, result):
+                logger.warning("작업 %s는 다른 워커에 재할당되어 결과를 버립니다.", job.id)
+        finally:
+            done.set()
+            beat.join()
+
+    def _worker(self, number, drain):
+        worker_id = f"{self.name}-{number}"
+        runner = JobRunnerProcess(self.fake_llm, self.fake_latency)
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                job = claim_next_job(worker_id)
+                if job is None:
+                    if drain:
+                        break  # 대기열이 비면 종료
+                    self._stop.wait(self.poll_interval)
+                    continue
+                self._run_job(runner, job, worker_id)
+        finally:
+            runner.stop()
+            connections.close_all()
+
+    def run(self, drain=False):
+        """
+        워커를 실행합니다. drain=True이면 대기열이 비었을 때 종료하고,
+        아니면 stop()이나 Ctrl+C까지 계속 실행합니다.
+        """
+        requeue_stale_jobs()
+        threads = [
+            threading.Thread(target=self._worker, args=(number, drain), daemon=True)
+            for number in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(self.heartbeat_interval)
+                requeue_stale_jobs()
+        except KeyboardInterrupt:
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+    def stop(self):
+        self._stop.set()
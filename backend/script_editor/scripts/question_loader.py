@@ -0,0 +1,125 @@
+"""
+    수능 문제 CSV/XLSX 파일을 QuestionMeta 테이블에 대량으로 적재하는 모듈.
+
+    - 파일을 batch_size행씩 스트리밍으로 읽음 (CSV: pandas chunksize, XLSX: openpyxl read_only)
+    - id 기준 upsert (bulk_create + update_conflicts), 묶음마다 하나의 트랜잭션
+    - 행 내용의 해시(content_hash)가 DB와 같으면 쓰지 않으므로 여러 번 실행해도 안전
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+from django.db import transaction
+
+from scripts.models import QuestionMeta
+
+# 파일 컬럼 순서 (id, question_type, question, options, vocabulary, answer, explanation)
+QUESTION_FIELDS = ["question_type", "question", "options", "vocabulary", "answer", "explanation"]
+
+
+def clean_value(value):
+    """빈 칸(None, NaN)은 빈 문자열로, 나머지는 문자열로 변환합니다."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # 엑셀의 1.0 → "1"
+    return str(value).strip()
+
+
+def question_content_hash(row):
+    content = json.dumps([row[field] for field in QUESTION_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def make_row(position, values):
+    """
+    파일의 한 행을 QuestionMeta 필드 dict로 변환합니다.
+    id가 비어 있으면(엑셀 일부 행) 데이터 행 순서(0부터)를 id로 사용합니다.
+    """
+    row = {field: clean_value(values.get(field)) for field in QUESTION_FIELDS}
+    question_id = clean_value(values.get("id"))
+    row["id"] = int(question_id) if question_id else position
+    row["content_hash"] = question_content_hash(row)
+    return row
+
+
+def iter_question_batches(path, batch_size=1000):
+    """CSV 또는 XLSX 파일을 batch_size행씩 [row dict, ...] 묶음으로 읽습니다."""
+    position = 0
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [clean_value(cell) for cell in next(rows)]
+            batch = []
+            for values in rows:
+                if all(value is None for value in values):
+                    continue
+                batch.append(make_row(position, dict(zip(header, values))))
+                position += 1
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            workbook.close()
+        return
+
+    for chunk in pd.read_csv(path, chunksize=batch_size, dtype=str, keep_default_na=False):
+        batch = []
+        for values in chunk.to_dict("records"):
+            batch.append(make_row(position, values))
+            position += 1
+        yield batch
+
+
+def load_question_meta(path, batch_size=1000, on_changed=None, progress=None):
+    """
+    파일의 문제를 QuestionMeta에 upsert합니다. 내용이 바뀌지 않은 행은 건너뜁니다.
+
+    bulk_create는 post_save 시그널을 보내지 않으므로, 바뀐 행으로 다른 작업(예: FAISS 인덱스 갱신)을
+    해야 하면 on_changed([row, ...])를 넘기세요. 묶음의 트랜잭션이 커밋된 뒤에 호출됩니다.
+    """
+    started = time.perf_counter()
+    stats = {"rows": 0, "created": 0, "updated": 0, "unchanged": 0}
+
+    for batch in iter_question_batches(path, batch_size):
+        # 같은 파일 안에서 id가 중복되면 마지막 행을 사용
+        batch = list({row["id"]: row for row in batch}.values())
+        with transaction.atomic():
+            existing = dict(
+                QuestionMeta.objects.filter(id__in=[row["id"] for row in batch]).values_list(
+                    "id", "content_hash"
+                )
+            )
+            changed = [row for row in batch if existing.get(row["id"]) != row["content_hash"]]
+            if changed:
+                QuestionMeta.objects.bulk_create(
+                    [QuestionMeta(**row) for row in changed],
+                    update_conflicts=True,
+                    unique_fields=["id"],
+                    update_fields=QUESTION_FIELDS + ["content_hash"],
+                )
+
+        created = sum(1 for row in changed if row["id"] not in existing)
+        stats["rows"] += len(batch)
+        stats["created"] += created
+        stats["updated"] += len(changed) - created
+        stats["unchanged"] += len(batch) - len(changed)
+        if changed and on_changed:
+            on_changed(changed)
+
+        stats["seconds"] = time.perf_counter() - started
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress:
+            progress(dict(stats))
+
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
@@ -0,0 +1,61 @@
+"""
+    사용자 대본의 버전 저장과 문장 단위 증분 교정.
+
+    대본을 제출할 때마다 새 Script 버전을 만들고 문장별 교정 결과를 ScriptSentence로 저장합니다.
+    다음 제출에서는 같은 사용자의 직전 버전과 문장 해시를 비교하여, 새로 추가되었거나 바뀐
+    문장만 LLM으로 교정하고 나머지는 저장된 교정을 재사용합니다.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
+from scripts.correction import correct_text
+from scripts.models import Script, ScriptSentence
+
+
+async def previous_corrections(user):
+    """사용자의 직전 대본 버전의 {sentence_hash: {"corrected", "tags"}}"""
+    previous = await Script.objects.filter(user=user).order_by("-created_at", "-id").afirst()
+    if previous is None:
+        return {}
+    return {
+        sentence.sentence_hash: {"corrected": sentence.corrected, "tags": sentence.tags}
+        async for sentence in ScriptSentence.objects.filter(script=previous)
+    }
+
+
+def save_script_version(user, text, results, audience_level="general"):
+    """교정 결과를 새 Script 버전과 문장별 ScriptSentence로 저장합니다."""
+    with transaction.atomic():
+        script = Script.objects.create(
+            user=user,
+            original_text=text,
+            edited_text=" ".join(result["corrected"] for result in results),
+            audience_level=audience_level,
+        )
+        ScriptSentence.objects.bulk_create(
+            [
+                ScriptSentence(
+                    script=script,
+                    position=result["index"],
+                    sentence_hash=result["sentence_hash"],
+                    original=result["original"],
+                    corrected=result["corrected"],
+                    tags=result["tags"],
+                )
+                for result in results
+            ]
+        )
+    return script
+
+
+async def correct_script(user, text, audience_level="general"):
+    """
+    직전 버전에서 바뀐 문장만 교정하여 새 Script 버전을 저장하고 (script, 문장별 결과)를 반환합니다.
+    edited_text는 재사용한 교정과 새 교정을 문장 순서대로 이어 붙여 만듭니다.
+    """
+    reuse = await previous_corrections(user)
+    results = await correct_text(text, reuse=reuse)
+    # transaction.atomic은 비동기 컨텍스트에서 쓸 수 없으므로 스레드에서 실행
+    script = await sync_to_async(save_script_version)(user, text, results, audience_level)
+    return script, results
@@ -2,48 +2,668 @@ import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import json, csv
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 
-def write_faiss_index():
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = None
+    resource = None
+
+from scripts.embedding_cache import get_embedding_cache
+from scripts.telemetry import span
+from scripts.index_factory import (
+    build_faiss_index,
+    create_faiss_index,
+    extract_ivf,
+    is_exact_index,
+    make_search_params,
+    set_search_params,
+    train_faiss_index,
+)
+
+logger = logging.getLogger(__name__)
+
+# 문제은행 FAISS 인덱스 경로 (실행 위치와 무관하게 db/ 디렉터리를 가리킴)
+db_dir = os.getenv(
+    "QUESTION_BANK_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "db")),
+)
+csv_path = os.path.join(db_dir, "suneung_data.CSV")
+faiss_index_path = os.path.join(db_dir, "faiss_index.index")
+# 이전 형식(행 번호 → id 목록)의 매핑 파일. 인덱스가 IndexIDMap2로 id를 직접 담으므로
+# 새로 만들지 않고, 이전 인덱스를 변환할 때만 읽음
+ids_path = os.path.join(db_dir, "ids.json")
+
+# 문제 본문 임베딩 모델
+model_name = os.getenv("QUESTION_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# 인덱스 타입 (FAISS factory 문자열, 예: "Flat", "IVF256,Flat", "IVF1024,PQ32", "HNSW32")
+index_factory_string = os.getenv("QUESTION_INDEX_FACTORY", "Flat")
+
+# 스트리밍 빌드에서 학습이 필요한 인덱스(IVF, PQ)를 학습할 벡터 수
+train_size = int(os.getenv("QUESTION_INDEX_TRAIN_SIZE", "10000"))
+
+# manage.py compact_question_index --if-needed: 저널에 이만큼 변경이 쌓였을 때만 스냅샷(compaction) 수행
+snapshot_every = int(os.getenv("QUESTION_INDEX_SNAPSHOT_EVERY", "200"))
+
+
+def read_faiss_index(path, mmap=True):
+    """
+    FAISS 인덱스를 읽습니다. mmap=True이면 벡터를 메모리 매핑으로 열어
+    같은 파일을 여는 모든 워커 프로세스가 페이지 캐시의 물리 메모리 한 벌을 공유합니다.
+    """
+    if not mmap:
+        return faiss.read_index(path)
+
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        # Flat 계열 인덱스의 코드 배열까지 mmap으로 여는 플래그 (faiss >= 1.10)
+        flags |= faiss.IO_FLAG_MMAP_IFC
+    try:
+        return faiss.read_index(path, flags)
+    except RuntimeError:
+        # mmap을 지원하지 않는 인덱스 타입이면 일반 로드로 대체
+        logger.warning("mmap을 지원하지 않는 인덱스입니다. 메모리로 로드합니다: %s", path)
+        return faiss.read_index(path)
+
+
+def merge_search_results(results, k, metric=faiss.METRIC_L2):
+    """
+    여러 인덱스의 (distances, labels) 검색 결과를 질문별로 합쳐 top-k만 남깁니다.
+    결과가 모자라 -1로 채워진 칸은 제외합니다.
+    """
+    distances = np.hstack([d for d, _ in results])
+    labels = np.hstack([l for _, l in results])
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        distances = -distances  # 내적은 클수록 가까움
+    merged = []
+    for row_distances, row_labels in zip(distances, labels):
+        order = np.argsort(row_distances, kind="stable")
+        row = [(row_distances[i], row_labels[i]) for i in order if row_labels[i] != -1][:k]
+        if metric == faiss.METRIC_INNER_PRODUCT:
+            row = [(-d, l) for d, l in row]
+        merged.append(row)
+    return merged
+
+
+def read_journal_ops(f, offset):
+    """저널 파일의 offset 이후 완성된 줄들을 읽어 (ops, 읽은 바이트 수)를 반환합니다."""
+    f.seek(offset)
+    data = f.read()
+    # 쓰는 중인 마지막 줄은 다음 번에 읽음
+    complete = data[: data.rfind(b"\n") + 1]
+    ops = [json.loads(line) for line in complete.decode("utf-8").splitlines() if line]
+    return ops, len(complete)
+
+
+class JournalTail:
+    """
+    문제은행 인덱스의 저널을 인코더나 FAISS 스냅샷을 로드하지 않고 따라 읽습니다.
+    저널에서 파생되는 다른 인덱스(BM25 키워드 인덱스)가 임베딩 호출 없이 변경을 반영하는 데 씁니다.
+
+    read()는 마지막으로 읽은 뒤 추가된 변경 목록을 반환합니다. 스냅샷으로 저널이 회전되면
+    회전된 저널(.prev)의 남은 줄부터 이어서 읽고, 어디까지 읽었는지 알 수 없으면(두 번 이상 회전 등)
+    None을 반환합니다. 그때는 원본(DB)에서 다시 만들기 전에 seek_end()를 호출합니다.
+    """
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self._ino = None
+        self._offset = 0
+
+    def _open(self):
+        # 저널이 아직 없으면 빈 파일을 만들어, 읽는 위치를 항상 특정 파일(inode)에 묶어 둠
+        return open(self.journal_path, "ab+")
+
+    def seek_end(self):
+        """지금까지의 변경은 이미 반영된 것으로 보고 저널 끝부터 읽습니다."""
+        with self._open() as f:
+            stat = os.fstat(f.fileno())
+        self._ino, self._offset = stat.st_ino, stat.st_size
+
+    def read(self):
+        with self._open() as f:
+            stat = os.fstat(f.fileno())
+            ops = []
+            if stat.st_ino != self._ino:
+                try:
+                    with open(self.journal_path + ".prev", "rb") as prev:
+                        if os.fstat(prev.fileno()).st_ino != self._ino:
+                            return None
+                        ops, _ = read_journal_ops(prev, self._offset)
+                except FileNotFoundError:
+                    return None
+                self._ino, self._offset = stat.st_ino, 0
+            elif stat.st_size < self._offset:
+                return None
+            new_ops, consumed = read_journal_ops(f, self._offset)
+            self._offset += consumed
+            return ops + new_ops
+
+
+class QuestionIndexRegistry:
+    """
+    프로세스당 한 번만 문제은행 FAISS 인덱스와 SentenceTransformer 인코더를
+    로드하여 모든 검색 요청이 공유하도록 하는 레지스트리.
+
+    인덱스는 QuestionMeta.id를 키로 하는 IndexIDMap2이며 다음 세 부분으로 관리합니다.
+    - main: 마지막 스냅샷 파일 (mmap, 읽기 전용, 모든 워커가 공유)
+    - delta: 스냅샷 이후 추가/수정된 문제의 벡터 (메모리의 작은 Flat 인덱스)
+    - tombstones: main에서 더 이상 유효하지 않은 id (수정/삭제된 문제)
+    추가/수정/삭제는 저널 파일(faiss_index.index.journal)에 한 줄씩 기록만 하고(인코딩 없음),
+    각 워커가 검색할 때 저널의 새 줄을 읽어 인코딩하고 같은 변경을 반영합니다. snapshot()은 main + delta를
+    새 인덱스 파일로 합치고(compaction) 저널을 .prev로 회전시킵니다. 스냅샷은 전체 인덱스를
+    다시 쓰는 동안 검색을 막으므로 요청 경로에서는 하지 않고 manage.py compact_question_index로 실행합니다.
+    모델이나 인덱스 없이 같은 저널을 따라 읽어야 하는 쪽(예: BM25 키워드 인덱스)은 JournalTail을 사용합니다.
+    """
+
+    def __init__(
+        self,
+        index_path=faiss_index_path,
+        ids_path=ids_path,
+        model_name=model_name,
+        mmap=True,
+    ):
+        self.index_path = index_path
+        self.ids_path = ids_path
+        self.journal_path = index_path + ".journal"
+        self.model_name = model_name
+        self.mmap = mmap
+        self._lock = threading.RLock()
+        self._model = None
+        self._main = None
+        self._delta = None
+        self._tombstones = frozenset()
+        self._exclude = None  # tombstones를 제외하는 검색 파라미터 (selector 참조 유지용 튜플)
+        self._index_stat = None
+        self._journal_ino = None  # 읽고 있는 저널 파일 (회전 감지용)
+        self._journal_offset = 0
+        self._journal_ops = 0
+
+    def load_model(self):
+        """인코더만 로드합니다 (인덱스를 새로 만들 때도 재사용)."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def _file_stat(self):
+        stat = os.stat(self.index_path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _journal_stat(self):
+        try:
+            stat = os.stat(self.journal_path)
+            return stat.st_ino, stat.st_size
+        except FileNotFoundError:
+            return None, 0
+
+    def _load_snapshot(self):
+        """스냅샷 파일을 읽고 delta/tombstones를 비운 뒤 저널을 처음부터 다시 적용합니다."""
+        index_stat = self._file_stat()
+        main = read_faiss_index(self.index_path, mmap=self.mmap)
+        if not isinstance(main, faiss.IndexIDMap2):
+            main = self._convert_legacy_index()
+        set_search_params(main)  # nprobe / efSearch (FAISS_NPROBE, FAISS_EF_SEARCH)
+
+        self._main = main
+        self._delta = faiss.IndexIDMap2(faiss.IndexFlat(main.d, main.metric_type))
+        self._set_tombstones(frozenset())
+        self._index_stat = index_stat
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_ops = 0
+        self._replay_journal()
+
+    def _convert_legacy_index(self):
+        """행 번호 → ids.json 매핑을 쓰던 이전 인덱스를 id 기반 IndexIDMap2로 변환합니다 (메모리)."""
+        logger.warning("ids.json 기반 이전 인덱스입니다. write_faiss_index()로 다시 만드는 것을 권장합니다.")
+        with open(self.ids_path, "r", encoding="utf-8") as f:
+            ids = np.asarray([int(i) for i in json.load(f)], dtype=np.int64)
+        base = faiss.read_index(self.index_path)  # reset하려면 mmap이 아닌 메모리 사본이 필요
+        vectors = base.reconstruct_n(0, base.ntotal)
+        base.reset()
+        converted = faiss.IndexIDMap2(base)
+        converted.add_with_ids(vectors, ids)
+        return converted
+
+    def _set_tombstones(self, tombstones):
+        self._tombstones = tombstones
+        if not tombstones:
+            self._exclude = None
+            return
+        batch = faiss.IDSelectorBatch(np.fromiter(tombstones, dtype=np.int64))
+        selector = faiss.IDSelectorNot(batch)
+        self._exclude = (make_search_params(self._main, selector), selector, batch)
+
+    def _replay_journal(self):
+        """다른 워커(또는 이전 프로세스)가 저널에 남긴 변경 중 아직 반영하지 않은 줄을 적용합니다."""
+        ino, size = self._journal_stat()
+        if size <= self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            ops, consumed = read_journal_ops(f, self._journal_offset)
+        self._journal_ino = ino
+        self._apply(ops)
+        self._journal_offset += consumed
+
+    def _apply(self, ops):
+        # "vector": false인 변경(벡터 자동 반영을 끈 상태의 저장)은 키워드 인덱스에만 반영
+        vector_ops = [op for op in ops if op.get("vector", True)]
+        # 추가/수정된 문제 본문은 한 번에 인코딩 (대부분 임베딩 캐시에서 읽힘)
+        texts = [op["text"] for op in vector_ops if op["op"] == "upsert"]
+        vectors = iter(encode_texts(texts) if texts else [])
+
+        tombstones = set(self._tombstones)
+        for op in vector_ops:
+            question_id = np.asarray([op["id"]], dtype=np.int64)
+            # main의 기존 벡터는 무효화하고, delta에는 최신 벡터만 남김
+            tombstones.add(op["id"])
+            self._delta.remove_ids(question_id)
+            if op["op"] == "upsert":
+                self._delta.add_with_ids(next(vectors).reshape(1, -1), question_id)
+        self._set_tombstones(frozenset(tombstones))
+        self._journal_ops += len(ops)
+
+    def _sync(self):
+        """스냅샷 파일이 교체되었거나 저널에 새 줄이 있으면 반영합니다."""
+        ino, size = self._journal_stat()
+        rotated = self._journal_ino is not None and ino != self._journal_ino
+        if self._file_stat() != self._index_stat or rotated or size < self._journal_offset:
+            self._load_snapshot()
+        else:
+            self._replay_journal()
+
+    def load(self):
+        """인덱스와 인코더를 아직 로드하지 않았다면 한 번만 로드하고, 이후에는 변경 사항만 반영합니다."""
+        self.load_model()
+        with self._lock:
+            if self._main is None:
+                self._load_snapshot()
+            else:
+                self._sync()
+        return self
+
+    def reload(self):
+        """인덱스 파일이 다시 쓰였을 때 새로 읽습니다."""
+        with self._lock:
+            self._main = None
+        return self.load()
+
+    def warm_up(self):
+        """서버 시작 시 미리 로드합니다. 인덱스 파일이 없으면 경고만 남깁니다."""
+        try:
+            self.load()
+        except (FileNotFoundError, RuntimeError) as e:
+            logger.warning("문제은행 FAISS 인덱스를 미리 로드하지 못했습니다: %s", e)
+
+    @contextmanager
+    def _journal_lock(self):
+        """저널 추가/스냅샷을 워커 프로세스 사이에서 직렬화합니다 (fcntl이 없는 환경은 프로세스 내부만)."""
+        with self._lock, open(self.journal_path + ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _record(self, ops):
+        """
+        변경을 저널에 추가하기만 합니다. 인코더와 인덱스를 로드하지 않으므로 저장 요청(시그널)에서 불러도
+        모델 로드/인코딩 지연이 없습니다. 인코딩은 다음 검색의 저널 재생이나 compact_question_index에서 합니다.
+        """
+        with self._journal_lock():
+            with open(self.journal_path, "ab") as f:
+                f.write("".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8"))
+
+    def upsert(self, question_id, text, extra_text="", vector=True):
+        """
+        문제 한 개를 추가하거나 본문이 바뀐 문제의 벡터를 교체합니다.
+        extra_text(어휘, 해설)는 벡터에는 쓰이지 않고 저널을 따라 읽는 키워드 인덱스에만 쓰입니다.
+        vector=False이면 저널에 기록만 하고 벡터에는 반영하지 않습니다 (키워드 인덱스 전용).
+        """
+        self.upsert_many([(question_id, text, extra_text)], vector)
+
+    def upsert_many(self, items, vector=True):
+        """[(question_id, text, extra_text), ...]를 한 번에 추가/교체합니다 (대량 적재 후 동기화용)."""
+        if items:
+            self._record(
+                [
+                    self._op("upsert", i, vector, text=text, extra_text=extra_text)
+                    for i, text, extra_text in items
+                ]
+            )
+
+    def remove(self, question_id, vector=True):
+        """문제 한 개를 인덱스에서 제거합니다."""
+        self._record([self._op("remove", question_id, vector)])
+
+    @staticmethod
+    def _op(op, question_id, vector, **fields):
+        entry = {"op": op, "id": int(question_id), **fields}
+        if not vector:
+            entry["vector"] = False
+        return entry
+
+    def rotate_journal(self):
+        """
+        새 스냅샷을 쓴 직후 저널을 .prev로 옮깁니다 (_journal_lock 안에서 호출).
+        키워드 인덱스(JournalTail)는 .prev에서 아직 읽지 않은 변경을 이어서 읽습니다.
+        """
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, self.journal_path + ".prev")
+
+    def snapshot(self):
+        """
+        main에서 tombstones를 뺀 벡터와 delta의 벡터를 합쳐 새 스냅샷 파일을 쓰고 저널을 회전시킵니다.
+        main의 벡터는 reconstruct로 복원하므로 다시 인코딩하지 않습니다
+        (PQ 계열은 압축된 근사 벡터로 복원됨). 학습된 양자화기는 그대로 재사용합니다.
+        """
+        self.load()
+        with self._journal_lock():
+            self._sync()
+            main, delta = self._main, self._delta
+
+            main_ids = faiss.vector_to_array(main.id_map)
+            base = faiss.downcast_index(main.index)
+            ivf = extract_ivf(base)
+            if ivf is not None:
+                ivf.make_direct_map()  # IVF에서 reconstruct_n을 쓰기 위해 필요
+            keep = ~np.isin(main_ids, np.fromiter(self._tombstones, dtype=np.int64))
+            vectors = base.reconstruct_n(0, main.ntotal)[keep] if main.ntotal else np.empty((0, main.d), dtype=np.float32)
+            ids = main_ids[keep]
+
+            if delta.ntotal:
+                vectors = np.vstack([vectors, faiss.downcast_index(delta.index).reconstruct_n(0, delta.ntotal)])
+                ids = np.concatenate([ids, faiss.vector_to_array(delta.id_map)])
+
+            # 학습된 양자화기를 재사용하기 위해 스냅샷을 (mmap 없이) 다시 읽어 비움
+            # (mmap으로 연 인덱스나 그 복제본은 벡터 배열이 뷰라서 reset할 수 없음)
+            compacted = faiss.read_index(self.index_path)
+            compacted.reset()
+            if not isinstance(compacted, faiss.IndexIDMap2):
+                # ids.json을 쓰던 이전 형식이면 _convert_legacy_index와 같이 id 기반으로 감싸 저장
+                compacted = faiss.IndexIDMap2(compacted)
+            if len(ids):
+                compacted.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+
+            # 다른 워커가 기존 파일을 mmap으로 열고 있으므로 임시 파일에 쓴 뒤 교체
+            faiss.write_index(compacted, self.index_path + ".tmp")
+            os.replace(self.index_path + ".tmp", self.index_path)
+            # 새 스냅샷은 id를 직접 담고 있으므로 이전 형식의 매핑 파일은 더 이상 맞지 않음
+            if os.path.exists(self.ids_path):
+                os.remove(self.ids_path)
+            self.rotate_journal()
+            self._load_snapshot()
+
+    def _filtered_params(self, index, allowed, exhaustive=False):
+        """allowed에 있는 id만 검색하는 파라미터 (selector 참조 유지용 튜플)"""
+        batch = faiss.IDSelectorBatch(allowed)
+        return make_search_params(index, batch, exhaustive), batch
+
+    def _search_filtered(self, main, delta, tombstones, query_vectors, k, allowed_ids, exhaustive):
+        allowed = np.fromiter(allowed_ids, dtype=np.int64)
+        results = []
+        with self._lock:  # delta는 다른 스레드가 수정할 수 있음
+            if delta.ntotal:
+                params = self._filtered_params(delta, allowed)
+                results.append(delta.search(query_vectors, k=min(k, delta.ntotal), params=params[0]))
+        if main.ntotal:
+            if tombstones:
+                allowed = allowed[~np.isin(allowed, np.fromiter(tombstones, dtype=np.int64))]
+            params = self._filtered_params(main, allowed, exhaustive)
+            results.append(main.search(query_vectors, k=min(k, main.ntotal), params=params[0]))
+        if not results:
+            return [[] for _ in range(len(query_vectors))]
+        return merge_search_results(results, k, main.metric_type)
+
+    def search(self, query_vectors, k, allowed_ids=None):
+        """
+        main(tombstones 제외)과 delta를 함께 검색해 질문별 [(distance, id), ...] top-k를 반환합니다.
+
+        allowed_ids(예: 특정 question_type의 id 집합)가 주어지면 ID selector로 그 id만 검색하므로
+        전체를 검색한 뒤 걸러내지 않아도 k개를 채웁니다. IVF/HNSW에서 허용된 id가 적어
+        결과가 k개보다 모자라면 전체 리스트/노드를 탐색하도록 한 번 더 검색합니다.
+        검색 한 번을 faiss.search span으로 기록합니다.
+        """
+        with span(
+            "faiss.search",
+            **{
+                "faiss.index": "question",
+                "faiss.queries": len(query_vectors),
+                "faiss.k": k,
+                "faiss.filtered": allowed_ids is not None,
+            },
+        ):
+            return self._search(query_vectors, k, allowed_ids)
+
+    def _search(self, query_vectors, k, allowed_ids=None):
+        self.load()
+        with self._lock:
+            main, delta, exclude, tombstones = self._main, self._delta, self._exclude, self._tombstones
+        if allowed_ids is not None:
+            if not allowed_ids:
+                return [[] for _ in range(len(query_vectors))]
+            matches = self._search_filtered(
+                main, delta, tombstones, query_vectors, k, allowed_ids, exhaustive=False
+            )
+            wanted = min(k, len(allowed_ids))
+            if not is_exact_index(main) and any(len(row) < wanted for row in matches):
+                matches = self._search_filtered(
+                    main, delta, tombstones, query_vectors, k, allowed_ids, exhaustive=True
+                )
+            return matches
+
+        with self._lock:
+            results = []
+            if delta.ntotal:
+                results.append(delta.search(query_vectors, k=min(k, delta.ntotal)))
+        if main.ntotal:
+            if exclude is None:
+                results.append(main.search(query_vectors, k=min(k, main.ntotal)))
+            else:
+                results.append(main.search(query_vectors, k=min(k, main.ntotal), params=exclude[0]))
+        if not results:
+            return [[] for _ in range(len(query_vectors))]
+        return merge_search_results(results, k, main.metric_type)
+
+    @property
+    def model(self):
+        return self.load_model()
+
+    @property
+    def index(self):
+        """마지막 스냅샷 인덱스 (delta에 있는 변경 사항은 포함하지 않음)"""
+        return self.load()._main
+
+    @property
+    def journal_ops(self):
+        """마지막 스냅샷 이후 저널에 쌓인 변경 수"""
+        self.load()
+        return self._journal_ops
+
+    @property
+    def ntotal(self):
+        self.load()
+        return self._main.ntotal + self._delta.ntotal
+
+
+# 프로세스 전역 레지스트리
+registry = QuestionIndexRegistry()
+
+
+def encode_texts(texts):
+    """
+    임베딩 캐시를 거쳐 문장을 인코딩합니다. 캐시에 없는 문장만 모델로 인코딩하므로
+    모든 문장이 캐시에 있으면 인코더를 로드하지도 않습니다.
+    """
+
+    def encode(missing):
+        with span(
+            "embedding.encode",
+            **{"embedding.model": registry.model_name, "embedding.texts": len(missing)},
+        ):
+            return registry.model.encode(missing)
+
+    return get_embedding_cache().get_or_compute(registry.model_name, texts, encode)
+
+
+def publish_question_index(index):
+    """
+    새로 만든 인덱스를 현재 스냅샷으로 교체합니다.
+    실행 중인 워커가 기존 파일을 mmap으로 열고 있으므로 임시 파일에 쓴 뒤 교체합니다.
+    """
+    with registry._journal_lock():
+        faiss.write_index(index, faiss_index_path + ".tmp")
+        os.replace(faiss_index_path + ".tmp", faiss_index_path)
+        # 새 인덱스는 id를 직접 담고 있으므로 이전 형식의 매핑 파일은 더 이상 맞지 않음
+        if os.path.exists(ids_path):
+            os.remove(ids_path)
+        # 새 스냅샷에는 모든 변경이 반영되어 있으므로 저널을 회전
+        registry.rotate_journal()
+    registry.reload()
+
+
+def write_faiss_index(factory_string=index_factory_string):
     data = []
-    with open ('../../db/suneung_data.csv', 'r') as f:
+    with open(csv_path, "r", encoding="utf-8") as f:
         reader = csv.reader(f)
         next(reader)
         data = [{"id": row[0], "question": row[2]} for row in reader]
 
     # 문제 본문 추출 및 임베딩 생성
-    model = SentenceTransformer('all-MiniLM-L6-v2')
     texts = [item["question"] for item in data]
     ids = [item["id"] for item in data]
-    embeddings = model.encode(texts)
+    embeddings = encode_texts(texts)
 
-    # FAISS 인덱스 생성 및 벡터 추가
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(np.array(embeddings).astype('float32'))
+    # FAISS 인덱스 생성 (학습이 필요한 타입이면 학습) 및 QuestionMeta.id를 키로 벡터 추가
+    index = build_faiss_index(
+        np.array(embeddings).astype('float32'), factory_string, ids=[int(i) for i in ids]
+    )
 
-    # FAISS 인덱스 저장
-    faiss.write_index(index, '../../db/faiss_index.index')
+    # FAISS 인덱스 저장 (검색 결과의 label이 곧 QuestionMeta.id)
+    publish_question_index(index)
 
     return ids
 
+
+def iter_question_chunks(path=csv_path, chunk_size=256):
+    """수능 CSV를 chunk_size행씩 읽어 (ids, 문제 본문 목록) 묶음으로 내보냅니다."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        ids, texts = [], []
+        for row in reader:
+            ids.append(int(row[0]))
+            texts.append(row[2])
+            if len(ids) == chunk_size:
+                yield ids, texts
+                ids, texts = [], []
+        if ids:
+            yield ids, texts
+
+
+def peak_memory_mb():
+    """현재 프로세스의 최대 RSS(MB). resource 모듈이 없는 환경(Windows)에서는 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def write_faiss_index_streaming(
+    chunk_size=256, factory_string=index_factory_string, train_size=train_size, progress=None
+):
+    """
+    CSV를 chunk_size행씩 읽어 묶음마다 인코딩하고 바로 인덱스에 추가하는 스트리밍 빌드.
+    코퍼스 전체를 리스트/임베딩 행렬로 들고 있지 않으므로, 인덱스 자체를 제외한 메모리는
+    묶음 크기에 비례합니다. 학습이 필요한 인덱스(IVF, PQ)는 처음 train_size개 벡터를 모아 학습합니다.
+
+    progress(stats)가 주어지면 묶음마다 {"rows", "seconds", "rows_per_second", "peak_memory_mb"}를 전달합니다.
+    """
+    started = time.perf_counter()
+    index = None
+    pending = []  # 학습 전까지 모아 둔 (ids, vectors)
+    rows = 0
+
+    def stats():
+        seconds = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0.0,
+            "peak_memory_mb": peak_memory_mb(),
+        }
+
+    def add_pending():
+        vectors = np.vstack([v for _, v in pending])
+        ids = np.concatenate([np.asarray(i, dtype=np.int64) for i, _ in pending])
+        train_faiss_index(index, vectors)
+        index.add_with_ids(vectors, ids)
+        pending.clear()
+
+    for chunk_ids, texts in iter_question_chunks(csv_path, chunk_size):
+        vectors = encode_texts(texts)
+        if index is None:
+            index = faiss.IndexIDMap2(create_faiss_index(vectors.shape[1], factory_string))
+
+        if index.is_trained:
+            index.add_with_ids(vectors, np.asarray(chunk_ids, dtype=np.int64))
+        else:
+            pending.append((chunk_ids, vectors))
+            if sum(len(i) for i, _ in pending) >= train_size:
+                add_pending()
+
+        rows += len(chunk_ids)
+        if progress:
+            progress(stats())
+
+    if index is None:
+        raise ValueError(f"{csv_path}에 문제가 없습니다.")
+    if pending:
+        add_pending()  # 데이터가 train_size보다 적은 경우 가진 만큼으로 학습
+
+    publish_question_index(index)
+    return stats()
+
 def load_faiss_index():
-    """FAISS 인덱스 및 ID 매핑 로드"""
-    index = faiss.read_index('../../db/faiss_index.index')
-    return index
+    """FAISS 인덱스 로드 (프로세스당 한 번만 디스크에서 읽음)"""
+    return registry.index
 
-def search_faiss_index(query):
-    """사용자가 입력한 질문에 대해 FAISS 인덱스를 검색하여 가장 유사한 질문의 id를 반환"""
-    index = load_faiss_index()
+def search_faiss_index_batch(queries, k=5, allowed_ids=None):
+    """
+    여러 질문을 한 번의 encode 호출로 임베딩하고 한 번의 index.search로 검색하여
+    질문별 top-k 결과 [{"id": ..., "distance": ...}, ...] 목록을 반환
+    allowed_ids가 주어지면 그 id(QuestionMeta.id) 중에서만 검색
+    """
+    if not queries or registry.ntotal == 0:
+        return [[] for _ in queries]
 
-    # 사용자 입력 쿼리 처리
-    query_vector = model.encode([query]).astype('float32')
+    # 쿼리 행렬 한 번에 인코딩
+    query_vectors = encode_texts(list(queries))
 
-    # FAISS 검색 수행
-    distances, indices = index.search(query_vector, k=1)  # 가장 유사한 질문 1개 검색
+    # FAISS 검색 수행 (결과의 label이 곧 QuestionMeta.id)
+    matches = registry.search(query_vectors, k, allowed_ids)
+    return [
+        [{"id": int(label), "distance": float(d)} for d, label in row]
+        for row in matches
+    ]
 
-    # 검색된 id 가져오기 (FAISS 결과 → id 매핑) 4
-    matched_id = ids[indices[0][0]]
-    return matched_id
+def search_faiss_index(query):
+    """사용자가 입력한 질문에 대해 FAISS 인덱스를 검색하여 가장 유사한 질문의 id를 반환"""
+    matches = search_faiss_index_batch([query], k=1)[0]  # 가장 유사한 질문 1개 검색
+    return matches[0]["id"] if matches else None
 
 if __name__ == "__main__":
     query = "The ability to understand emotions"
@@ -1,8 +1,55 @@
 from rest_framework import serializers
-from .models import Script
+from .models import Script, QuestionMeta, QuestionJob
 
 
 class ScriptSerializer(serializers.ModelSerializer):
     class Meta:
         model = Script
         fields = ["id", "original_text", "edited_text", "created_at", "updated_at"]
+
+
+class QuestionMetaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionMeta
+        fields = [
+            "id",
+            "question_type",
+            "question",
+            "options",
+            "vocabulary",
+            "answer",
+            "explanation",
+        ]
+
+
+class QuestionSearchRequestSerializer(serializers.Serializer):
+    # 학습지 단위로 여러 질문을 한 번에 검색
+    queries = serializers.ListField(
+        child=serializers.CharField(), min_length=1, max_length=100
+    )
+    k = serializers.IntegerField(min_value=1, max_value=50, default=5)
+    # vector: FAISS, lexical: BM25 키워드(임베딩 호출 없음), hybrid: 두 결과를 합침
+    mode = serializers.ChoiceField(choices=["vector", "lexical", "hybrid"], default="vector")
+    fusion = serializers.ChoiceField(choices=["rrf", "weighted"], default="rrf")
+    # 주어지면 해당 유형(QuestionMeta.question_type)의 문제 안에서만 검색
+    question_types = serializers.ListField(
+        child=serializers.CharField(), min_length=1, required=False
+    )
+
+
+class QuestionJobRequestSerializer(serializers.Serializer):
+    question = serializers.CharField()  # 분석하고 새 문제를 만들 원본 영어 문제
+
+
+class QuestionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuestionJob
+        fields = [
+            "token",
+            "status",
+            "attempts",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
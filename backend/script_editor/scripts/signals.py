@@ -0,0 +1,57 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import QuestionMeta
+
+logger = logging.getLogger(__name__)
+
+# 검색 인덱스에 들어가는 필드 (question은 벡터, 나머지는 키워드 인덱스에만 사용)
+indexed_fields = ("question", "vocabulary", "explanation")
+
+
+def question_extra_text(vocabulary, explanation):
+    return " ".join(part for part in (vocabulary, explanation) if part)
+
+
+def apply_to_question_index(op, question_id, text=None, extra_text=""):
+    """
+    QuestionMeta 변경을 문제은행 인덱스의 저널에 기록합니다 (인코딩/인덱스 반영은 각 워커가 검색할 때).
+    키워드 인덱스는 이 저널만 읽으므로 벡터 인덱스가 없거나 인코더가 실패해도 반영됩니다.
+    QUESTION_INDEX_AUTO_UPDATE가 꺼져 있으면 벡터에는 반영하지 않는 변경으로 기록합니다.
+    기록에 실패해도 저장 자체는 실패시키지 않습니다.
+    """
+    from .search_question_index import registry  # faiss/모델은 실제로 필요할 때만 임포트
+
+    vector = settings.QUESTION_INDEX_AUTO_UPDATE
+    try:
+        if op == "upsert":
+            registry.upsert(question_id, text, extra_text, vector=vector)
+        else:
+            registry.remove(question_id, vector=vector)
+    except FileNotFoundError:
+        logger.info("문제은행 인덱스 디렉터리가 없어 변경을 기록하지 않습니다 (id=%s)", question_id)
+    except Exception:
+        logger.exception("문제은행 인덱스 저널 기록 실패 (op=%s, id=%s)", op, question_id)
+
+
+@receiver(post_save, sender=QuestionMeta)
+def upsert_question_index(sender, instance, update_fields=None, **kwargs):
+    """문제 본문/어휘/해설이 저장되면 커밋 후 인덱스의 해당 id를 추가/교체"""
+    if update_fields is not None and not set(update_fields) & set(indexed_fields):
+        return  # 검색에 쓰이는 필드가 바뀌지 않은 저장
+    question_id, text = instance.id, instance.question
+    extra_text = question_extra_text(instance.vocabulary, instance.explanation)
+    transaction.on_commit(
+        lambda: apply_to_question_index("upsert", question_id, text, extra_text)
+    )
+
+
+@receiver(post_delete, sender=QuestionMeta)
+def remove_question_index(sender, instance, **kwargs):
+    """문제가 삭제되면 커밋 후 인덱스에서 해당 id 제거"""
+    question_id = instance.id
+    transaction.on_commit(lambda: apply_to_question_index("remove", question_id))
@@ -0,0 +1,80 @@
+"""
+    question-generator/telemetry.py의 span/지표 도구를 백엔드에서 불러옵니다.
+
+    문법 교정 단계, 임베딩, FAISS 검색, DB 쿼리를 span으로 기록하고 소요 시간을 단계별 히스토그램에 더합니다
+    (메모리에만 더하므로 쿼리마다 디스크 쓰기는 없음).
+    TELEMETRY_METRICS_PATH를 같은 파일로 설정하면 Django 프로세스와 문제 생성 워커(job_runner)의 지표가
+    TELEMETRY_FLUSH_INTERVAL초 간격으로 그 파일에 합쳐져 /api/metrics/ 한 곳에 모입니다. OpenTelemetry가 설치되어 있고 OTEL_EXPORTER_OTLP_ENDPOINT가 설정되어
+    있으면 span을 OTLP로도 내보냅니다 (없으면 지표만 기록).
+"""
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from scripts.question_generator_modules import load_module
+
+_module = load_module("telemetry")
+
+span = _module.span
+start_span = _module.start_span
+traced = _module.traced
+current_span = _module.current_span
+record_llm_call = _module.record_llm_call
+count_cache_lookups = _module.count_cache_lookups
+configure_tracing = _module.configure_tracing
+get_metrics = _module.get_metrics
+render_metrics = _module.render_metrics
+STAGE_DURATION = _module.STAGE_DURATION
+
+
+def trace_query(execute, sql, params, many, context):
+    """
+    connection.execute_wrappers에 넣는 DB 쿼리 계측 함수 (ScriptsConfig.ready에서 등록).
+    쿼리마다 db.query span을 남기며, 히스토그램 stage는 db.<select/insert/...>입니다.
+    """
+    operation = sql.lstrip().split(None, 1)[0].lower() if sql.strip() else "query"
+    with span(
+        "db.query",
+        stage=f"db.{operation}",
+        **{
+            "db.system": context["connection"].vendor,
+            "db.operation": operation.upper(),
+            "db.statement": sql,
+            "db.executemany": many,
+        },
+    ):
+        return execute(sql, params, many, context)
+
+
+def finish_request_span(current, request, response):
+    match = request.resolver_match
+    route = match.route if match is not None else "unmatched"
+    current.stage = f"http {request.method} {route}"
+    current.set_attributes({"http.route": route, "http.status_code": response.status_code})
+
+
+@sync_and_async_middleware
+def telemetry_middleware(get_response):
+    """
+    요청 하나를 http.request span으로 기록합니다. 그 안의 교정/검색/DB 쿼리 span은 이 span의 자식이 됩니다.
+    히스토그램 stage는 "http <메서드> <URL 패턴>"입니다 (예: http POST api/search-questions/).
+    스트리밍 응답은 본문을 보내기 전까지의 시간만 기록합니다.
+    비동기 뷰(문법 교정)가 스레드를 거치지 않도록 동기/비동기 요청을 모두 그대로 처리합니다.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with span("http.request", **{"http.method": request.method}) as current:
+                response = await get_response(request)
+                finish_request_span(current, request, response)
+                return response
+
+    else:
+
+        def middleware(request):
+            with span("http.request", **{"http.method": request.method}) as current:
+                response = get_response(request)
+                finish_request_span(current, request, response)
+                return response
+
+    return middleware
@@ -1,3 +1,631 @@
-from django.test import TestCase
+import asyncio
+import functools
+import io
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import faiss
+import numpy as np
+import openai
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from scripts import correction, faiss_index, index_factory, search_question_index, telemetry
+from scripts.benchmarks import benchmarking, fake_vector, offline_environment, run_benchmarks
+from scripts.correction import create_chat_completion
+from scripts.embedding_cache import EmbeddingCache
+from scripts.hybrid_search import hybrid_search_batch
+from scripts.lexical_index import LexicalIndexRegistry
+from scripts.llm_scheduler import BATCH, LLMScheduler
+from scripts.models import QuestionJob, QuestionMeta
+from scripts.question_jobs import (
+    JobRunnerProcess,
+    QuestionWorkerPool,
+    claim_next_job,
+    fail_job,
+    heartbeat,
+    requeue_stale_jobs,
+    submit_job,
+)
+
+
+def question_generator_available():
+    """QUESTION_GENERATOR_PYTHON에 question-generator 의존성(langchain)이 설치되어 있는지"""
+    try:
+        return (
+            subprocess.run(
+                [str(settings.QUESTION_GENERATOR_PYTHON), "-c", "import langchain_core, qa"],
+                cwd=settings.QUESTION_GENERATOR_DIR,
+                capture_output=True,
+                timeout=60,
+            ).returncode
+            == 0
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+class OfflineBenchmarkTests(TestCase):
+    """가짜 임베딩으로 벤치마크를 실행하여 단계별 호출 수가 기대한 만큼인지 확인합니다."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.rows, cls.queries, cls.grammar_rows = 30, 5, 250
+        cls.results = run_benchmarks(
+            rows=cls.rows, queries=cls.queries, grammar_rows=cls.grammar_rows
+        )
+
+    def test_index_build_encodes_in_one_call(self):
+        self.assertEqual(self.results["write_faiss_index"]["calls"], {"question_embedding": 1})
+
+    def test_batch_search_encodes_once(self):
+        self.assertEqual(
+            self.results["search_faiss_index"]["calls"], {"question_embedding": self.queries}
+        )
+        self.assertEqual(
+            self.results["search_faiss_index_batch"]["calls"], {"question_embedding": 1}
+        )
+
+    def test_grammar_embeddings_are_batched(self):
+        expected = math.ceil(self.grammar_rows / faiss_index.embedding_batch_size)
+        self.assertEqual(
+            self.results["add_json_data_to_faiss_index"]["calls"], {"grammar_embedding": expected}
+        )
+
+    def test_metadata_load_is_rolled_back(self):
+        result = self.results["save_metadata_to_db"]
+        self.assertEqual(result["extra"]["created"], self.rows)
+        self.assertGreater(result["calls"]["db_queries"], 0)
+        self.assertFalse(QuestionMeta.objects.exists())
+
+    def test_compare_reports_more_calls_as_regression(self):
+        baseline = {"search": {"seconds": 1.0, "peak_kb": 10, "calls": {"embedding": 1}}}
+        results = {"search": {"seconds": 1.1, "peak_kb": 10, "calls": {"embedding": 2}}}
+        self.assertEqual(
+            benchmarking.compare(results, baseline), ["search: embedding 호출 1 → 2"]
+        )
+        results["search"]["calls"]["embedding"] = 1
+        self.assertEqual(benchmarking.compare(results, baseline), [])
+
+
+def fake_embeddings(texts):
+    return np.stack([fake_vector(text, 8) for text in texts])
+
+
+def fill_embedding_cache(cache_dir, rounds):
+    """작은 캐시에 새 텍스트를 계속 넣어 LRU 행을 비우고 덮어쓰게 합니다 (다른 프로세스에서 실행)."""
+    cache = EmbeddingCache(cache_dir=cache_dir, max_megabytes=16 * 8 * 4 / 1024 / 1024)
+    for i in range(rounds):
+        cache.get_or_compute("m", [f"writer {i} {j}" for j in range(4)], fake_embeddings)
+
+
+class EmbeddingCacheTests(TestCase):
+    """여러 프로세스가 같은 캐시를 쓸 때 다른 텍스트의 벡터가 반환되지 않는지 확인합니다."""
+
+    @skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork가 필요합니다")
+    def test_concurrent_eviction_never_returns_another_texts_vector(self):
+        cache_dir = tempfile.mkdtemp(prefix="embedding-cache-")
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        cache = EmbeddingCache(cache_dir=cache_dir, max_megabytes=16 * 8 * 4 / 1024 / 1024)
+        texts = [f"reader {i}" for i in range(8)]
+        expected = fake_embeddings(texts)
+
+        writer = multiprocessing.get_context("fork").Process(
+            target=fill_embedding_cache, args=(cache_dir, 2000)
+        )
+        writer.start()
+        self.addCleanup(writer.join)
+        rounds = 0
+        while writer.is_alive() or rounds < 50:
+            np.testing.assert_array_equal(cache.get_or_compute("m", texts, fake_embeddings), expected)
+            rounds += 1
+        self.assertEqual(writer.exitcode, 0)
+
+
+class GrammarIndexTests(TestCase):
+    """문법 오류 인덱스도 문제은행 인덱스와 같은 검색 파라미터(nprobe/efSearch)로 로드되는지 확인합니다."""
+
+    def test_search_params_are_applied_on_load(self):
+        workdir = tempfile.mkdtemp(prefix="grammar-index-")
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        vectors = np.random.default_rng(0).standard_normal((200, 16)).astype(np.float32)
+        index = index_factory.build_faiss_index(vectors, "IVF8,Flat")
+        path = os.path.join(workdir, "grammar.index")
+        faiss.write_index(index, path)
+
+        set_params = functools.partial(index_factory.set_search_params, nprobe=4)
+        with mock.patch.object(correction, "set_search_params", set_params):
+            loaded = correction.GrammarIndex(index_path=path, metadata_path=path + ".meta").index
+        self.assertEqual(faiss.extract_index_ivf(loaded).nprobe, 4)
+
+
+class QuestionIndexJournalTests(TestCase):
+    """문제은행 인덱스의 저널(추가/수정/삭제) 반영과 스냅샷(compaction)을 가짜 임베딩으로 확인합니다."""
+
+    def setUp(self):
+        workdir = tempfile.mkdtemp(prefix="question-index-")
+        self.addCleanup(shutil.rmtree, workdir, ignore_errors=True)
+        environment = offline_environment(workdir, benchmarking.CallCounter(), rows=10)
+        environment.__enter__()
+        self.addCleanup(environment.__exit__, None, None, None)
+        search_question_index.write_faiss_index()
+        self.registry = search_question_index.registry
+
+    def search(self, text, k=10):
+        return [match["id"] for match in search_question_index.search_faiss_index_batch([text], k=k)[0]]
+
+    def test_upsert_is_searchable_before_snapshot(self):
+        self.registry.upsert(1000, "A brand new passage about migrating birds.")
+        self.assertEqual(self.search("A brand new passage about migrating birds.", k=1), [1000])
+        self.assertEqual(self.registry.journal_ops, 1)
+        self.assertEqual(self.registry.ntotal, 11)
+
+    def test_remove_tombstones_snapshot_vector(self):
+        self.registry.remove(3)
+        self.assertNotIn(3, self.search("anything", k=20))
+        self.assertIn(3, self.registry._tombstones)
+        self.assertEqual(self.registry.index.ntotal, 10)  # 스냅샷은 그대로
+
+    def test_record_does_not_snapshot(self):
+        for i in range(5):
+            self.registry.upsert(2000 + i, f"passage {i}")
+        self.assertTrue(os.path.exists(self.registry.journal_path))
+        self.assertEqual(self.registry.index.ntotal, 10)
+
+    def test_snapshot_compacts_and_rotates_journal(self):
+        self.registry.upsert(1000, "A brand new passage about migrating birds.")
+        self.registry.remove(3)
+        self.registry.snapshot()
+
+        self.assertFalse(os.path.exists(self.registry.journal_path))
+        self.assertTrue(os.path.exists(self.registry.journal_path + ".prev"))
+        self.assertEqual(self.registry.journal_ops, 0)
+        self.assertEqual(self.registry._tombstones, frozenset())
+        self.assertEqual(self.registry.index.ntotal, 10)
+        ids = set(search_question_index.faiss.vector_to_array(self.registry.index.id_map))
+        self.assertIn(1000, ids)
+        self.assertNotIn(3, ids)
+        self.assertEqual(self.search("A brand new passage about migrating birds.", k=1), [1000])
+
+    def test_lexical_search_follows_journal_without_encoder(self):
+        QuestionMeta.objects.create(
+            id=1, question_type="어법", question="Birds migrate south.", options="", vocabulary="",
+            answer="1", explanation="",
+        )
+        lexical_registry = LexicalIndexRegistry()
+        offline = mock.patch.multiple(
+            search_question_index,
+            encode_texts=mock.Mock(side_effect=AssertionError("encode_texts")),
+            SentenceTransformer=mock.Mock(side_effect=AssertionError("SentenceTransformer")),
+        )
+        with mock.patch("scripts.hybrid_search.lexical_registry", lexical_registry):
+            with offline, mock.patch.object(self.registry, "load", side_effect=AssertionError("load")):
+                results = hybrid_search_batch(["birds"], mode="lexical")
+            self.assertEqual([match["id"] for match in results[0]], [1])
+
+            self.registry.upsert(1000, "Whales sing to each other.")
+            self.registry.remove(1)
+            self.registry.snapshot()  # 저널 회전 후에도 .prev에서 이어 읽음
+            self.registry.upsert(1001, "Whales dive deep.")
+            with offline, mock.patch.object(self.registry, "load", side_effect=AssertionError("load")):
+                whales = hybrid_search_batch(["whales"], mode="lexical")[0]
+                birds = hybrid_search_batch(["birds"], mode="lexical")[0]
+        self.assertEqual({match["id"] for match in whales}, {1000, 1001})
+        self.assertEqual(birds, [])
+
+    def test_snapshot_converts_legacy_index(self):
+        # 배포된 db/faiss_index.index와 같은 이전 형식: IndexFlatL2 + 행 번호 → id 매핑(ids.json)
+        ids = [int(i) for i in faiss.vector_to_array(self.registry.index.id_map)]
+        vectors = faiss.downcast_index(self.registry.index.index).reconstruct_n(0, len(ids))
+        legacy = faiss.IndexFlatL2(vectors.shape[1])
+        legacy.add(vectors)
+        faiss.write_index(legacy, self.registry.index_path)
+        with open(self.registry.ids_path, "w", encoding="utf-8") as f:
+            json.dump([str(i) for i in ids], f)
+        with self.assertLogs("scripts.search_question_index", level="WARNING"):
+            self.registry.reload()
+
+        self.registry.remove(ids[0])
+        self.registry.snapshot()
+
+        snapshot = faiss.read_index(self.registry.index_path)
+        self.assertIsInstance(snapshot, faiss.IndexIDMap2)
+        self.assertEqual(sorted(faiss.vector_to_array(snapshot.id_map)), sorted(ids[1:]))
+        self.assertFalse(os.path.exists(self.registry.ids_path))
+
+    def offline_registry(self):
+        """저장 경로에서 인코더/인덱스를 로드하면 실패하도록 막습니다."""
+        return mock.patch.multiple(
+            self.registry,
+            load=mock.Mock(side_effect=AssertionError("load")),
+            load_model=mock.Mock(side_effect=AssertionError("load_model")),
+        )
+
+    def test_saving_question_only_appends_to_journal(self):
+        with self.offline_registry(), self.captureOnCommitCallbacks(execute=True):
+            question = QuestionMeta.objects.create(
+                id=1000, question_type="어법", question="A brand new passage about migrating birds.",
+                options="", vocabulary="", answer="1", explanation="",
+            )
+        with open(self.registry.journal_path, encoding="utf-8") as f:
+            self.assertEqual([json.loads(line)["id"] for line in f], [1000])
+
+        # 다음 검색에서 인코딩되어 반영됨
+        self.assertEqual(self.search("A brand new passage about migrating birds.", k=1), [1000])
+
+        with self.offline_registry(), self.captureOnCommitCallbacks(execute=True):
+            question.delete()
+        self.assertNotIn(1000, self.search("A brand new passage about migrating birds."))
+        self.assertIn(1000, self.registry._tombstones)
+
+        call_command("compact_question_index", stdout=io.StringIO())
+        self.assertFalse(os.path.exists(self.registry.journal_path))
+        self.assertEqual(self.registry._tombstones, frozenset())
+        self.assertNotIn(1000, set(faiss.vector_to_array(self.registry.index.id_map)))
+
+    @override_settings(QUESTION_INDEX_AUTO_UPDATE=False)
+    def test_lexical_search_sees_saves_without_vector_index(self):
+        lexical_registry = LexicalIndexRegistry()
+        lexical_registry.sync()  # 저장 전에 DB에서 만들어 두어, 저장은 저널로만 전달되게 함
+        os.remove(self.registry.index_path)
+        with self.offline_registry(), self.captureOnCommitCallbacks(execute=True):
+            QuestionMeta.objects.create(
+                id=1000, question_type="어법", question="Whales sing to each other.",
+                options="", vocabulary="", answer="1", explanation="",
+            )
+        with mock.patch("scripts.hybrid_search.lexical_registry", lexical_registry):
+            results = hybrid_search_batch(["whales"], mode="lexical")
+        self.assertEqual([match["id"] for match in results[0]], [1000])
+        with open(self.registry.journal_path, encoding="utf-8") as f:
+            self.assertIs(json.loads(f.readline())["vector"], False)
+
+    def test_every_search_mode_returns_higher_is_better_scores(self):
+        QuestionMeta.objects.create(
+            id=3, question_type="어법", question="Birds migrate south.", options="", vocabulary="",
+            answer="1", explanation="",
+        )
+        with mock.patch("scripts.hybrid_search.registry", self.registry), mock.patch(
+            "scripts.hybrid_search.lexical_registry", LexicalIndexRegistry()
+        ):
+            for mode in ("vector", "lexical", "hybrid"):
+                response = self.client.post(
+                    "/api/search-questions/",
+                    {"queries": ["Birds migrate south."], "k": 3, "mode": mode},
+                    content_type="application/json",
+                )
+                items = response.json()["results"][0]["results"]
+                scores = [item["score"] for item in items]
+                self.assertTrue(scores, mode)
+                self.assertEqual(scores, sorted(scores, reverse=True), mode)
+                if mode == "vector":
+                    self.assertEqual(scores, [-item["distance"] for item in items])
+                else:
+                    self.assertIsNone(items[0]["distance"])
+
+
+class TelemetryTests(TestCase):
+    """단계별 span이 지표에 기록되고 /api/metrics/에 Prometheus 형식으로 나오는지 확인합니다."""
+
+    def setUp(self):
+        patcher = mock.patch.object(telemetry._module, "_metrics", telemetry._module.MetricsStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stage_count(self, stage):
+        samples = telemetry.get_metrics().samples().get(telemetry.STAGE_DURATION, {})
+        return sum(
+            values["count"] for labels, values in samples.items() if f'"stage": "{stage}"' in labels
+        )
+
+    def test_search_records_embedding_and_faiss_stages(self):
+        run_benchmarks(rows=10, queries=2, grammar_rows=10)
+        self.assertGreater(self.stage_count("faiss.search"), 0)
+        self.assertGreater(self.stage_count("embedding"), 0)
+        self.assertGreater(self.stage_count("embedding.encode"), 0)
+        self.assertGreater(self.stage_count("embedding.request"), 0)
+
+    def test_db_queries_are_traced(self):
+        QuestionMeta.objects.count()
+        self.assertGreater(self.stage_count("db.select"), 0)
+
+    def test_llm_call_records_model_and_tokens(self):
+        async def fake_acreate(**kwargs):
+            return {
+                "model": kwargs["model"],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+                "choices": [],
+            }
+
+        async def call():
+            with telemetry.span("correction.rewrite"):
+                with mock.patch.object(openai.ChatCompletion, "acreate", fake_acreate):
+                    await create_chat_completion(
+                        model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}]
+                    )
+
+        asyncio.run(call())
+        self.assertEqual(self.stage_count("correction.rewrite.llm"), 1)
+        self.assertEqual(self.stage_count("llm_scheduler.wait"), 1)
+        tokens = telemetry.get_metrics().samples()["llm_tokens_total"]
+        self.assertEqual(tokens['{"model": "gpt-3.5-turbo", "type": "prompt"}'][""], 12)
+        self.assertEqual(tokens['{"model": "gpt-3.5-turbo", "type": "completion"}'][""], 3)
+
+    def test_metrics_endpoint_renders_histograms(self):
+        with telemetry.span("correction.search"):
+            pass
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.content.decode("utf-8")
+        self.assertIn("# TYPE stage_duration_seconds histogram", body)
+        self.assertIn(
+            'stage_duration_seconds_bucket{stage="correction.search",status="ok",le="+Inf"} 1', body
+        )
+
+
+class FakeClock:
+    """LLMScheduler에 넣는 가짜 시계. sleep()은 기다리지 않고 시각만 앞으로 옮깁니다."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class LLMSchedulerTests(TestCase):
+    """가짜 시계로 RPM/TPM 버킷의 충전, interactive FIFO, batch 우선순위를 결정적으로 확인합니다."""
+
+    messages = [{"role": "user", "content": "hello"}]
+
+    def scheduler(self, **kwargs):
+        self.clock = FakeClock()
+        options = {"rpm": 60, "tpm": 0, "burst_seconds": 2, "interactive_reserve": 0.2, "batch_max_wait": 5}
+        return LLMScheduler(path="", clock=self.clock, sleep=self.clock.sleep, **(options | kwargs))
+
+    def test_request_bucket_refills_up_to_burst(self):
+        scheduler = self.scheduler()  # 초당 1개, 최대 2개
+        self.assertEqual([scheduler.reserve("gpt-4", 1) for _ in range(3)], [0.0, 0.0, 1.0])
+        self.clock.now += 60
+        # 오래 쉬어도 burst_seconds 분량까지만 모임
+        self.assertEqual([scheduler.reserve("gpt-4", 1) for _ in range(3)], [0.0, 0.0, 1.0])
+
+    def test_token_bucket_refills_at_tpm_rate(self):
+        scheduler = self.scheduler(rpm=0, tpm=600, burst_seconds=1)  # 초당 10토큰, 최대 10토큰
+        self.assertEqual(scheduler.reserve("gpt-4", 10), 0.0)
+        self.assertEqual(scheduler.reserve("gpt-4", 5), 0.5)
+        self.clock.now += 1.5
+        self.assertEqual(scheduler.reserve("gpt-4", 5), 0.0)
+        # 버킷보다 큰 호출은 버킷 전체(10토큰)만큼만 차감: 잔량 5 → -5
+        self.assertEqual(scheduler.reserve("gpt-4", 1000), 0.5)
+        # 모델마다 버킷이 따로
+        self.assertEqual(scheduler.reserve("gpt-3.5-turbo", 10), 0.0)
+
+    def test_interactive_calls_are_admitted_in_arrival_order(self):
+        scheduler = self.scheduler()
+        self.assertEqual([scheduler.reserve("gpt-4", 1) for _ in range(5)], [0.0, 0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(scheduler.acquire("gpt-4", messages=self.messages), 4.0)
+        self.assertEqual(self.clock.now, 1004.0)
+        self.assertEqual(scheduler.stats()["interactive"]["calls"], 1)
+
+    def test_batch_calls_use_only_leftover_capacity(self):
+        scheduler = self.scheduler(burst_seconds=10)  # 최대 10개, interactive 몫 2개
+        waits = [scheduler.try_reserve_leftover("gpt-4", 1) for _ in range(9)]
+        # 잔량 10 → 3까지 8개만 나가고, 다음 호출은 차감 없이 잔량이 3이 될 때까지 기다림
+        self.assertEqual(waits, [0.0] * 8 + [1.0])
+        self.assertEqual(scheduler.try_reserve_leftover("gpt-4", 1), 1.0)
+        # 남겨 둔 몫으로 interactive 호출은 바로 나감
+        self.assertEqual([scheduler.reserve("gpt-4", 1) for _ in range(2)], [0.0, 0.0])
+        self.assertEqual(scheduler.reserve("gpt-4", 1), 1.0)
+
+    def test_waiting_batch_call_is_promoted_after_max_wait(self):
+        scheduler = self.scheduler()
+        for _ in range(12):  # 잔량 2 - 12 = -10
+            scheduler.reserve("gpt-4", 1)
+        waited = scheduler.acquire("gpt-4", messages=self.messages, priority=BATCH)
+        # batch_max_wait(5초) 동안 남는 한도가 없어 interactive 줄 끝(잔량 -5 → -6)에 서서 6초 더 기다림
+        self.assertEqual(waited, 11.0)
+        self.assertEqual(scheduler.promoted, 1)
+        self.assertEqual(scheduler.stats()["batch"]["calls"], 1)
+        # 승격된 호출 뒤에 온 interactive 호출은 그 뒤에 나감
+        self.assertEqual(scheduler.reserve("gpt-4", 1), 1.0)
+
+    def test_batch_call_without_leftover_waits_for_refill(self):
+        scheduler = self.scheduler(interactive_reserve=0.25, batch_max_wait=60)
+        scheduler.reserve("gpt-4", 1)
+        scheduler.reserve("gpt-4", 1)  # 잔량 0
+        waited = scheduler.acquire("gpt-4", messages=self.messages, priority=BATCH)
+        # 1개 + interactive 몫 0.5개가 찰 때까지 기다린 뒤, 잔량을 음수로 만들지 않고 나감
+        self.assertEqual(waited, 1.5)
+        self.assertEqual(scheduler.promoted, 0)
+        self.assertEqual(scheduler.reserve("gpt-4", 1), 0.5)
+
+
+class CorrectionStreamTests(TestCase):
+    """스트리밍 교정이 도중에 실패하면 연결을 그냥 끊지 않고 error 이벤트를 보내는지 확인합니다."""
+
+    async def test_failure_mid_stream_sends_error_event(self):
+        async def failing_corrections(text, reuse=None):
+            yield {
+                "index": 0, "original": "a", "corrected": "a", "tags": [], "sentence_hash": "", "reused": False
+            }
+            raise openai.error.APIError("boom")
+
+        with mock.patch("scripts.views.iter_corrections", failing_corrections):
+            with self.assertLogs("scripts.views", level="ERROR"):
+                response = await AsyncClient().post(
+                    "/api/process-user-text/stream/", {"text": "a. b."}, content_type="application/json"
+                )
+                body = "".join([chunk.decode("utf-8") async for chunk in response.streaming_content])
+
+        self.assertIn("event: sentence", body)
+        self.assertIn("event: error", body)
+        self.assertNotIn("event: done", body)
+
+
+class QuestionAnalysisTests(TestCase):
+    """question-generator의 qa.QuestionAnalysisAgent를 가짜 LLM으로 QUESTION_GENERATOR_PYTHON에서 실행합니다."""
+
+    script = """
+import json
+from unittest import mock
+
+from langchain_core.agents import AgentAction
+
+import qa
+from fake_llm import FakeChatModel
+
+question = "Choose the grammatically correct sentence."
+agent = qa.QuestionAnalysisAgent(FakeChatModel(), workers=1)
+steps = [
+    (AgentAction("analyze_grammar", "a different question", ""), "stale grammar"),
+    (AgentAction("analyze_topic", " " + question + "\\n", ""), "reused topic"),
+    (AgentAction("analyze_difficulty", {"question": question}, ""), "reused difficulty"),
+]
+agent.agent_executor = mock.Mock()
+agent.agent_executor.invoke.return_value = {"input": question, "output": "", "intermediate_steps": steps}
+print(json.dumps(agent.analyze(question, mode="agent")))
+"""
+
+    @skipUnless(question_generator_available(), "question-generator 의존성이 없습니다")
+    def test_agent_reuses_only_observations_for_the_same_question(self):
+        completed = subprocess.run(
+            [str(settings.QUESTION_GENERATOR_PYTHON), "-c", self.script],
+            cwd=settings.QUESTION_GENERATOR_DIR,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        analysis = json.loads(completed.stdout.strip().splitlines()[-1])
+        self.assertEqual(analysis["topic_analysis"], "reused topic")
+        self.assertEqual(analysis["difficulty_level"], "reused difficulty")
+        # 다른 입력으로 호출된 결과는 버리고 이 문제로 도구를 다시 호출
+        self.assertNotEqual(analysis["grammar_analysis"], "stale grammar")
+        self.assertIn("[offline]", analysis["grammar_analysis"])
+
+
+class QuestionJobTests(TransactionTestCase):
+    """
+    문제 생성 작업의 가져가기/heartbeat/재시도/실패 처리를 확인합니다.
+    워커 풀 테스트는 가짜 LLM(--fake-llm)으로 실제 job_runner 프로세스를 실행합니다.
+    """
+
+    def test_claim_is_exclusive(self):
+        job = submit_job("question")
+        claimed = claim_next_job("worker-1")
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual((claimed.status, claimed.attempts), (QuestionJob.RUNNING, 1))
+        self.assertIsNone(claim_next_job("worker-2"))
+
+    def get_job(self, token, suffix="", user=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"} if user else {}
+        return self.client.get(f"/api/question-jobs/{token}/{suffix}", **headers)
+
+    def test_job_is_addressed_by_token_not_id(self):
+        response = self.client.post(
+            "/api/question-jobs/", {"question": "question"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertNotIn("id", response.json())
+        job = QuestionJob.objects.get()
+        self.assertEqual(response.json()["token"], str(job.token))
+        self.assertEqual(self.get_job(job.token).status_code, 200)
+        self.assertEqual(self.client.get(f"/api/question-jobs/{job.id}/").status_code, 404)
+
+    def test_other_users_job_is_not_found(self):
+        owner = User.objects.create_user("owner", password="pw")
+        other = User.objects.create_user("other", password="pw")
+        job = submit_job("question", user=owner)
+        QuestionJob.objects.filter(id=job.id).update(status=QuestionJob.SUCCEEDED, result={"ok": True})
+
+        for suffix in ("", "result/"):
+            self.assertEqual(self.get_job(job.token, suffix, user=other).status_code, 404)
+            self.assertEqual(self.get_job(job.token, suffix).status_code, 404)
+        response = self.get_job(job.token, "result/", user=owner)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["result"], {"ok": True})
+
+    def test_heartbeat_only_for_owner(self):
+        job = submit_job("question")
+        claim_next_job("worker-1")
+        self.assertTrue(heartbeat(job.id, "worker-1"))
+        self.assertFalse(heartbeat(job.id, "worker-2"))
+
+    def test_stale_job_is_requeued_until_max_attempts(self):
+        job = submit_job("question")
+        for attempt in range(1, settings.QUESTION_JOB_MAX_ATTEMPTS + 1):
+            claim_next_job("worker-1")
+            QuestionJob.objects.filter(id=job.id).update(
+                heartbeat_at=timezone.now() - timedelta(seconds=120)
+            )
+            with self.assertLogs("scripts.question_jobs", level="WARNING"):
+                requeue_stale_jobs(timeout=60)
+            job.refresh_from_db()
+            expected = QuestionJob.QUEUED if attempt < settings.QUESTION_JOB_MAX_ATTEMPTS else QuestionJob.FAILED
+            self.assertEqual(job.status, expected)
+        self.assertEqual(job.attempts, settings.QUESTION_JOB_MAX_ATTEMPTS)
+
+    @override_settings(QUESTION_JOB_MAX_ATTEMPTS=2)
+    def test_fail_job_retries_then_fails(self):
+        job = submit_job("question")
+        claim_next_job("worker-1")
+        fail_job(job.id, "worker-1", "error 1")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker_id), (QuestionJob.QUEUED, ""))
+        claim_next_job("worker-1")
+        fail_job(job.id, "worker-1", "error 2")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (QuestionJob.FAILED, "error 2"))
+
+    def test_unparsable_reply_restarts_runner(self):
+        runner = JobRunnerProcess()
+        runner.args = [sys.executable, "-c", "import sys\nfor line in sys.stdin: print('oops', flush=True)"]
+        self.addCleanup(runner.stop)
+        with self.assertRaisesRegex(RuntimeError, "해석할 수 없습니다"):
+            runner.run("question")
+        self.assertIsNone(runner._process)
+
+    def test_hung_runner_times_out(self):
+        runner = JobRunnerProcess(timeout=0.5)
+        runner.args = [sys.executable, "-c", "import sys, time\nsys.stdin.readline()\ntime.sleep(60)"]
+        self.addCleanup(runner.stop)
+        with self.assertRaises(TimeoutError):
+            runner.run("question")
+        self.assertIsNone(runner._process)
+
+    @skipUnless(question_generator_available(), "question-generator 의존성이 없습니다")
+    def test_worker_pool_runs_job_with_fake_llm(self):
+        job = submit_job("Choose the grammatically correct sentence.")
+        QuestionWorkerPool(concurrency=1, poll_interval=0.1, fake_llm=True).run(drain=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuestionJob.SUCCEEDED, job.error)
+        self.assertTrue(job.result)
+
+    @skipUnless(question_generator_available(), "question-generator 의존성이 없습니다")
+    @override_settings(QUESTION_JOB_TIMEOUT=2, QUESTION_JOB_MAX_ATTEMPTS=1)
+    def test_worker_pool_fails_hung_job(self):
+        job = submit_job("Choose the grammatically correct sentence.")
+        with self.assertLogs("scripts.question_jobs", level="WARNING"):
+            QuestionWorkerPool(concurrency=1, poll_interval=0.1, fake_llm=True, fake_latency=60).run(
+                drain=True
+            )
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuestionJob.FAILED)
+        self.assertIn("응답하지 않았습니다", job.error)
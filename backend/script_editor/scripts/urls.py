@@ -1,10 +1,38 @@
 from django.urls import path
 from .views import (
+    MetricsView,
     ProcessUserTextAPIView,
+    ProcessUserTextStreamAPIView,
+    QuestionJobResultAPIView,
+    QuestionJobStatusAPIView,
+    QuestionJobSubmitAPIView,
+    SearchQuestionsAPIView,
 )
 
 urlpatterns = [
     path(
         "process-user-text/", ProcessUserTextAPIView.as_view(), name="process-user-text"
     ),
+    path(
+        "process-user-text/stream/",
+        ProcessUserTextStreamAPIView.as_view(),
+        name="process-user-text-stream",
+    ),
+    path(
+        "search-questions/", SearchQuestionsAPIView.as_view(), name="search-questions"
+    ),
+    path(
+        "question-jobs/", QuestionJobSubmitAPIView.as_view(), name="question-job-submit"
+    ),
+    path(
+        "question-jobs/<uuid:token>/",
+        QuestionJobStatusAPIView.as_view(),
+        name="question-job-status",
+    ),
+    path(
+        "question-jobs/<uuid:token>/result/",
+        QuestionJobResultAPIView.as_view(),
+        name="question-job-result",
+    ),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
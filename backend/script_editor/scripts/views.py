@@ -1,179 +1,261 @@
-import openai
-import faiss
-import numpy as np
 import json
-from dotenv import load_dotenv
-import os
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import AllowAny
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .correction import correct_text, iter_corrections
+from .script_revisions import correct_script, previous_corrections, save_script_version
+from .hybrid_search import hybrid_search_batch
+from .models import QuestionJob, QuestionMeta
+from .question_jobs import submit_job
+from .serializers import (
+    QuestionJobRequestSerializer,
+    QuestionJobSerializer,
+    QuestionMetaSerializer,
+    QuestionSearchRequestSerializer,
+)
+from .telemetry import render_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def authenticate_user(request):
+    """Authorization 헤더의 JWT로 사용자를 확인합니다. 토큰이 없거나 유효하지 않으면 None"""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+def read_json_body(request):
+    """JSON 본문(또는 form 데이터)을 dict로 읽습니다."""
+    try:
+        return json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return request.POST
+
+
+def sse_event(event, data):
+    """server-sent event 한 개를 직렬화합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ProcessUserTextAPIView(View):
+    """
+    발표 대본의 문법을 교정합니다 (scripts/correction.py).
+    ASGI에서 실행되는 비동기 뷰로, 대본의 모든 문장을 CORRECTION_CONCURRENCY개까지 동시에 처리합니다.
+    로그인한 사용자의 대본은 버전으로 저장되고, 직전 버전에서 바뀐 문장만 다시 교정합니다.
+    """
+
+    async def post(self, request):
+        data = read_json_body(request)
+        user_text = data.get("text", "")
+        if not user_text:
+            return JsonResponse(
+                {"error": "텍스트를 입력해 주세요."}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-# 환경 변수 로드
-# load_dotenv()
-# openai.api_key = os.getenv("OPENAI_API_KEY")
-
-
-# # /modules 디렉터리에서 FAISS 인덱스와 메타데이터 파일 로드
-# modules_dir = os.path.join(os.path.dirname(__file__), "modules")
-# faiss_index_path = os.path.join(modules_dir, "faiss_index.index")
-# metadata_path = os.path.join(modules_dir, "metadata.json")
-
-# # 저장된 FAISS 인덱스와 메타데이터 로드
-# index = faiss.read_index(faiss_index_path)  # .index 파일에서 FAISS 인덱스 로드
-# with open(metadata_path, "r", encoding="utf-8") as f:
-#     metadata = json.load(f)
-
-
-# # 1. 입력받은 글을 문장 단위로 파싱
-# def parse_text_into_sentences(text):
-#     """
-#     1. 전체 텍스트를 문장 단위로 파싱합니다.
-#     """
-#     import re
-
-#     # 문장 분할을 위한 정규 표현식 사용
-#     sentences = re.split(r"(?<=[.!?]) +", text)
-#     return sentences
-
-
-# # 2. 문장 안에서 문법적으로 틀린 부분 찾기
-# def identify_grammatical_errors(sentence):
-#     """
-#     2. 문장 내에서 문법적으로 틀린 부분을 식별합니다.
-#     """
-#     # OpenAI ChatCompletion API를 사용하여 문법 오류를 식별
-#     response = openai.ChatCompletion.create(
-#         model="gpt-3.5-turbo",
-#         messages=[
-#             {"role": "system", "content": "You are a helpful assistant."},
-#             {
-#                 "role": "user",
-#                 "content": f"문장에서 문법적으로 틀린 부분을 찾아주세요:\n\n{sentence}",
-#             },
-#         ],
-#         max_tokens=100,
-#         temperature=0.5,
-#     )
-#     errors = response.choices[0].message["content"].strip().split("\n")
-#     return errors
-
-
-# # 3. 텍스트 임베딩 생성 함수
-# def create_embedding(text):
-#     """
-#     3. 텍스트 임베딩을 생성하여 FAISS 검색에 사용합니다.
-#     """
-#     response = openai.Embedding.create(input=text, model="text-embedding-ada-002")
-#     return np.array(response["data"][0]["embedding"], dtype=np.float32)
-
-
-# # 3. FAISS 인덱스를 사용하여 유사한 오류와 수정본 검색
-# def search_faiss_for_corrections(errors):
-#     """
-#     3. 발견된 오류에 대해 FAISS에서 유사한 오류와 수정할 내용을 검색합니다.
-#     """
-#     corrections = []
-#     for error in errors:
-#         # 오류를 임베딩하여 유사도 검색
-#         error_embedding = create_embedding(error).reshape(1, -1)
-#         distances, indices = index.search(error_embedding, k=5)
-
-#         # 검색 결과에서 메타데이터 추출
-#         matched_texts = [metadata[i]["corrected"] for i in indices[0]]
-#         corrections.append(matched_texts)
-
-#     return corrections
-
-
-# # 4. LLM을 사용하여 문장 수정
-# def correct_sentence_with_llm(sentence, errors, corrections):
-#     """
-#     4. LLM을 사용하여 문장과 검색된 수정 사항을 기반으로 문장을 수정합니다.
-#     """
-#     prompt = f'문장: "{sentence}"\n\n발견된 문법 오류와 수정 제안:\n'
-#     for i, (error, correction) in enumerate(zip(errors, corrections), start=1):
-#         prompt += f'{i}. 오류: "{error}" -> 수정: "{correction[0]}"\n'
-
-#     prompt += (
-#         "\n위 제안을 참고하여 문장을 수정해주세요. 수정된 문장만 간단하게 반환하세요."
-#     )
-
-#     response = openai.ChatCompletion.create(
-#         model="gpt-3.5-turbo",
-#         messages=[
-#             {"role": "system", "content": "You are a helpful assistant."},
-#             {"role": "user", "content": prompt},
-#         ],
-#         max_tokens=100,
-#     )
-
-#     corrected_sentence = response.choices[0].message["content"].strip()
-#     return corrected_sentence
-
-
-# # 5. 전체 텍스트의 모든 문장을 수정
-# def correct_text(text):
-#     """
-#     5. 입력된 전체 텍스트를 문장 단위로 수정합니다.
-#     """
-#     sentences = parse_text_into_sentences(text)
-#     corrected_sentences = []
-
-#     for sentence in sentences:
-#         errors = identify_grammatical_errors(sentence)
-#         corrections = search_faiss_for_corrections(errors)
-#         corrected_sentence = correct_sentence_with_llm(sentence, errors, corrections)
-#         corrected_sentences.append(corrected_sentence)
-
-#     return " ".join(corrected_sentences)
-
-
-# # 6. 최종 수정된 텍스트를 반환
-# def process_user_text(text):
-#     """
-#     6. 전체 텍스트를 받아 수정된 텍스트를 반환합니다.
-#     """
-#     corrected_text = correct_text(text)
-#     # 모든 수정된 문장을 하나의 문자열로 결합
-#     return corrected_text.replace('"', "")
-
-
-# # APIView로 1~6 포장
-# class ProcessUserTextAPIView(APIView):
-#     def post(self, request):
-#         user_text = request.data.get("text", "")
-#         if not user_text:
-#             return Response(
-#                 {"error": "텍스트를 입력해 주세요."}, status=status.HTTP_400_BAD_REQUEST
-#             )
-
-#         # process_user_text 함수 호출
-#         corrected_text = process_user_text(user_text)
-#         return Response({"corrected_text": corrected_text}, status=status.HTTP_200_OK)
-
-
-
-class ProcessUserTextAPIView(APIView):
-    permission_classes = [AllowAny]  # 인증 요구사항 제거
-    def post(self, request):
-        # 요청 데이터 전체 로깅
-        print("전체 요청 데이터:", request.data)
-        
-        # text 필드 추출
-        user_text = request.data.get("text", "")
-        print("받은 텍스트:", user_text)
-        
+        user = await sync_to_async(authenticate_user)(request)
+        if user is None:
+            script = None
+            results = await correct_text(user_text)
+        else:
+            script, results = await correct_script(
+                user, user_text, data.get("audience_level") or "general"
+            )
+
+        return JsonResponse(
+            {
+                "corrected_text": " ".join(result["corrected"] for result in results),
+                "script_id": script.id if script else None,
+                "reused_sentences": sum(result["reused"] for result in results),
+                "sentences": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ProcessUserTextStreamAPIView(View):
+    """
+    ProcessUserTextAPIView의 스트리밍 버전 (text/event-stream).
+    문장 교정이 끝나는 대로 "sentence" 이벤트
+    {"index", "original", "corrected", "tags", "sentence_hash", "reused"}를 보내고,
+    모든 문장이 끝나면 "done" 이벤트 {"corrected_text", "script_id", "reused_sentences"}를 보냅니다.
+    sentence 이벤트는 완료 순서대로 오므로 클라이언트는 index로 위치를 정합니다.
+    도중에 교정(OpenAI)이나 저장이 실패하면 "error" 이벤트 {"error"}를 보내고 스트림을 끝냅니다.
+    """
+
+    async def post(self, request):
+        data = read_json_body(request)
+        user_text = data.get("text", "")
         if not user_text:
-            return Response(
-                {"error": "텍스트를 입력해 주세요."}, 
-                status=status.HTTP_400_BAD_REQUEST
+            return JsonResponse(
+                {"error": "텍스트를 입력해 주세요."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        user = await sync_to_async(authenticate_user)(request)
+        audience_level = data.get("audience_level") or "general"
+
+        async def events():
+            try:
+                reuse = await previous_corrections(user) if user else {}
+                results = []
+                async for result in iter_corrections(user_text, reuse=reuse):
+                    results.append(result)
+                    yield sse_event("sentence", result)
+
+                results.sort(key=lambda result: result["index"])
+                script = None
+                if user is not None:
+                    script = await sync_to_async(save_script_version)(
+                        user, user_text, results, audience_level
+                    )
+            except Exception:
+                # 연결이 그냥 끊기면 클라이언트는 실패와 잘린 스트림을 구분할 수 없으므로 error 이벤트로 알림
+                logger.exception("스트리밍 문법 교정 실패")
+                yield sse_event("error", {"error": "문법 교정 중 오류가 발생했습니다. 다시 시도해 주세요."})
+                return
+            yield sse_event(
+                "done",
+                {
+                    "corrected_text": " ".join(result["corrected"] for result in results),
+                    "script_id": script.id if script else None,
+                    "reused_sentences": sum(result["reused"] for result in results),
+                },
             )
-            
-        # 테스트용 에코 응답
-        return Response({
-            "generated_question": "생성된 질문",
-            "message": "새로운 문제를 성공적으로 생성했습니다."
-        }, status=status.HTTP_200_OK)
-
-    
+
+        response = StreamingHttpResponse(events(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx 등 프록시가 이벤트를 모아 두지 않도록
+        return response
+
+
+class SearchQuestionsAPIView(APIView):
+    """
+    학습지의 여러 질문을 한 번에 받아 문제은행에서 질문별 top-k 유사 문제를 검색합니다.
+    결과의 score는 모든 mode에서 클수록 가까운 값이므로 mode와 관계없이 score로 정렬하면 됩니다.
+    distance(작을수록 가까운 FAISS 거리)는 vector 모드에서만 있고 나머지 모드에서는 null입니다.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = QuestionSearchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queries = serializer.validated_data["queries"]
+        k = serializer.validated_data["k"]
+
+        # vector 모드: 한 번의 인코딩 + 한 번의 FAISS 검색 (score는 모든 모드에서 클수록 가까움)
+        matches = hybrid_search_batch(
+            queries,
+            k=k,
+            mode=serializer.validated_data["mode"],
+            fusion=serializer.validated_data["fusion"],
+            question_types=serializer.validated_data.get("question_types"),
+        )
+
+        # 검색된 모든 id의 QuestionMeta를 한 번의 쿼리로 조회
+        matched_ids = {int(match["id"]) for row in matches for match in row}
+        questions = QuestionMeta.objects.in_bulk(matched_ids)
+
+        results = []
+        for query, row in zip(queries, matches):
+            items = []
+            for match in row:
+                question = questions.get(int(match["id"]))
+                items.append(
+                    {
+                        "id": int(match["id"]),
+                        "distance": match.get("distance"),
+                        "score": match.get("score"),
+                        "question_meta": (
+                            QuestionMetaSerializer(question).data if question else None
+                        ),
+                    }
+                )
+            results.append({"query": query, "results": items})
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+def get_visible_job(request, token):
+    """
+    token의 작업을 반환합니다. 로그인한 사용자가 요청한 작업은 그 사용자에게만 보이며,
+    다른 사용자의 작업이면 존재 여부도 드러내지 않도록 없는 작업과 같이 None을 반환합니다.
+    """
+    job = QuestionJob.objects.filter(token=token).first()
+    if job is None or (job.user_id is not None and job.user_id != request.user.id):
+        return None
+    return job
+
+
+class QuestionJobSubmitAPIView(APIView):
+    """
+    문제 분석/생성 작업을 대기열에 넣고 바로 작업 token을 반환합니다.
+    실제 실행은 run_question_workers 명령의 워커가 합니다.
+    로그인한 상태로 요청한 작업의 상태/결과는 같은 사용자의 JWT로만 조회할 수 있습니다.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = QuestionJobRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user if request.user.is_authenticated else None
+        job = submit_job(serializer.validated_data["question"], user=user)
+        return Response(QuestionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class QuestionJobStatusAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        job = get_visible_job(request, token)
+        if job is None:
+            return Response({"error": "작업을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(QuestionJobSerializer(job).data, status=status.HTTP_200_OK)
+
+
+class QuestionJobResultAPIView(APIView):
+    """완료된 작업의 결과를 반환합니다. 아직 실행 중이면 202, 실패했으면 409"""
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        job = get_visible_job(request, token)
+        if job is None:
+            return Response({"error": "작업을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        if job.status == QuestionJob.SUCCEEDED:
+            return Response({"token": job.token, "result": job.result}, status=status.HTTP_200_OK)
+        if job.status == QuestionJob.FAILED:
+            return Response(QuestionJobSerializer(job).data, status=status.HTTP_409_CONFLICT)
+        return Response(QuestionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class MetricsView(View):
+    """
+    단계별 지연 시간 히스토그램과 토큰/캐시 카운터를 Prometheus 텍스트 형식으로 반환합니다 (scripts/telemetry.py).
+    TELEMETRY_METRICS_PATH를 설정하면 문제 생성 워커(job_runner) 등 다른 프로세스의 지표도 함께 나옵니다.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
@@ -0,0 +1,111 @@
+"""
+문제 분석/생성 파이프라인 오프라인 벤치마크.
+
+네트워크 없이 fake_llm.FakeChatModel(호출당 지연 --latency초)로 다음을 측정합니다.
+    - process_question (분석 방식 agent / structured)
+    - question_generator.QuestionGeneratorPipeline.run_pipeline
+단계별 LLM 호출 수, 벽시계 시간, 메모리 할당량, 처리량을 출력하고 기준값 파일과 비교합니다
+(benchmarking.py 참고). 회귀가 있으면 종료 코드 1을 반환합니다.
+
+사용법:
+    python benchmark.py                     # 측정 후 benchmark_baseline.json과 비교
+    python benchmark.py --update-baseline   # 현재 결과를 기준값으로 저장
+    python benchmark.py --items 20 --latency 0.05 --repeat 3
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import sys
+
+from benchmarking import DEFAULT_TOLERANCE, CallCounter, measure, report
+from bulk_generate import iter_csv_questions
+from fake_llm import FakeChatModel
+from qa import QuestionPipeline
+from question_generator import QuestionGeneratorPipeline
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "db", "suneung_data.CSV")
+
+
+def instrument(counter, llm, obj, method, stage):
+    """obj.method 실행 동안 llm이 받은 호출 수를 stage 단계의 호출로 셉니다."""
+    original = getattr(obj, method)
+
+    def wrapper(*args, **kwargs):
+        before = llm.calls
+        try:
+            return original(*args, **kwargs)
+        finally:
+            counter.count(stage, llm.calls - before)
+
+    setattr(obj, method, wrapper)
+
+
+def bench_process_question(questions, latency, analysis_mode, repeat):
+    llm = FakeChatModel(latency=latency)
+    pipeline = QuestionPipeline(llm, analysis_mode=analysis_mode)
+    counter = CallCounter()
+    instrument(counter, llm, pipeline.analysis_agent, "analyze", "analysis")
+    instrument(counter, llm, pipeline.generator_agent, "generate", "generation")
+
+    def run():
+        for question in questions:
+            pipeline.process(question)
+
+    return measure(run, len(questions), counter, repeat)
+
+
+def bench_run_pipeline(questions, latency, repeat):
+    llm = FakeChatModel(latency=latency)
+    pipeline = QuestionGeneratorPipeline(llm)
+    counter = CallCounter()
+    instrument(counter, llm, pipeline.analysis_agent, "analyze", "analysis")
+    instrument(counter, llm, pipeline.generation_agent, "generate", "generation")
+    instrument(counter, llm, pipeline.validation_agent, "validate", "validation")
+
+    def run():
+        for question in questions:
+            pipeline.run_pipeline(question)
+
+    return measure(run, len(questions), counter, repeat)
+
+
+def run_benchmarks(items=5, latency=0.0, repeat=1):
+    bank = [question for _, question in iter_csv_questions(CSV_PATH)]
+    questions = list(itertools.islice(itertools.cycle(bank), items))
+    # 에이전트의 verbose 출력과 run_pipeline의 print는 측정 결과와 섞이지 않도록 버림
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            "process_question[agent]": bench_process_question(questions, latency, "agent", repeat),
+            "process_question[structured]": bench_process_question(
+                questions, latency, "structured", repeat
+            ),
+            "run_pipeline": bench_run_pipeline(questions, latency, repeat),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문제 분석/생성 파이프라인 오프라인 벤치마크")
+    parser.add_argument("--items", type=int, default=5, help="처리할 문항 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="가짜 LLM 호출당 지연(초)")
+    parser.add_argument("--repeat", type=int, default=1, help="반복 횟수 (가장 빠른 시간 사용)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 JSON 파일")
+    parser.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="시간/메모리 허용 증가율 (0.25 = 25%%)",
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.items, args.latency, args.repeat)
+    ok = report(results, args.baseline, update=args.update_baseline, tolerance=args.tolerance)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+오프라인 벤치마크 공통 도구 (측정, 기준값 비교, 결과 출력).
+
+question-generator의 benchmark.py와 백엔드의 manage.py benchmark 명령이 함께 사용합니다.
+표준 라이브러리만 사용하므로 백엔드에서도 파일 경로로 불러 씁니다
+(backend/script_editor/scripts/question_generator_modules.py 참고).
+
+벤치마크 하나의 결과:
+    {
+        "seconds": 벽시계 시간 (repeat번 중 가장 빠른 값),
+        "items": 처리한 항목 수,
+        "items_per_second": 처리량,
+        "peak_kb": tracemalloc으로 잰 최대 메모리 할당량 (KB),
+        "allocated_kb": 실행 후에도 남은 할당량 (KB),
+        "calls": {단계 이름: 호출 수},
+    }
+
+기준값(baseline) 비교:
+    - calls: 결정적인 값이므로 기준보다 하나라도 많으면 회귀
+    - seconds, peak_kb: 기준보다 tolerance(기본 25%) 넘게 커지면 회귀
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+DEFAULT_TOLERANCE = 0.25
+
+
+class CallCounter:
+    """단계별 호출 수를 셉니다. 가짜 모델과 계측 래퍼가 count(stage)를 호출합니다."""
+
+    def __init__(self):
+        self.calls = {}
+
+    def count(self, stage, n=1):
+        self.calls[stage] = self.calls.get(stage, 0) + n
+
+    def reset(self):
+        self.calls = {}
+
+
+def measure(run, items, counter=None, repeat=1):
+    """
+    run()을 repeat번 실행하여 결과 dict를 반환합니다.
+    시간은 가장 빠른 실행, 호출 수와 메모리는 첫 실행 기준입니다 (이후 실행은 캐시 영향을 받을 수 있음).
+    run()이 dict를 반환하면 결과의 "extra"에 담습니다.
+    """
+    best = None
+    result = {}
+    for attempt in range(repeat):
+        if counter is not None:
+            counter.reset()
+        tracemalloc.start()
+        started = time.perf_counter()
+        extra = run()
+        seconds = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if attempt == 0:
+            result = {
+                "items": items,
+                "peak_kb": round(peak / 1024, 1),
+                "allocated_kb": round(current / 1024, 1),
+                "calls": dict(counter.calls) if counter is not None else {},
+            }
+            if isinstance(extra, dict):
+                result["extra"] = extra
+        best = seconds if best is None else min(best, seconds)
+    result["seconds"] = round(best, 4)
+    result["items_per_second"] = round(items / best, 2) if best else 0.0
+    return result
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """기준값보다 나빠진 항목을 ["벤치마크: 설명", ...]으로 반환합니다."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for stage, calls in result["calls"].items():
+            base_calls = base.get("calls", {}).get(stage)
+            if base_calls is not None and calls > base_calls:
+                regressions.append(f"{name}: {stage} 호출 {base_calls} → {calls}")
+        for metric in ("seconds", "peak_kb"):
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {base[metric]} → {result[metric]}")
+    return regressions
+
+
+def format_report(results, baseline=None):
+    lines = []
+    for name, result in results.items():
+        line = (
+            f"{name}: {result['seconds']:.3f}초, {result['items_per_second']:.1f} items/s, "
+            f"peak {result['peak_kb']:.0f}KB"
+        )
+        base = (baseline or {}).get(name)
+        if base and base.get("seconds"):
+            line += f" (기준 {base['seconds']:.3f}초, {result['seconds'] / base['seconds']:.2f}x)"
+        lines.append(line)
+        if result["calls"]:
+            calls = ", ".join(f"{stage} {n}" for stage, n in sorted(result["calls"].items()))
+            lines.append(f"    호출: {calls}")
+    return "\n".join(lines)
+
+
+def report(results, baseline_path, update=False, tolerance=DEFAULT_TOLERANCE, write=print):
+    """
+    결과를 출력하고 기준값과 비교합니다. update=True이면 결과를 새 기준값으로 저장합니다.
+    회귀가 없으면 True를 반환합니다.
+    """
+    baseline = load_baseline(baseline_path)
+    write(format_report(results, baseline))
+    if update:
+        save_baseline(baseline_path, results)
+        write(f"기준값 저장: {baseline_path}")
+        return True
+    if baseline is None:
+        write(f"기준값 파일이 없습니다 ({baseline_path}). --update-baseline으로 만드세요.")
+        return True
+    regressions = compare(results, baseline, tolerance)
+    for regression in regressions:
+        write(f"회귀: {regression}")
+    return not regressions
@@ -0,0 +1,249 @@
+"""
+문제은행 전체에 대해 변형 문제를 대량으로 생성하는 배치 명령.
+
+문항마다 variants개의 새 문제를 QuestionPipeline.process()(= process_question)로 만들고,
+결과를 한 줄에 하나씩 JSONL 파일에 바로 기록합니다.
+
+- 입력: 수능 CSV 파일(db/suneung_data.CSV) 또는 백엔드 DB의 QuestionMeta 테이블(--db)
+- 최대 --concurrency개의 문항을 동시에 처리 (입력은 필요한 만큼만 읽음)
+- 실패한 호출(속도 제한 등)은 --retries번까지 점점 길게 기다렸다가 다시 시도
+- 출력 파일이 곧 체크포인트: 기록할 때마다 디스크에 flush하고, 다시 실행하면 이미 성공한
+  (id, variant)는 건너뛰므로 중단된 지점부터 이어서 실행됨 (실패로 기록된 항목은 다시 시도)
+- 항목마다 소요 시간(seconds)을 기록하고, 마지막에 처리량과 지연 시간 분포를 출력
+
+출력 한 줄:
+    {"id": 3, "variant": 0, "ok": true, "seconds": 4.2, "result": {...process_question 결과}}
+    {"id": 4, "variant": 0, "ok": false, "seconds": 31.0, "error": "RateLimitError: ..."}
+
+사용법:
+    python bulk_generate.py ../db/suneung_data.CSV -o variants.jsonl --variants 3
+    python bulk_generate.py --db ../backend/script_editor/db.sqlite3 -o variants.jsonl
+    python bulk_generate.py ../db/suneung_data.CSV -o variants.jsonl --fake-llm  # 오프라인 테스트
+
+LLM_CACHE_PATH를 설정하면 같은 문항의 분석은 변형마다 다시 호출하지 않고 캐시를 사용합니다.
+LLM 호출은 기본적으로 batch 우선순위로 나가므로(llm_scheduler 참고), LLM_SCHEDULER_PATH를 서버와 같은
+파일로 설정하면 대량 생성 중에도 편집기의 교정 요청이 먼저 처리됩니다.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from llm_cache import default_cache
+from llm_scheduler import BATCH, PRIORITIES, get_scheduler
+from qa import QuestionPipeline, make_chat_model
+from telemetry import configure_tracing
+
+
+def iter_csv_questions(path):
+    """수능 CSV를 한 행씩 읽어 (id, 문제 본문)을 내보냅니다. id가 비어 있으면 행 순서를 사용합니다."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for position, row in enumerate(csv.DictReader(f)):
+            question = (row.get("question") or "").strip()
+            if question:
+                question_id = (row.get("id") or "").strip()
+                yield int(question_id) if question_id else position, question
+
+
+def iter_db_questions(db_path):
+    """백엔드 SQLite DB의 QuestionMeta(scripts_questionmeta)를 id 순서로 읽습니다 (읽기 전용)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for question_id, question in conn.execute(
+            "SELECT id, question FROM scripts_questionmeta ORDER BY id"
+        ):
+            if question and question.strip():
+                yield question_id, question.strip()
+    finally:
+        conn.close()
+
+
+def load_completed(output_path):
+    """
+    출력 파일에서 이미 성공한 (id, variant)를 읽습니다.
+    기록 도중 중단되어 마지막 줄이 잘린 경우 그 줄은 지우고 다시 생성합니다.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    valid_size = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_size += len(line)
+            if record.get("ok"):
+                completed.add((record["id"], record["variant"]))
+    if valid_size < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_size)
+    return completed
+
+
+def run_item(pipeline, question, retries, backoff):
+    """문제 하나를 처리합니다. 실패하면 backoff, 2*backoff, ...초 기다렸다가 retries번까지 다시 시도"""
+    start = time.perf_counter()
+    for attempt in range(retries + 1):
+        try:
+            result = pipeline.process(question)
+            return {"ok": True, "seconds": time.perf_counter() - start, "result": result}
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+            if attempt < retries:
+                print(f"  재시도 {attempt + 1}/{retries}: {error}", file=sys.stderr)
+                time.sleep(backoff * 2**attempt)
+    return {"ok": False, "seconds": time.perf_counter() - start, "error": error}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bulk_generate(
+    pipeline,
+    questions,
+    output_path,
+    variants=1,
+    concurrency=4,
+    retries=3,
+    backoff=5.0,
+    limit=None,
+):
+    """
+    questions((id, 문제 본문) 반복자)의 문항마다 variants개의 변형 문제를 만들어 output_path에 추가합니다.
+    이미 성공한 항목은 건너뛰며, 처리 통계 dict를 반환합니다.
+    """
+    completed = load_completed(output_path)
+    stats = {"ok": 0, "failed": 0, "skipped": 0, "latencies": []}
+
+    def pending_items():
+        count = 0
+        for question_id, question in questions:
+            for variant in range(variants):
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                if (question_id, variant) in completed:
+                    stats["skipped"] += 1
+                    continue
+                yield question_id, variant, question
+
+    start = time.perf_counter()
+    items = pending_items()
+    with open(output_path, "a", encoding="utf-8") as output, ThreadPoolExecutor(
+        max_workers=concurrency
+    ) as executor:
+        in_flight = {}
+
+        def fill():
+            # 동시에 실행 중인 항목이 concurrency개를 넘지 않도록 입력을 필요한 만큼만 읽음
+            for question_id, variant, question in items:
+                future = executor.submit(run_item, pipeline, question, retries, backoff)
+                in_flight[future] = (question_id, variant)
+                if len(in_flight) >= concurrency:
+                    break
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                question_id, variant = in_flight.pop(future)
+                record = {"id": question_id, "variant": variant, **future.result()}
+                output.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                output.flush()
+                os.fsync(output.fileno())
+
+                stats["ok" if record["ok"] else "failed"] += 1
+                stats["latencies"].append(record["seconds"])
+                status = "완료" if record["ok"] else f"실패 ({record['error']})"
+                print(
+                    f"[{stats['ok'] + stats['failed']}] id={question_id} variant={variant} "
+                    f"{record['seconds']:.1f}초 {status}",
+                    file=sys.stderr,
+                )
+            fill()
+
+    elapsed = time.perf_counter() - start
+    latencies = stats.pop("latencies")
+    processed = stats["ok"] + stats["failed"]
+    stats.update(
+        seconds=elapsed,
+        items_per_minute=processed / elapsed * 60 if elapsed else 0.0,
+        latency_p50=percentile(latencies, 0.5),
+        latency_p95=percentile(latencies, 0.95),
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문제은행의 모든 문항에 대해 변형 문제를 대량 생성")
+    parser.add_argument("csv_path", nargs="?", help="수능 CSV 파일 (예: ../db/suneung_data.CSV)")
+    parser.add_argument("--db", help="CSV 대신 읽을 백엔드 SQLite DB (QuestionMeta 테이블)")
+    parser.add_argument("-o", "--output", required=True, help="결과 JSONL 파일 (체크포인트 겸용)")
+    parser.add_argument("--variants", type=int, default=1, help="문항당 생성할 변형 문제 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 처리할 항목 수")
+    parser.add_argument("--retries", type=int, default=3, help="실패한 항목을 다시 시도할 횟수")
+    parser.add_argument("--backoff", type=float, default=5.0, help="첫 재시도 전 대기 시간(초), 재시도마다 두 배")
+    parser.add_argument("--limit", type=int, help="처리할 최대 (문항, 변형) 수 (건너뛴 항목 포함)")
+    parser.add_argument("--analysis-mode", help='"agent" 또는 "structured" (기본값: QUESTION_ANALYSIS_MODE)')
+    parser.add_argument(
+        "--priority",
+        choices=PRIORITIES,
+        default=BATCH,
+        help="LLM 호출 우선순위 (기본값: batch, 편집기 등 interactive 호출이 남긴 한도만 사용)",
+    )
+    parser.add_argument("--fake-llm", action="store_true", help="오프라인 가짜 LLM 사용")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="가짜 LLM 호출당 지연(초)")
+    args = parser.parse_args()
+    if bool(args.csv_path) == bool(args.db):
+        parser.error("CSV 파일 경로와 --db 중 하나만 지정하세요.")
+
+    # 워커 스레드를 포함한 이 프로세스의 모든 LLM 호출에 적용
+    get_scheduler().default_priority = args.priority
+    configure_tracing("question-generator-bulk")
+
+    if args.fake_llm:
+        from fake_llm import FakeChatModel
+
+        llm = FakeChatModel(latency=args.fake_latency)
+    else:
+        llm = make_chat_model()
+    pipeline = QuestionPipeline(llm, analysis_mode=args.analysis_mode, cache=default_cache())
+    questions = iter_db_questions(args.db) if args.db else iter_csv_questions(args.csv_path)
+
+    # 에이전트의 verbose 출력은 진행 상황과 함께 stderr로
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        stats = bulk_generate(
+            pipeline,
+            questions,
+            args.output,
+            variants=args.variants,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            backoff=args.backoff,
+            limit=args.limit,
+        )
+    finally:
+        sys.stdout = stdout
+    print(
+        f"완료: 성공 {stats['ok']}, 실패 {stats['failed']}, 건너뜀 {stats['skipped']}, "
+        f"{stats['seconds']:.1f}초 ({stats['items_per_minute']:.1f} items/min), "
+        f"지연 p50 {stats['latency_p50']:.1f}초 / p95 {stats['latency_p95']:.1f}초"
+    )
+
+
+if __name__ == "__main__":
+    main()
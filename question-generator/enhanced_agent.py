@@ -1,6 +1,7 @@
 from langchain.agents import create_react_agent, AgentExecutor, Tool
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
+from llm_cache import with_cache
 import os
 from dotenv import load_dotenv
 
@@ -32,8 +33,9 @@ class QuestionGeneratorTools:
         return f"검증 결과: {question}의 적절성 평가"
 
 class QuestionGeneratorPipeline:
-    def __init__(self, llm):
-        self.llm = llm
+    def __init__(self, llm, cache=None):
+        # 에이전트가 새 문제를 생성하므로 기본은 캐시 없이 호출 (cache를 주면 같은 입력의 응답을 재사용)
+        self.llm = with_cache(llm, cache)
         self.tools = self._create_tools()
         self.agent = self._create_agent()
         self.executor = AgentExecutor(agent=self.agent, tools=self.tools, verbose=True)
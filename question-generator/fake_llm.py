@@ -0,0 +1,58 @@
+"""
+오프라인 테스트용 가짜 채팅 모델.
+
+ChatOpenAI 대신 넘기면 네트워크나 API 키 없이 qa.process_question 전체 흐름을 실행할 수 있습니다.
+- ReAct 에이전트 프롬프트에는 바로 "Final Answer"로 끝나는 응답을 돌려줌
+- StructuredOutputParser 형식 지시문이 있는 프롬프트에는 스키마의 필드를 모두 채운 JSON을 돌려줌
+- 그 외 프롬프트에는 프롬프트 첫 줄을 담은 고정 형식의 응답을 돌려줌 (같은 입력 → 같은 출력)
+- latency(초)를 주면 호출마다 그만큼 기다려 실제 API 지연을 흉내냄
+"""
+
+import json
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def respond(self, prompt: str) -> str:
+        """프롬프트에 대한 고정 형식의 응답을 만듭니다."""
+        if "Final Answer" in prompt:
+            return (
+                "Thought: I have completed all analyses\n"
+                "Final Answer: Here is the complete analysis:\n"
+                "Grammar: (offline)\nQuestion Type: (offline)\n"
+                "Topic: (offline)\nDifficulty: (offline)"
+            )
+        if "```json" in prompt:
+            fields = re.findall(r'^\s*"(\w+)": ', prompt, re.MULTILINE)
+            answer = {field: f"[offline] {field}" for field in fields}
+            return "```json\n" + json.dumps(answer, ensure_ascii=False) + "\n```"
+        first_line = next((line.strip() for line in prompt.splitlines() if line.strip()), "")
+        return f"[offline] {first_line[:80]}"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = "\n".join(str(message.content) for message in messages)
+        message = AIMessage(content=self.respond(prompt))
+        return ChatResult(generations=[ChatGeneration(message=message)])
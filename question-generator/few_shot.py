@@ -0,0 +1,143 @@
+"""
+SpecialistAgent 프롬프트에 넣을 예시 문제(few-shot)를 문제은행에서 골라 주는 모듈.
+
+예시 두 개를 매번 통째로 넣는 대신, 입력 문제의 형식('box' / 'underlined')을 판별하고
+백엔드 문제은행 FAISS 인덱스(search-questions API)에서 가장 비슷한 어법 문제 중 같은 형식인 것을
+1~2개만 고릅니다. 고른 예시는 프롬프트 전체가 토큰 예산(FEW_SHOT_PROMPT_TOKEN_BUDGET) 안에
+들어가는 만큼만 넣습니다.
+
+문제은행 API에 연결할 수 없거나 맞는 예시가 없으면 같은 형식의 기본 예시(DEFAULT_EXAMPLES)를 사용합니다.
+(question-generator 환경에는 faiss/sentence-transformers가 없으므로 인덱스는 백엔드를 통해 검색)
+"""
+
+import os
+import re
+
+import httpx
+
+from llm_scheduler import count_tokens
+
+# 문제은행 유사 문제 검색 API (backend scripts.views.SearchQuestionsAPIView)
+QUESTION_BANK_SEARCH_URL = os.getenv(
+    "QUESTION_BANK_SEARCH_URL", "http://localhost:8000/api/search-questions/"
+)
+QUESTION_BANK_SEARCH_TIMEOUT = float(os.getenv("QUESTION_BANK_SEARCH_TIMEOUT", "5"))
+# 어법 문제의 QuestionMeta.question_type
+GRAMMAR_QUESTION_TYPE = os.getenv("GRAMMAR_QUESTION_TYPE", "어법성 판단")
+FEW_SHOT_MAX_EXAMPLES = int(os.getenv("FEW_SHOT_MAX_EXAMPLES", "2"))
+# 예시를 넣은 뒤의 프롬프트 전체 토큰 상한
+FEW_SHOT_PROMPT_TOKEN_BUDGET = int(os.getenv("FEW_SHOT_PROMPT_TOKEN_BUDGET", "2500"))
+
+BOX = "box"
+UNDERLINED = "underlined"
+
+# (A) [was/were], (B)[enable / enables] 같은 네모 안 선택지
+_BOX_PATTERN = re.compile(r"\([A-C]\)\s*\[[^\]/]+/[^\]]+\]")
+_CIRCLED_NUMBERS = "①②③④⑤"
+
+DEFAULT_EXAMPLES = {
+    BOX: {
+        "question": "The most useful thing I brought out of my childhood was confidence in reading. Not long ago, I went on a weekend self-exploratory workshop, in the hope of getting a clue about how to live. One of the exercises we were given (A) [was/were] to make a list of the ten most important events of our lives. Number one was: \"I was born,\" and you could put (B) [however/whatever] you liked after that. Without even thinking about it, my hand wrote at number two: \"I learned to read.\" \"I was born and learned to read\" wouldn't be a sequence that occurs to many people, I imagine. But I knew what I meant to say. Being born was something (C) [done/doing] to me, but my own life began when I first made out the meaning of a sentence.",
+        "answer": "(A) was - (B) whatever - (C) done",
+        "explanation": """- (A) Subject-verb agreement: In the structure "One of [plural noun]," the singular subject "One" requires a singular verb, so the answer is "was."
+- (B) Understanding compound relative pronouns: "you liked after that" requires "whatever" as the object of the verb "liked."
+- (C) Understanding active and passive voice: "Being born" implies a passive meaning, so the answer should also reflect a passive form, which is "done.\"""",
+    },
+    UNDERLINED: {
+        "question": "Like most parents, you might have spent money on a toy that your child didn’t play with very much. You might have found your child playing ① much with the box than the toy that came in it. There is one toy that is a guaranteed winner for children ― Blocks. ② Buying a set of table blocks, cube blocks, or cardboard blocks is a very good investment in your child’s play. Blocks help children ③ learn many subjects. Children learn ④ a lot about shapes and sizes. Young children develop math skills by counting, matching, sorting, grouping, and ⑤ adding blocks while they play.",
+        "answer": "① more",
+        "explanation": """- (① much → more): In comparative structures, "more" is used to indicate a higher degree of action or quality compared to something else. Here, the correct expression is "playing more with the box than the toy," as "more" is required to complete the comparative structure with "than."
+- (② Buying): The gerund "Buying" is correctly used as the subject of the sentence. Gerunds function as nouns and can serve as the subject of a verb, as seen in "Buying a set of blocks is a very good investment."
+- (③ learn): The base form "learn" is correctly used after the verb "help." In English, "help" is followed by the bare infinitive (base form) or a to-infinitive. Both are acceptable.
+- (④ a lot): The phrase "a lot" is correctly used to describe the extent of learning ("learn a lot about shapes and sizes"). This is grammatically correct and contextually appropriate.
+- (⑤ adding): The gerund "adding" is correctly used after the preposition "by" to indicate the means or method ("by counting, matching, sorting, grouping, and adding blocks").""",
+    },
+}
+
+
+def detect_question_type(text):
+    """어법 문제의 형식을 판별합니다. 네모 안 선택지가 있으면 'box', 밑줄 번호(①~⑤)가 있으면 'underlined'"""
+    if _BOX_PATTERN.search(text):
+        return BOX
+    if sum(number in text for number in _CIRCLED_NUMBERS) >= 3:
+        return UNDERLINED
+    return None
+
+
+def format_example(number, example, question_type):
+    block = (
+        f"```Example Question {number}\n{example['question'].strip()}\n\n"
+        f"Question Type: '{question_type}'\nAnswer: {example['answer']}\n"
+    )
+    if example.get("explanation"):
+        block += f"\nGrammar Points:\n{example['explanation'].strip()}\n"
+    return block + "```"
+
+
+class FewShotSelector:
+    def __init__(
+        self,
+        search_url=QUESTION_BANK_SEARCH_URL,
+        max_examples=FEW_SHOT_MAX_EXAMPLES,
+        token_budget=FEW_SHOT_PROMPT_TOKEN_BUDGET,
+        model="gpt-4o",
+        http_client=None,
+    ):
+        self.search_url = search_url
+        self.max_examples = max_examples
+        self.token_budget = token_budget
+        self.model = model
+        self.http_client = http_client or httpx.Client(timeout=QUESTION_BANK_SEARCH_TIMEOUT)
+
+    def search(self, text, question_type):
+        """문제은행에서 text와 비슷한 어법 문제 중 같은 형식인 것을 가까운 순서로 반환합니다."""
+        if not self.search_url:
+            return []
+        try:
+            response = self.http_client.post(
+                self.search_url,
+                json={
+                    "queries": [text],
+                    "k": self.max_examples * 3,  # 형식이 다른 문제를 걸러낼 여유
+                    "question_types": [GRAMMAR_QUESTION_TYPE],
+                },
+            )
+            response.raise_for_status()
+            results = response.json()["results"][0]["results"]
+        except (httpx.HTTPError, KeyError, IndexError, ValueError):
+            return []
+        examples = []
+        for match in results:
+            meta = match.get("question_meta")
+            # 입력 문제 자체가 문제은행에 있으면 예시에서 제외 (줄바꿈/공백 차이는 무시)
+            if not meta or meta["question"].split() == text.split():
+                continue
+            if detect_question_type(meta["question"]) == question_type:
+                examples.append(meta)
+        return examples
+
+    def select(self, text, base_prompt_tokens=0):
+        """
+        프롬프트에 넣을 예시 블록(문자열)을 반환합니다.
+        base_prompt_tokens: 예시를 제외한 나머지 프롬프트(템플릿 + 입력)의 토큰 수.
+        예산이 모자라면 예시를 줄이며, 하나도 들어가지 않으면 빈 문자열을 반환합니다.
+        """
+        question_type = detect_question_type(text)
+        if question_type is None:
+            candidates = [(BOX, DEFAULT_EXAMPLES[BOX]), (UNDERLINED, DEFAULT_EXAMPLES[UNDERLINED])]
+        else:
+            candidates = [(question_type, example) for example in self.search(text, question_type)]
+            candidates = candidates[: self.max_examples] or [
+                (question_type, DEFAULT_EXAMPLES[question_type])
+            ]
+
+        remaining = self.token_budget - base_prompt_tokens
+        blocks = []
+        for example_type, example in candidates:
+            block = format_example(len(blocks) + 1, example, example_type)
+            tokens = count_tokens(block, self.model)
+            if tokens > remaining:
+                continue  # 더 짧은 다음 후보가 들어갈 수 있음
+            blocks.append(block)
+            remaining -= tokens
+        return "\n\n".join(blocks)
@@ -0,0 +1,68 @@
+"""
+문제 생성 작업 실행기.
+
+백엔드의 run_question_workers 명령이 워커마다 이 프로세스를 하나씩 띄워 두고 작업을 보냅니다.
+(백엔드와 question-generator는 서로 다른 openai 버전을 사용하므로 별도 프로세스로 실행)
+
+프로토콜: stdin/stdout으로 한 줄에 JSON 하나
+    요청: {"question": "..."}
+    응답: {"ok": true, "result": {...}} 또는 {"ok": false, "error": "..."}
+
+사용법:
+    python job_runner.py            # gpt-4 사용
+    python job_runner.py --fake-llm # 오프라인 테스트 (fake_llm.FakeChatModel)
+"""
+
+import argparse
+import json
+import sys
+import traceback
+
+from llm_cache import default_cache
+from qa import QuestionPipeline, make_chat_model
+from telemetry import configure_tracing
+
+
+def make_llm(fake=False, latency=0.0):
+    if fake:
+        from fake_llm import FakeChatModel
+
+        return FakeChatModel(latency=latency)
+    return make_chat_model()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fake-llm", action="store_true", help="오프라인 가짜 LLM 사용")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="가짜 LLM 호출당 지연(초)")
+    args = parser.parse_args()
+
+    # 에이전트의 verbose 출력이 응답 줄과 섞이지 않도록 stdout은 응답 전용으로 사용
+    output = sys.stdout
+    sys.stdout = sys.stderr
+
+    # OTEL_EXPORTER_OTLP_ENDPOINT가 있으면 단계별 span을 내보냄. 지표는 TELEMETRY_METRICS_PATH를
+    # Django와 같은 파일로 설정하면 백엔드 /api/metrics/에 함께 나옴
+    configure_tracing("question-generator-worker")
+
+    # 프롬프트/체인/HTTP 연결 풀은 프로세스가 살아 있는 동안 한 번만 만들어 재사용
+    # LLM_CACHE_PATH가 설정되어 있으면 워커들이 같은 분석 캐시 파일을 공유
+    pipeline = QuestionPipeline(
+        make_llm(args.fake_llm, args.fake_latency), cache=default_cache()
+    )
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            result = pipeline.process(request["question"])
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            traceback.print_exc()
+            response = {"ok": False, "error": f"{e.__class__.__name__}: {e}"}
+        output.write(json.dumps(response, ensure_ascii=False, default=str) + "\n")
+        output.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+langchain 체인, 도구, LLM 호출마다 span을 남기는 콜백 핸들러 (telemetry.py 참고).
+
+이 모듈을 import하면 핸들러가 langchain 전역 설정 훅에 등록되어, 콜백을 따로 넘기지 않아도
+모든 invoke/run 호출(AgentExecutor, 체인, 도구, 채팅 모델)이 span으로 기록됩니다.
+span의 부모는 langchain의 parent_run_id로, 최상위 호출은 진행 중인 telemetry span(예: question.analysis)으로 정합니다.
+
+히스토그램(stage_duration_seconds)의 stage:
+    도구      tool.<도구 이름>                       예: tool.analyze_grammar, tool.adapt_difficulty
+    LLM 호출  <도구 또는 바깥 단계>.llm              예: question.analysis.react.llm (= ReAct 계획 단계),
+                                                          tool.analyze_grammar.llm
+    체인      (trace에만 기록, 프롬프트·파서까지 모두 span이므로 히스토그램에는 넣지 않음)
+
+LLM span 속성: gen_ai.request.model, gen_ai.response.model, gen_ai.usage.input_tokens/output_tokens,
+llm.cache_hit (llm_cache.SQLiteLLMCache에서 찾은 응답은 generation_info에 표시됨)
+"""
+
+import threading
+from contextvars import ContextVar
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+import telemetry
+
+# llm_cache.SQLiteLLMCache.lookup이 캐시에서 찾은 응답의 generation_info에 남기는 표시
+CACHE_HIT_KEY = "llm_cache_hit"
+
+
+def run_name(serialized, kwargs, default):
+    if kwargs.get("name"):
+        return kwargs["name"]
+    serialized = serialized or {}
+    return serialized.get("name") or (serialized.get("id") or [default])[-1]
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    run_inline = True  # async 호출에서도 시작/종료 순서대로 처리
+
+    def __init__(self):
+        self._runs = {}  # run_id → (Span, 하위 LLM 호출의 stage 접두어)
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, parent_run_id, name, stage=None, context=None, **attributes):
+        with self._lock:
+            parent = self._runs.get(parent_run_id)
+        if parent is not None:
+            parent_span, parent_context = parent
+        else:
+            parent_span = telemetry.current_span()
+            parent_context = parent_span.stage if parent_span is not None else name
+        current = telemetry.start_span(
+            name, parent=parent_span, stage=stage, record=stage is not None, **attributes
+        )
+        with self._lock:
+            self._runs[run_id] = (current, context or parent_context)
+        return current, parent_context
+
+    def _end(self, run_id, error=None):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is not None:
+            run[0].end(error=error)
+        return run
+
+    # 체인
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = run_name(serialized, kwargs, "chain")
+        self._start(run_id, parent_run_id, name, **{"langchain.run_type": "chain"})
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # 도구
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = run_name(serialized, kwargs, "tool")
+        self._start(
+            run_id,
+            parent_run_id,
+            name,
+            stage=f"tool.{name}",
+            context=f"tool.{name}",
+            **{"langchain.run_type": "tool"},
+        )
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # LLM
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs
+    ):
+        self._start_llm(serialized, run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start_llm(serialized, run_id, parent_run_id, metadata, kwargs)
+
+    def _start_llm(self, serialized, run_id, parent_run_id, metadata, kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            (metadata or {}).get("ls_model_name")
+            or params.get("model_name")
+            or params.get("model")
+            or params.get("_type")
+            or "unknown"
+        )
+        with self._lock:
+            parent = self._runs.get(parent_run_id)
+        if parent is not None:
+            context = parent[1]
+        else:
+            outer = telemetry.current_span()
+            context = outer.stage if outer is not None else "llm"
+        self._start(
+            run_id,
+            parent_run_id,
+            run_name(serialized, kwargs, "llm"),
+            stage=f"{context}.llm",
+            **{"langchain.run_type": "llm", "gen_ai.request.model": model},
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+        if run is not None:
+            current = run[0]
+            generations = [generation for batch in response.generations for generation in batch]
+            cache_hit = bool(generations) and all(
+                (generation.generation_info or {}).get(CACHE_HIT_KEY) for generation in generations
+            )
+            llm_output = response.llm_output or {}
+            usage = llm_output.get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens")
+            completion_tokens = usage.get("completion_tokens")
+            if not usage:
+                # 토큰 수를 llm_output에 담지 않는 모델은 메시지의 usage_metadata를 사용
+                for generation in generations:
+                    usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage_metadata:
+                        prompt_tokens = (prompt_tokens or 0) + usage_metadata.get("input_tokens", 0)
+                        completion_tokens = (completion_tokens or 0) + usage_metadata.get("output_tokens", 0)
+            current.set_attribute("gen_ai.response.model", llm_output.get("model_name"))
+            telemetry.record_llm_call(
+                current,
+                current.attributes.get("gen_ai.request.model"),
+                prompt_tokens,
+                completion_tokens,
+                cache_hit,
+            )
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+tracing_handler = TracingCallbackHandler()
+
+# 기본값이 핸들러인 ContextVar를 등록하면 모든 스레드의 모든 invoke에 핸들러가 붙음
+_tracing_handler_var = ContextVar("langchain_tracing_handler", default=tracing_handler)
+register_configure_hook(_tracing_handler_var, inheritable=True)
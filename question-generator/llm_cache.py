@@ -0,0 +1,183 @@
+"""
+LLM 응답 캐시 (SQLite).
+
+같은 수능 문항이 여러 사용자와 재시도에서 반복해서 분석되므로, (모델 설정, 완성된 프롬프트)가
+같은 호출은 저장된 응답을 돌려줍니다. langchain의 BaseCache를 구현하므로 채팅 모델 하나에
+cache를 지정하면 그 모델을 쓰는 모든 체인이 캐시를 거칩니다.
+
+- 키: langchain이 만드는 llm_string(모델 이름, temperature 등 호출 파라미터)과 프롬프트의 sha256
+- ttl(초)이 지난 응답은 사용하지 않고 지움
+- max_entries를 넘으면 가장 오래 사용하지 않은 응답부터 지움 (LRU)
+- hits / misses / expired / evictions 를 stats()로 확인
+- 조회 결과는 cache_lookups_total{cache="llm"} 지표에 더하고, 캐시에서 찾은 응답은 generation_info에
+  표시하여 LLM span의 llm.cache_hit 속성으로 남김 (langchain_tracing.py 참고)
+
+캐시는 체인별로 선택합니다 (with_cache 참고). 분석처럼 결과가 정해진 단계만 캐시하고,
+새 문제 생성처럼 매번 달라야 하는 단계는 캐시 없는 모델을 그대로 사용하세요.
+
+사용법:
+    cache = SQLiteLLMCache("llm_cache.sqlite3", ttl=7 * 24 * 3600, max_entries=50000)
+    analysis_llm = with_cache(llm, cache)
+    python llm_cache.py llm_cache.sqlite3          # 통계 출력
+    python llm_cache.py llm_cache.sqlite3 --clear  # 비우기
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+import telemetry
+from langchain_tracing import CACHE_HIT_KEY
+
+# 설정하면 get_pipeline()의 분석 단계가 이 경로의 캐시를 사용 (기본값: 캐시 사용 안 함)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # 초, 0이면 만료 없음
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+
+class SQLiteLLMCache(BaseCache):
+    def __init__(self, path: str, ttl: float = LLM_CACHE_TTL, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 여러 스레드에서 하나의 연결을 lock으로 보호하며 사용
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                telemetry.count_cache_lookups("llm", misses=1)
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        telemetry.count_cache_lookups("llm", hits=1)
+        generations = loads(row[0])
+        for generation in generations:
+            generation.generation_info = {**(generation.generation_info or {}), CACHE_HIT_KEY: True}
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        response = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        """max_entries를 넘는 만큼 가장 오래 사용하지 않은 응답을 지웁니다 (lock 안에서 호출)."""
+        if not self.max_entries:
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN"
+                " (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def with_cache(llm, cache: Optional[BaseCache]):
+    """
+    cache를 거치는 llm의 사본을 반환합니다 (cache가 None이면 llm 그대로).
+    HTTP 클라이언트 등 나머지 설정은 원본과 공유합니다.
+    """
+    if cache is None:
+        return llm
+    return llm.model_copy(update={"cache": cache})
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> Optional[SQLiteLLMCache]:
+    """LLM_CACHE_PATH가 설정되어 있으면 프로세스 공유 캐시를, 아니면 None을 반환합니다."""
+    global _default_cache
+    if not LLM_CACHE_PATH:
+        return None
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = SQLiteLLMCache(LLM_CACHE_PATH)
+    return _default_cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 응답 캐시 통계 확인/비우기")
+    parser.add_argument("path", nargs="?", default=LLM_CACHE_PATH)
+    parser.add_argument("--clear", action="store_true", help="캐시 비우기")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("캐시 경로를 지정하거나 LLM_CACHE_PATH를 설정하세요.")
+
+    cache = SQLiteLLMCache(args.path)
+    if args.clear:
+        cache.clear()
+        print("캐시를 비웠습니다.")
+    print(cache.stats())
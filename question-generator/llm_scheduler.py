@@ -0,0 +1,325 @@
+"""
+OpenAI 요청 수(RPM)·토큰 수(TPM) 한도를 지키는 LLM 호출 스케줄러.
+
+모든 파이프라인(qa.py, question_generator.py, 백엔드의 문법 교정)이 OpenAI를 호출하기 전에
+acquire()로 허락을 받습니다. 한도를 넘는 호출은 에러(429)를 받고 재시도하는 대신, 들어온 순서대로
+줄을 서서 한도가 허용하는 시점까지 기다립니다.
+
+- 비용: tiktoken으로 센 프롬프트 토큰 + max_tokens (OpenAI도 요청 시점에 이 값으로 한도를 계산)
+  tiktoken이 없으면(백엔드) UTF-8 바이트 수 / 3으로 넉넉하게 추정
+- 방식: 모델별 토큰 버킷. 분당 한도를 초 단위로 고르게 채우고, 최대 burst_seconds초 분량까지만
+  모아 둡니다. 호출은 도착 순서대로 비용을 미리 차감(잔량이 음수가 될 수 있음)하고, 잔량이 다시
+  0이 되는 시각까지 기다립니다. 폴링이나 재시도 없이 정확히 한도 속도로 호출이 나가며, 먼저 온
+  호출이 먼저 나갑니다 (FIFO).
+- 상태: SQLite 파일(LLM_SCHEDULER_PATH)에 저장하므로 Django, job_runner 워커, bulk_generate 등
+  여러 프로세스가 같은 한도를 나눠 씁니다. 설정하지 않으면 프로세스 안에서만 공유합니다.
+- LLM_RPM_LIMIT / LLM_TPM_LIMIT가 0이면 해당 한도는 검사하지 않습니다.
+- 우선순위: interactive(기본값) 호출은 위의 FIFO 줄에 서고, batch 호출은 interactive 몫
+  (최대 잔량의 LLM_INTERACTIVE_RESERVE)을 남기고도 남는 한도가 있을 때만 나갑니다. batch 호출은
+  잔량을 음수로 만들지 않으므로 interactive 호출을 늦추지 않으며, LLM_BATCH_MAX_WAIT초 넘게
+  기다린 batch 호출은 interactive 줄 끝에 서서 굶주리지 않습니다.
+  프로세스 기본값은 LLM_PRIORITY, 부분적으로는 use_priority(BATCH) 블록이나 priority 인자로 지정합니다.
+
+표준 라이브러리만 사용하므로(tiktoken은 있으면 사용) 백엔드에서도 파일 경로로 불러 씁니다
+(backend/script_editor/scripts/llm_scheduler.py 참고).
+
+사용법:
+    scheduler = get_scheduler()
+    scheduler.acquire("gpt-4", messages=[{"role": "user", "content": prompt}], max_tokens=256)
+    await scheduler.aacquire(...)  # asyncio 코드에서
+    with use_priority(BATCH):      # 이 블록의 호출은 남는 한도만 사용
+        ...
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import tiktoken
+except ImportError:  # 백엔드 환경에는 tiktoken이 없음
+    tiktoken = None
+
+LLM_SCHEDULER_PATH = os.getenv("LLM_SCHEDULER_PATH", "")  # 여러 프로세스가 공유할 상태 파일
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "500"))  # 모델별 분당 요청 수
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "30000"))  # 모델별 분당 토큰 수
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "10"))  # 모아 둘 수 있는 한도 (초 분량)
+# max_tokens를 지정하지 않은 호출의 응답 토큰 추정치
+LLM_DEFAULT_COMPLETION_TOKENS = int(os.getenv("LLM_DEFAULT_COMPLETION_TOKENS", "512"))
+
+# 우선순위: 편집기 교정, 문제 하나 생성 같은 interactive 호출이 항상 먼저 나가고,
+# 대량 생성 같은 batch 호출은 남는 한도만 사용
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+LLM_PRIORITY = os.getenv("LLM_PRIORITY", INTERACTIVE)  # 이 프로세스 호출의 기본 우선순위
+# batch 호출이 남겨 두어야 하는 interactive 몫 (버킷 최대 잔량 대비 비율)
+LLM_INTERACTIVE_RESERVE = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.2"))
+# batch 호출이 이 시간(초) 넘게 기다리면 interactive 줄에 세움 (굶주림 방지)
+LLM_BATCH_MAX_WAIT = float(os.getenv("LLM_BATCH_MAX_WAIT", "60"))
+
+_priority = contextvars.ContextVar("llm_priority", default=None)
+
+_encodings = {}
+
+
+@contextlib.contextmanager
+def use_priority(priority):
+    """with 블록 안(같은 스레드/태스크)의 LLM 호출에 우선순위를 지정합니다."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def count_tokens(text, model=""):
+    """text의 토큰 수. tiktoken이 없으면 UTF-8 바이트 수로 넉넉하게 추정합니다."""
+    if tiktoken is None:
+        return len(text.encode("utf-8")) // 3 + 1
+    encoding = _encodings.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        _encodings[model] = encoding
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_cost(model, messages=None, prompt=None, max_tokens=None):
+    """
+    호출 하나가 TPM 한도에서 차지할 토큰 수를 추정합니다.
+    messages([{"role", "content"}] 또는 content 속성이 있는 메시지 객체)나 prompt 문자열을 받습니다.
+    """
+    tokens = 0
+    if prompt is not None:
+        tokens += count_tokens(prompt, model)
+    for message in messages or []:
+        content = message["content"] if isinstance(message, dict) else message.content
+        tokens += count_tokens(str(content), model) + 4  # 메시지마다 역할/구분 토큰
+    if messages:
+        tokens += 3  # 응답 시작 토큰
+    return tokens + (max_tokens or LLM_DEFAULT_COMPLETION_TOKENS)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        path=LLM_SCHEDULER_PATH,
+        rpm=LLM_RPM_LIMIT,
+        tpm=LLM_TPM_LIMIT,
+        burst_seconds=LLM_BURST_SECONDS,
+        default_priority=LLM_PRIORITY,
+        interactive_reserve=LLM_INTERACTIVE_RESERVE,
+        batch_max_wait=LLM_BATCH_MAX_WAIT,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        """clock/sleep은 테스트에서 가짜 시계를 넣을 때만 바꿉니다 (acquire()의 대기에 sleep 사용)."""
+        if default_priority not in PRIORITIES:
+            raise ValueError(f"지원하지 않는 우선순위입니다: {default_priority}")
+        self.path = path or ":memory:"
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_seconds = burst_seconds
+        self.default_priority = default_priority
+        self.interactive_reserve = interactive_reserve
+        self.batch_max_wait = batch_max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self.calls = {name: 0 for name in PRIORITIES}
+        self.waited_seconds = {name: 0.0 for name in PRIORITIES}
+        self.promoted = 0  # 오래 기다려 interactive 줄로 옮겨진 batch 호출 수
+        self._lock = threading.Lock()
+        # timeout: 다른 프로세스가 잠깐 잠근 동안 기다림 (트랜잭션은 짧음)
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_budget (
+                name TEXT PRIMARY KEY,
+                level REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.rpm or self.tpm)
+
+    def _buckets(self, model, cost):
+        """(버킷 이름, 분당 한도, 이번 호출의 비용) 목록"""
+        buckets = []
+        if self.rpm:
+            buckets.append((f"{model}:requests", self.rpm, 1))
+        if self.tpm:
+            buckets.append((f"{model}:tokens", self.tpm, cost))
+        return buckets
+
+    def _level(self, name, per_minute, now):
+        """지금까지 채워진 잔량, 초당 충전량, 최대 잔량"""
+        rate = per_minute / 60.0
+        capacity = max(rate * self.burst_seconds, 1.0)
+        row = self._conn.execute(
+            "SELECT level, updated_at FROM llm_budget WHERE name = ?", (name,)
+        ).fetchone()
+        level = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+        return level, rate, capacity
+
+    def _transaction(self, body):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = body(self.clock())
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, model, cost):
+        """
+        요청 1개와 토큰 cost개를 interactive 줄에 예약하고, 호출 전에 기다려야 할 시간(초)을 반환합니다.
+        잔량이 음수가 될 수 있으며, 먼저 예약한 호출이 먼저 나갑니다.
+        """
+
+        def body(now):
+            delay = 0.0
+            for name, per_minute, bucket_cost in self._buckets(model, cost):
+                level, rate, capacity = self._level(name, per_minute, now)
+                # 한 호출이 버킷 전체보다 크면 버킷 전체만큼만 차감 (영원히 기다리지 않도록)
+                level -= min(bucket_cost, capacity)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_budget (name, level, updated_at) VALUES (?, ?, ?)",
+                    (name, level, now),
+                )
+                delay = max(delay, -level / rate)
+            return delay
+
+        return self._transaction(body)
+
+    def try_reserve_leftover(self, model, cost):
+        """
+        batch 호출용. interactive 몫(interactive_reserve)을 남기고도 cost를 낼 수 있으면 바로 차감하고 0을,
+        아니면 아무것도 차감하지 않고 다시 확인할 때까지 기다릴 시간(초)을 반환합니다.
+        """
+
+        def body(now):
+            levels = []
+            wait = 0.0
+            for name, per_minute, bucket_cost in self._buckets(model, cost):
+                level, rate, capacity = self._level(name, per_minute, now)
+                needed = min(min(bucket_cost, capacity) + self.interactive_reserve * capacity, capacity)
+                wait = max(wait, (needed - level) / rate)
+                levels.append((name, level - min(bucket_cost, capacity)))
+            if wait > 0:
+                return wait
+            for name, level in levels:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_budget (name, level, updated_at) VALUES (?, ?, ?)",
+                    (name, level, now),
+                )
+            return 0.0
+
+        return self._transaction(body)
+
+    def _record(self, priority, waited, promoted=False):
+        with self._lock:
+            self.calls[priority] += 1
+            self.waited_seconds[priority] += waited
+            self.promoted += promoted
+
+    def _next_step(self, model, cost, priority, waited):
+        """
+        (기다릴 시간, 허가 여부)를 반환합니다. 허가되면 기다린 뒤 바로 호출하고,
+        아니면(batch) 기다린 뒤 다시 확인합니다.
+        """
+        if priority == INTERACTIVE:
+            return self.reserve(model, cost), True
+        if waited >= self.batch_max_wait:
+            # 굶주림 방지: 오래 기다린 batch 호출은 interactive 줄 끝에 선다
+            return self.reserve(model, cost), True
+        wait = self.try_reserve_leftover(model, cost)
+        if not wait:
+            return 0.0, True
+        # 남은 양은 다른 호출이 쓸수록 줄어들 뿐이므로 wait 전에는 허가될 수 없음
+        return max(min(wait, self.batch_max_wait - waited), 0.01), False
+
+    def _resolve_priority(self, priority):
+        priority = priority or _priority.get() or self.default_priority
+        if priority not in PRIORITIES:
+            raise ValueError(f"지원하지 않는 우선순위입니다: {priority}")
+        return priority
+
+    def acquire(self, model, messages=None, prompt=None, max_tokens=None, priority=None):
+        """
+        한도 안에서 호출할 수 있을 때까지 기다립니다. 기다린 시간(초)을 반환합니다.
+        priority를 주지 않으면 use_priority()로 지정한 값, 그다음 default_priority를 사용합니다.
+        """
+        if not self.enabled:
+            return 0.0
+        priority = self._resolve_priority(priority)
+        cost = estimate_cost(model, messages, prompt, max_tokens)
+        waited = 0.0
+        while True:
+            promoted = priority == BATCH and waited >= self.batch_max_wait
+            delay, admitted = self._next_step(model, cost, priority, waited)
+            if delay:
+                self.sleep(delay)
+            waited += delay
+            if admitted:
+                self._record(priority, waited, promoted)
+                return waited
+
+    async def aacquire(self, model, messages=None, prompt=None, max_tokens=None, priority=None):
+        """acquire()의 asyncio 버전. 예약(짧은 SQLite 트랜잭션)만 스레드에서 실행합니다."""
+        if not self.enabled:
+            return 0.0
+        priority = self._resolve_priority(priority)
+        cost = estimate_cost(model, messages, prompt, max_tokens)
+        waited = 0.0
+        while True:
+            promoted = priority == BATCH and waited >= self.batch_max_wait
+            delay, admitted = await asyncio.to_thread(self._next_step, model, cost, priority, waited)
+            if delay:
+                await asyncio.sleep(delay)
+            waited += delay
+            if admitted:
+                self._record(priority, waited, promoted)
+                return waited
+
+    def stats(self):
+        with self._lock:
+            return {
+                priority: {
+                    "calls": self.calls[priority],
+                    "waited_seconds": self.waited_seconds[priority],
+                    "average_wait": (
+                        self.waited_seconds[priority] / self.calls[priority]
+                        if self.calls[priority]
+                        else 0.0
+                    ),
+                }
+                for priority in PRIORITIES
+            } | {"promoted": self.promoted}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 공유 스케줄러 (LLM_SCHEDULER_PATH가 있으면 다른 프로세스와도 공유)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
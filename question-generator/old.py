@@ -6,6 +6,10 @@ from langchain.agents import AgentExecutor, create_tool_calling_agent, create_re
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.output_parsers import StructuredOutputParser, ResponseSchema
 from langchain.memory import ConversationBufferMemory
+from langchain_core.tools import render_text_description
+
+from few_shot import FewShotSelector
+from llm_scheduler import count_tokens
 
 
 
@@ -21,7 +25,8 @@ if not OPENAI_API_KEY:
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
 # 메모리 초기화
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+# 프롬프트 입력이 input과 examples 두 개이므로 대화 기록에 남길 입력을 지정
+memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True, input_key="input")
 
 def invoke_llm(llm, query):
     """Utility function to invoke LLM and return its output."""
@@ -99,7 +104,7 @@ class SpecialistAgent:
 You will receive the input as a string with the following structure:
 
 Example Input:
-"The most useful thing I brought out of my childhood was confidence in reading. Not long ago, I went on a weekend self-exploratory workshop, in the hope of getting a clue about how to live. One of the exercises we were given (A) [was/were] to make a list of the ten most important events of our lives. Number one was: "I was born," and you could put (B) [however/whatever] you liked after that. Without even thinking about it, my hand wrote at number two: "I learned to read." "I was born and learned to read" wouldn't be a sequence that occurs to many people, I imagine. But I knew what I meant to say. Being born was something (C) [done/doing] to me, but my own life began when I first made out the meaning of a sentence."
+"<the passage of an English grammar question, with (A) [x/y] boxes or ①~⑤ underlined parts>"
 
 Use the provided string data to analyze or generate the required output based on your role.
 """,
@@ -109,13 +114,9 @@ You will receive the input as a JSON format with the following structure:
 
 Example Input:
 {
-    "original_question": "The most useful thing I brought out of my childhood was confidence in reading. Not long ago, I went on a weekend self-exploratory workshop, in the hope of getting a clue about how to live. One of the exercises we were given (A) [was/were] to make a list of the ten most important events of our lives. Number one was: "I was born," and you could put (B) [however/whatever] you liked after that. Without even thinking about it, my hand wrote at number two: "I learned to read." "I was born and learned to read" wouldn't be a sequence that occurs to many people, I imagine. But I knew what I meant to say. Being born was something (C) [done/doing] to me, but my own life began when I first made out the meaning of a sentence."
+    "original_question": "<the passage of the original question>",
     "question_type": "box",
-    "grammar_points": '''
-    - (A) Subject-verb agreement: In the structure "One of [plural noun]," the singular subject "One" requires a singular verb, so the answer is "was."
-    - (B) Understanding compound relative pronouns: "you liked after that" requires "whatever" as the object of the verb "liked."
-    - (C) Understanding active and passive voice: "Being born" implies a passive meaning, so the answer should also reflect a passive form, which is "done."
-    '''
+    "grammar_points": "<grammar points of the original question, one per line>"
 }
 Use the provided JSON data to analyze or generate the required output based on your role.
 """,
@@ -124,20 +125,18 @@ You will receive the input as a JSON format with the following structure:
 
 Example Input:
 {
-    "original_question": "The most useful thing I brought out of my childhood was confidence in reading. Not long ago, I went on a weekend self-exploratory workshop, in the hope of getting a clue about how to live. One of the exercises we were given (A) [was/were] to make a list of the ten most important events of our lives. Number one was: "I was born," and you could put (B) [however/whatever] you liked after that. Without even thinking about it, my hand wrote at number two: "I learned to read." "I was born and learned to read" wouldn't be a sequence that occurs to many people, I imagine. But I knew what I meant to say. Being born was something (C) [done/doing] to me, but my own life began when I first made out the meaning of a sentence."
+    "original_question": "<the passage of the original question>",
     "question_type": "box",
-    "grammar_points": '''
-    - (A) Subject-verb agreement: In the structure "One of [plural noun]," the singular subject "One" requires a singular verb, so the answer is "was."
-    - (B) Understanding compound relative pronouns: "you liked after that" requires "whatever" as the object of the verb "liked."
-    - (C) Understanding active and passive voice: "Being born" implies a passive meaning, so the answer should also reflect a passive form, which is "done."
-    ''',
+    "grammar_points": "<grammar points of the original question, one per line>",
     "generated_question": A new question text goes here.
 }
 """
 }
     
-    def __init__(self, name, tools, temperature, memory):
+    def __init__(self, name, tools, temperature, memory, few_shot=None):
         self.name = name
+        # 예시 문제는 호출마다 입력과 비슷한 것만 골라 넣음 (few_shot.py)
+        self.few_shot = few_shot or FewShotSelector()
         self.llm = ChatOpenAI(
             model="gpt-4o",
             temperature=temperature
@@ -160,32 +159,7 @@ Answer the following questions as best you can. You have access to the following
 - **'underlined'**: Questions where you correct the underlined parts of the text.
 
 ### Example Questions:
-```Example Question 1
-The most useful thing I brought out of my childhood was confidence in reading. Not long ago, I went on a weekend self-exploratory workshop, in the hope of getting a clue about how to live. One of the exercises we were given (A) [was/were] to make a list of the ten most important events of our lives. Number one was: "I was born," and you could put (B) [however/whatever] you liked after that. Without even thinking about it, my hand wrote at number two: "I learned to read." "I was born and learned to read" wouldn't be a sequence that occurs to many people, I imagine. But I knew what I meant to say. Being born was something (C) [done/doing] to me, but my own life began when I first made out the meaning of a sentence.
-
-Question Type: 'box'
-Answer:
-(A) was - (B) whatever - (C) done
-
-Grammar Points:
-- (A) Subject-verb agreement: In the structure "One of [plural noun]," the singular subject "One" requires a singular verb, so the answer is "was."
-- (B) Understanding compound relative pronouns: "you liked after that" requires "whatever" as the object of the verb "liked."
-- (C) Understanding active and passive voice: "Being born" implies a passive meaning, so the answer should also reflect a passive form, which is "done."
-```
-
-```Example Question 2
-Like most parents, you might have spent money on a toy that your child didn’t play with very much. You might have found your child playing ① much with the box than the toy that came in it. There is one toy that is a guaranteed winner for children ― Blocks. ② Buying a set of table blocks, cube blocks, or cardboard blocks is a very good investment in your child’s play. Blocks help children ③ learn many subjects. Children learn ④ a lot about shapes and sizes. Young children develop math skills by counting, matching, sorting, grouping, and ⑤ adding blocks while they play.
-
-Question Type: 'underlined'
-Answer: ① more
-
-Grammar Points:
-- (① much → more): In comparative structures, "more" is used to indicate a higher degree of action or quality compared to something else. Here, the correct expression is "playing more with the box than the toy," as "more" is required to complete the comparative structure with "than."
-- (② Buying): The gerund "Buying" is correctly used as the subject of the sentence. Gerunds function as nouns and can serve as the subject of a verb, as seen in "Buying a set of blocks is a very good investment."
-- (③ learn): The base form "learn" is correctly used after the verb "help." In English, "help" is followed by the bare infinitive (base form) or a to-infinitive. Both are acceptable.
-- (④ a lot): The phrase "a lot" is correctly used to describe the extent of learning ("learn a lot about shapes and sizes"). This is grammatically correct and contextually appropriate.
-- (⑤ adding): The gerund "adding" is correctly used after the preposition "by" to indicate the means or method ("by counting, matching, sorting, grouping, and adding blocks").
-```
+{examples}
 
 Use the following format:
  
@@ -217,6 +191,11 @@ IMPORTANT: THE OUTPUT STRUCTURE MUST FOLLOW THE INSTRUCTION: {instruction}
             "input_format": self.get_input_format()
         }
         prompt = ChatPromptTemplate.from_template(template=global_template).partial(**template_values)
+        # 예시를 제외한 프롬프트의 토큰 수를 세기 위한 템플릿 (create_react_agent가 채우는 값 포함)
+        self.budget_prompt = prompt.partial(
+            tools=render_text_description(list(tools)),
+            tool_names=", ".join(t.name for t in tools),
+        )
         self.agent = create_react_agent(llm=self.llm, tools=tools, prompt=prompt)
         self.agent_executor = AgentExecutor(
             agent=self.agent,
@@ -238,8 +217,16 @@ IMPORTANT: THE OUTPUT STRUCTURE MUST FOLLOW THE INSTRUCTION: {instruction}
     def get_input_format(self):
         return self.INPUT_FORMAT.get(self.name)
 
-    def run(self, input):
-        result = self.agent_executor.invoke({"input": query})["output"]
+    def run(self, input, example_text=None):
+        """
+        example_text: 예시 문제를 고를 때 검색할 지문 (기본값: input).
+        input에 지시문이 붙어 있으면 지문만 넘겨야 지시문이 검색어에 섞이지 않습니다.
+        """
+        base_prompt = self.budget_prompt.format(input=input, examples="", agent_scratchpad="")
+        examples = self.few_shot.select(
+            example_text or input, count_tokens(base_prompt, self.llm.model_name)
+        )
+        result = self.agent_executor.invoke({"input": input, "examples": examples})["output"]
         return result
 
 
@@ -252,7 +239,7 @@ analyzer_agent = SpecialistAgent(name="analyzer", tools=[analyze_question], temp
 # validator_agent_executor = AgentExecutor(agent=validator_agent, tools=analyze_question)
 
 def initialize_question_generation(query: str, original_question: str):
-    analyzer_result = analyzer_agent.run(f"{query}: {original_question}")
+    analyzer_result = analyzer_agent.run(f"{query}: {original_question}", example_text=original_question)
     print(analyzer_result)
     return
 
@@ -1,10 +1,22 @@
 from langchain.agents import AgentExecutor, Tool, create_react_agent
 from langchain.prompts import PromptTemplate
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
+from langchain_core.output_parsers import StrOutputParser
+from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from langchain_core.exceptions import OutputParserException
 from langchain_openai import ChatOpenAI
 from langchain.tools import tool
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import threading
+
+import httpx
+
+from llm_cache import default_cache, with_cache
+from llm_scheduler import get_scheduler
+from telemetry import span
+import langchain_tracing  # noqa: F401  모든 체인/도구/LLM 호출을 span으로 기록
 
 from dotenv import load_dotenv
 import os
@@ -15,54 +27,103 @@ load_dotenv()
 # OpenAI API 키 가져오기
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# 문제 분석 방식 (QuestionAnalysisAgent.analyze 참고)
+ANALYSIS_MODE = os.getenv("QUESTION_ANALYSIS_MODE", "agent")
+
+# 서로 독립적인 분석 도구를 동시에 호출할 스레드 수 (1이면 순서대로 호출)
+ANALYSIS_WORKERS = int(os.getenv("QUESTION_ANALYSIS_WORKERS", "4"))
+
+# OpenAI API 연결 풀 크기 (프로세스 전체에서 공유)
+HTTP_MAX_CONNECTIONS = int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_HTTP_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_TIMEOUT = float(os.getenv("OPENAI_HTTP_TIMEOUT", "60"))
+
+# 분석 결과 필드 ↔ 분석 도구 이름
+ANALYSIS_TOOLS = {
+    "grammar_analysis": "analyze_grammar",
+    "question_type": "identify_question_type",
+    "topic_analysis": "analyze_topic",
+    "difficulty_level": "analyze_difficulty",
+}
+
+# 한 번의 호출로 네 가지 분석을 모두 받기 위한 출력 스키마
+ANALYSIS_SCHEMAS = [
+    ResponseSchema(name="question_type", description="문제 유형 (빈칸 채우기, 어법, 독해 등)"),
+    ResponseSchema(name="grammar_analysis", description="문제의 문법적 구조 분석"),
+    ResponseSchema(name="topic_analysis", description="지문의 주제와 핵심 내용"),
+    ResponseSchema(
+        name="difficulty_level",
+        description="난이도 (수능, 고1, 고2, 고3 등의 수준)와 그렇게 판단한 근거",
+    ),
+]
+
+
+def tool_input_text(tool_input) -> str:
+    """에이전트가 도구에 넘긴 입력을 문자열로 반환합니다 (dict 입력이면 question 인자)."""
+    if isinstance(tool_input, dict):
+        tool_input = tool_input.get("question", "")
+    return str(tool_input).strip()
+
 
 class QuestionAnalysisAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, workers: int = None):
         self.llm = llm
+        self.workers = workers or ANALYSIS_WORKERS
+
+        # 프롬프트와 체인은 객체를 만들 때 한 번만 구성하고 모든 호출에서 재사용
+        analyze_grammar_prompt = PromptTemplate(
+            input_variables=["question"],
+            template="다음 영어 문제의 문법적 구조를 분석해주세요:\n{question}",
+        )
+        self.analyze_grammar_chain = (
+            analyze_grammar_prompt | self.llm | StrOutputParser()
+        )
+
+        identify_question_type_prompt = PromptTemplate(
+            input_variables=["question"],
+            template="다음 영어 문제가 어떤 유형인지 파악해주세요 (빈칸 채우기, 어법, 독해 등):\n{question}",
+        )
+        self.identify_question_type_chain = (
+            identify_question_type_prompt | self.llm | StrOutputParser()
+        )
+
+        analyze_topic_prompt = PromptTemplate(
+            input_variables=["question"],
+            template="다음 영어 지문의 주제와 핵심 내용을 간단히 분석해주세요:\n{question}",
+        )
+        self.analyze_topic_chain = analyze_topic_prompt | self.llm | StrOutputParser()
+
+        analyze_difficulty_prompt = PromptTemplate(
+            input_variables=["question"],
+            template="""다음 영어 문제의 난이도를 분석해주세요 (수능, 고1, 고2, 고3 등의 수준으로 판단):
+                문제: {question}
+                
+                난이도를 판단한 근거와 함께 제시해주세요.""",
+        )
+        self.analyze_difficulty_chain = (
+            analyze_difficulty_prompt | self.llm | StrOutputParser()
+        )
 
         # 도구 정의
         @tool
         def analyze_grammar(question: str) -> str:
             """문제의 문법적 구조를 분석합니다."""
-            prompt = PromptTemplate(
-                input_variables=["question"],
-                template="다음 영어 문제의 문법적 구조를 분석해주세요:\n{question}",
-            )
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            return chain.run(question=question)
+            return self.analyze_grammar_chain.invoke({"question": question})
 
         @tool
         def identify_question_type(question: str) -> str:
             """문의 유형을 파악합니다."""
-            prompt = PromptTemplate(
-                input_variables=["question"],
-                template="다음 영어 문제가 어떤 유형인지 파악해주세요 (빈칸 채우기, 어법, 독해 등):\n{question}",
-            )
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            return chain.run(question=question)
+            return self.identify_question_type_chain.invoke({"question": question})
 
         @tool
         def analyze_topic(question: str) -> str:
             """지문의 주제와 핵심 내용을 분석합니다."""
-            prompt = PromptTemplate(
-                input_variables=["question"],
-                template="다음 영어 지문의 주제와 핵심 내용을 간단히 분석해주세요:\n{question}",
-            )
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            return chain.run(question=question)
+            return self.analyze_topic_chain.invoke({"question": question})
 
         @tool
         def analyze_difficulty(question: str) -> str:
             """문제의 난이도를 분석합니다."""
-            prompt = PromptTemplate(
-                input_variables=["question"],
-                template="""다음 영어 문제의 난이도를 분석해주세요 (수능, 고1, 고2, 고3 등의 수준으로 판단):
-                문제: {question}
-                
-                난이도를 판단한 근거와 함께 제시해주세요.""",
-            )
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            return chain.run(question=question)
+            return self.analyze_difficulty_chain.invoke({"question": question})
 
         self.tools = [
             analyze_grammar,
@@ -120,12 +181,85 @@ Difficulty: [difficulty analysis]
             verbose=True,
             max_iterations=3,
             handle_parsing_errors="Check your output and make sure it conforms! Only output the Final Answer.",
+            return_intermediate_steps=True,  # 도구 결과를 analyze()에서 재사용
         )
 
-    def analyze(self, question: str) -> dict:
+        # 단일 호출 분석 (structured 모드)
+        self.structured_parser = StructuredOutputParser(response_schemas=ANALYSIS_SCHEMAS)
+        structured_prompt = PromptTemplate(
+            input_variables=["question"],
+            partial_variables={
+                "format_instructions": self.structured_parser.get_format_instructions()
+            },
+            template="""다음 영어 문제를 분석해주세요.
+                1. 문제 유형 (빈칸 채우기, 어법, 독해 등)
+                2. 문법적 구조
+                3. 지문의 주제와 핵심 내용
+                4. 난이도 (수능, 고1, 고2, 고3 등의 수준으로 판단, 근거 포함)
+
+                문제: {question}
+
+                {format_instructions}""",
+        )
+        self.structured_chain = structured_prompt | self.llm | self.structured_parser
+
+    def run_tools(self, question: str, observations: dict = None) -> dict:
+        """
+        네 가지 분석 도구의 결과를 {결과 필드: 내용}으로 반환합니다.
+        observations({도구 이름: 결과})에 이미 있는 도구는 다시 호출하지 않습니다.
+        분석끼리는 서로 독립적이므로 남은 도구는 최대 self.workers개까지 동시에 호출하며,
+        소요 시간은 가장 느린 분석 하나에 가까워집니다.
+        각 도구 호출은 현재 context를 복사한 스레드에서 실행하므로 question.analysis.tools span 아래에 기록됩니다.
+        """
+        observations = observations or {}
+        tools = {t.name: t for t in self.tools}
+        results = {
+            field: str(observations[tool_name])
+            for field, tool_name in ANALYSIS_TOOLS.items()
+            if tool_name in observations
+        }
+        pending = [field for field in ANALYSIS_TOOLS if field not in results]
+        with span("question.analysis.tools", reused=len(results), pending=len(pending)):
+            if self.workers > 1 and len(pending) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+                    # span과 LLM 우선순위(llm_scheduler.use_priority)가 워커 스레드에서도 유지되도록
+                    # 호출마다 현재 context를 복사해서 실행
+                    futures = {
+                        field: executor.submit(
+                            contextvars.copy_context().run,
+                            tools[ANALYSIS_TOOLS[field]].run,
+                            question,
+                        )
+                        for field in pending
+                    }
+                    results.update({field: future.result() for field, future in futures.items()})
+            else:
+                for field in pending:
+                    results[field] = tools[ANALYSIS_TOOLS[field]].run(question)
+        # 필드 순서는 순차 실행과 동일하게 유지
+        return {field: results[field] for field in ANALYSIS_TOOLS}
+
+    def analyze_structured(self, question: str) -> dict:
+        """
+        네 가지 분석을 스키마가 정해진 JSON으로 한 번에 요청합니다.
+        모델이 형식에 맞지 않는 응답을 주면 도구별 분석으로 대체합니다.
+        """
+        try:
+            with span("question.analysis.structured"):
+                analysis = self.structured_chain.invoke({"question": question})
+        except OutputParserException:
+            analysis = self.run_tools(question)
+        return {field: str(analysis[field]) for field in ANALYSIS_TOOLS}
+
+    def analyze(self, question: str, mode: str = None) -> dict:
         """
         문제를 분석하고 결과를 JSON 형태로 반환합니다.
 
+        mode:
+            "agent"      : ReAct 에이전트를 실행하고, 에이전트가 이미 호출한 도구의 결과는 재사용하여
+                           나머지 분석만 추가로 호출 (기본값)
+            "structured" : 에이전트 없이 한 번의 호출로 네 가지 분석을 JSON으로 받음
+
         Returns:
             dict: {
                 "question_type": str,
@@ -135,21 +269,33 @@ Difficulty: [difficulty analysis]
                 "raw_analysis": dict
             }
         """
-        # 기존 에이전트 실행
-        raw_result = self.agent_executor.invoke({"input": question})
-
-        # 개별 분석 실행
-        grammar_analysis = self.tools[0].run(question)
-        question_type = self.tools[1].run(question)
-        topic_analysis = self.tools[2].run(question)
-        difficulty_level = self.tools[3].run(question)
+        mode = mode or ANALYSIS_MODE
+        if mode == "structured":
+            analysis = self.analyze_structured(question)
+            raw_result = {"input": question, "output": dict(analysis)}
+        elif mode == "agent":
+            # 기존 에이전트 실행 (ReAct 계획 단계의 LLM 호출은 question.analysis.react.llm로 기록)
+            with span("question.analysis.react"):
+                raw_result = self.agent_executor.invoke({"input": question})
+
+            # 에이전트가 이 문제 그대로를 넣어 호출한 도구의 결과(observation)만 재사용하고 나머지는 개별 분석 실행
+            # (에이전트가 입력을 요약하거나 바꿔 넣었다면 그 결과는 이 문제에 대한 분석이 아님)
+            observations = {
+                action.tool: observation
+                for action, observation in raw_result.pop("intermediate_steps", [])
+                if action.tool in ANALYSIS_TOOLS.values()
+                and tool_input_text(action.tool_input) == question.strip()
+            }
+            analysis = self.run_tools(question, observations)
+        else:
+            raise ValueError(f"지원하지 않는 분석 방식입니다: {mode}")
 
         # 구조화된 결과 반환
         return {
-            "question_type": question_type.strip(),
-            "grammar_analysis": grammar_analysis.strip(),
-            "topic_analysis": topic_analysis.strip(),
-            "difficulty_level": difficulty_level.strip(),
+            "question_type": analysis["question_type"].strip(),
+            "grammar_analysis": analysis["grammar_analysis"].strip(),
+            "topic_analysis": analysis["topic_analysis"].strip(),
+            "difficulty_level": analysis["difficulty_level"].strip(),
             "raw_analysis": raw_result,
         }
 
@@ -158,6 +304,59 @@ class QuestionGeneratorAgent:
     def __init__(self, llm):
         self.llm = llm
 
+        # 프롬프트와 체인은 객체를 만들 때 한 번만 구성하고 모든 호출에서 재사용
+        generate_grammar_question_prompt = PromptTemplate(
+            input_variables=["grammar_analysis", "question_type"],
+            template="""Based on the following grammar analysis and question type, generate a new English question:
+                Grammar Analysis: {grammar_analysis}
+                Question Type: {question_type}
+                
+                Please create a new English question that:
+                1. Follows the same grammatical structure and difficulty level
+                2. Matches the specified question type exactly
+                3. Uses natural, academic English appropriate for high school students
+                4. Includes clear instructions in English
+                
+                Generate the complete question in English, including any necessary context and answer choices.""",
+        )
+        self.generate_grammar_question_chain = (
+            generate_grammar_question_prompt | self.llm | StrOutputParser()
+        )
+
+        generate_topic_question_prompt = PromptTemplate(
+            input_variables=["topic_analysis", "question_type"],
+            template="""Based on the following topic analysis and question type, generate a new English passage and question:
+                Topic Analysis: {topic_analysis}
+                Question Type: {question_type}
+                
+                Please create:
+                1. A new English passage that:
+                   - Covers a similar topic and main ideas
+                   - Uses appropriate academic language
+                   - Has similar length and complexity
+                
+                2. A question that:
+                   - Matches the specified question type exactly
+                   - Tests understanding of similar concepts
+                   - Includes clear instructions and answer choices in English
+                
+                Generate both the passage and question in English.""",
+        )
+        self.generate_topic_question_chain = (
+            generate_topic_question_prompt | self.llm | StrOutputParser()
+        )
+
+        adapt_difficulty_prompt = PromptTemplate(
+            input_variables=["question", "target_level"],
+            template="""다음 문제의 난이도를 {target_level} 수준으로 조정해주세요:
+                문제: {question}
+                
+                난이도를 조정한 새로운 버전의 문제를 제시해주세요.""",
+        )
+        self.adapt_difficulty_chain = (
+            adapt_difficulty_prompt | self.llm | StrOutputParser()
+        )
+
         # 도구 정의
         @tool
         def generate_grammar_question(analysis: dict) -> str:
@@ -178,31 +377,13 @@ class QuestionGeneratorAgent:
                         "question_type": "grammar",
                     }
 
-            prompt = PromptTemplate(
-                input_variables=["grammar_analysis", "question_type"],
-                template="""Based on the following grammar analysis and question type, generate a new English question:
-                Grammar Analysis: {grammar_analysis}
-                Question Type: {question_type}
-                
-                Please create a new English question that:
-                1. Follows the same grammatical structure and difficulty level
-                2. Matches the specified question type exactly
-                3. Uses natural, academic English appropriate for high school students
-                4. Includes clear instructions in English
-                
-                Generate the complete question in English, including any necessary context and answer choices.""",
-            )
-            chain = prompt | self.llm
-
-            result = chain.invoke(
+            return self.generate_grammar_question_chain.invoke(
                 {
                     "grammar_analysis": analysis.get("grammar_analysis", ""),
                     "question_type": analysis.get("question_type", ""),
                 }
             )
 
-            return result.content if hasattr(result, "content") else str(result)
-
         @tool
         def generate_topic_question(analysis: dict) -> str:
             """주제 분석을 바탕으로 새로운 지문과 문제를 생성합니다.
@@ -219,48 +400,19 @@ class QuestionGeneratorAgent:
                 except:
                     analysis = {"topic_analysis": analysis}
 
-            prompt = PromptTemplate(
-                input_variables=["topic_analysis", "question_type"],
-                template="""Based on the following topic analysis and question type, generate a new English passage and question:
-                Topic Analysis: {topic_analysis}
-                Question Type: {question_type}
-                
-                Please create:
-                1. A new English passage that:
-                   - Covers a similar topic and main ideas
-                   - Uses appropriate academic language
-                   - Has similar length and complexity
-                
-                2. A question that:
-                   - Matches the specified question type exactly
-                   - Tests understanding of similar concepts
-                   - Includes clear instructions and answer choices in English
-                
-                Generate both the passage and question in English.""",
-            )
-            chain = prompt | self.llm
-
-            result = chain.invoke(
+            return self.generate_topic_question_chain.invoke(
                 {
                     "topic_analysis": analysis.get("topic_analysis", ""),
                     "question_type": analysis.get("question_type", ""),
                 }
             )
 
-            return result.content if hasattr(result, "content") else str(result)
-
         @tool
         def adapt_difficulty(question: str, target_level: str) -> str:
             """생성된 문제의 난이도를 조정합니다."""
-            prompt = PromptTemplate(
-                input_variables=["question", "target_level"],
-                template="""다음 문제의 난이도를 {target_level} 수준으로 조정해주세요:
-                문제: {question}
-                
-                난이도를 조정한 새로운 버전의 문제를 제시해주세요.""",
+            return self.adapt_difficulty_chain.invoke(
+                {"question": question, "target_level": target_level}
             )
-            chain = LLMChain(llm=self.llm, prompt=prompt)
-            return chain.run(question=question, target_level=target_level)
 
         self.tools = [
             generate_grammar_question,
@@ -330,12 +482,134 @@ class QuestionGeneratorAgent:
 # ... (기존 클래스들은 그대로 유지) ...
 
 
-def process_question(question_text: str) -> dict:
+class ScheduledChatOpenAI(ChatOpenAI):
+    """
+    실제 API를 호출하기 전에 llm_scheduler로 RPM/TPM 한도 안의 차례를 기다리는 ChatOpenAI.
+    캐시에서 응답을 찾은 호출은 _generate까지 오지 않으므로 한도를 쓰지 않습니다.
+    차례를 기다린 시간은 llm_scheduler.wait span으로 기록합니다.
+    """
+
+    def _wait_for_budget(self, messages, kwargs):
+        with span("llm_scheduler.wait", **{"gen_ai.request.model": self.model_name}):
+            return get_scheduler().acquire(
+                self.model_name,
+                messages=messages,
+                max_tokens=kwargs.get("max_tokens", self.max_tokens),
+            )
+
+    async def _await_budget(self, messages, kwargs):
+        with span("llm_scheduler.wait", **{"gen_ai.request.model": self.model_name}):
+            return await get_scheduler().aacquire(
+                self.model_name,
+                messages=messages,
+                max_tokens=kwargs.get("max_tokens", self.max_tokens),
+            )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._wait_for_budget(messages, kwargs)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await self._await_budget(messages, kwargs)
+        return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._wait_for_budget(messages, kwargs)
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await self._await_budget(messages, kwargs)
+        async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            yield chunk
+
+
+def make_chat_model(model: str = "gpt-4", temperature: float = 0.7) -> ChatOpenAI:
+    """
+    연결 풀을 쓰는 httpx 클라이언트를 공유하는 ChatOpenAI를 만듭니다.
+    호출마다 새 연결(TLS 핸드셰이크)을 맺지 않고 keep-alive 연결을 재사용하며,
+    모든 호출은 프로세스(또는 LLM_SCHEDULER_PATH를 공유하는 프로세스들) 공통의 RPM/TPM 한도를 따릅니다.
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS,
+    )
+    return ScheduledChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=httpx.Client(limits=limits, timeout=HTTP_TIMEOUT),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=HTTP_TIMEOUT),
+    )
+
+
+class QuestionPipeline:
+    """
+    분석 에이전트와 생성 에이전트를 한 번만 만들어 두고 재사용하는 문제 처리 파이프라인.
+
+    프롬프트, 체인, 에이전트는 생성 시에 모두 구성되며 호출 사이에 상태를 저장하지 않으므로
+    하나의 객체를 여러 스레드에서 동시에 호출해도 됩니다. 프로세스당 하나면 충분하며,
+    기본 모델을 쓰는 경우 get_pipeline()으로 공유 객체를 가져옵니다.
+
+    cache(llm_cache.SQLiteLLMCache 등)를 주면 같은 문항을 다시 분석할 때 저장된 응답을 사용합니다.
+    캐시는 분석 단계에만 적용하고, 새 문제 생성은 매번 새로 호출합니다.
+
+    process()는 question.process span 아래에 question.analysis, question.generation 단계와
+    그 안의 에이전트/도구/LLM 호출 span을 남깁니다 (telemetry.py, langchain_tracing.py 참고).
+    """
+
+    def __init__(self, llm=None, analysis_mode: str = None, cache=None):
+        self.llm = llm if llm is not None else make_chat_model()
+        self.analysis_mode = analysis_mode
+        self.cache = cache
+        self.analysis_agent = QuestionAnalysisAgent(with_cache(self.llm, cache))
+        self.generator_agent = QuestionGeneratorAgent(self.llm)
+
+    def process(self, question_text: str, analysis_mode: str = None) -> dict:
+        """process_question()과 같은 형식의 결과를 반환합니다."""
+        mode = analysis_mode or self.analysis_mode or ANALYSIS_MODE
+        with span("question.process", analysis_mode=mode, cached=self.cache is not None):
+            # 분석 수행
+            with span("question.analysis", analysis_mode=mode):
+                analysis_result = self.analysis_agent.analyze(question_text, mode=mode)
+
+            # 새로운 문제 생성
+            with span("question.generation"):
+                generated_question = self.generator_agent.generate(
+                    analysis_result, target_level=analysis_result["difficulty_level"]
+                )
+
+        return {
+            "original_analysis": analysis_result,
+            "generated_question": generated_question,
+        }
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> QuestionPipeline:
+    """
+    기본 모델(gpt-4)을 쓰는 프로세스 공유 파이프라인을 반환합니다.
+    LLM_CACHE_PATH가 설정되어 있으면 분석 단계가 그 경로의 응답 캐시를 사용합니다.
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = QuestionPipeline(cache=default_cache())
+    return _pipeline
+
+
+def process_question(question_text: str, llm=None, analysis_mode: str = None) -> dict:
     """
     입력받은 문제를 분석하고 새로운 문제를 생성하는 전체 프로세스를 실행합니다.
+    llm을 넘기지 않으면 프로세스 공유 파이프라인(get_pipeline())을 사용합니다.
+    같은 llm으로 여러 번 호출한다면 QuestionPipeline(llm)을 한 번 만들어 재사용하세요.
 
     Args:
         question_text: 분석할 영어 문제 텍스트
+        llm: 사용할 채팅 모델 (기본값: gpt-4, 오프라인 테스트는 fake_llm.FakeChatModel)
+        analysis_mode: "agent" 또는 "structured" (기본값: QUESTION_ANALYSIS_MODE 환경 변수)
 
     Returns:
         dict: {
@@ -343,23 +617,8 @@ def process_question(question_text: str) -> dict:
             "generated_question": dict
         }
     """
-    # LLM 초기화
-    llm = ChatOpenAI(model="gpt-4", temperature=0.7)
-
-    # 분석 에이전트 생성 및 분석 수행
-    analysis_agent = QuestionAnalysisAgent(llm)
-    analysis_result = analysis_agent.analyze(question_text)
-
-    # 생성 에이전트 생성 및 새로운 문제 생성
-    generator_agent = QuestionGeneratorAgent(llm)
-    generated_question = generator_agent.generate(
-        analysis_result, target_level=analysis_result["difficulty_level"]
-    )
-
-    return {
-        "original_analysis": analysis_result,
-        "generated_question": generated_question,
-    }
+    pipeline = get_pipeline() if llm is None else QuestionPipeline(llm)
+    return pipeline.process(question_text, analysis_mode=analysis_mode)
 
 
 if __name__ == "__main__":
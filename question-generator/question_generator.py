@@ -1,7 +1,7 @@
 from langchain.agents import AgentExecutor, Tool
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
-from langchain_openai import ChatOpenAI
+from llm_cache import default_cache, with_cache
 from dotenv import load_dotenv
 import os
 
@@ -69,10 +69,12 @@ class QuestionValidationAgent:
 
 # 실행기 생성
 class QuestionGeneratorPipeline:
-    def __init__(self, llm):
-        self.analysis_agent = QuestionAnalysisAgent(llm)
+    def __init__(self, llm, cache=None):
+        # 분석과 검증은 같은 입력이면 캐시된 응답을 재사용하고, 문제 생성은 매번 새로 호출
+        cached_llm = with_cache(llm, cache)
+        self.analysis_agent = QuestionAnalysisAgent(cached_llm)
         self.generation_agent = QuestionGenerationAgent(llm)
-        self.validation_agent = QuestionValidationAgent(llm)
+        self.validation_agent = QuestionValidationAgent(cached_llm)
 
     def run_pipeline(self, example_question):
         # Step 1: 문제 분석
@@ -93,11 +95,38 @@ class QuestionGeneratorPipeline:
             "validation": validation,
         }
 
+    def run_batch(self, example_questions, max_concurrency=4):
+        """
+        여러 문항을 한 번에 처리합니다. 분석 → 생성 → 검증은 앞 단계의 결과가 필요하므로
+        문항 하나 안에서는 순서대로 실행하고, 각 단계에서 문항들의 체인 호출을 동시에 보냅니다.
+        run_pipeline()과 같은 형식의 결과를 입력 순서대로 담은 리스트를 반환합니다.
+        """
+        config = {"max_concurrency": max_concurrency}
+        analyses = self.analysis_agent.chain.batch(
+            [{"example_question": question} for question in example_questions], config
+        )
+        generated = self.generation_agent.chain.batch(
+            [{"analysis": analysis["text"]} for analysis in analyses], config
+        )
+        validations = self.validation_agent.chain.batch(
+            [{"generated_question": question["text"]} for question in generated], config
+        )
+        return [
+            {
+                "analysis": analysis["text"],
+                "generated_question": question["text"],
+                "validation": validation["text"],
+            }
+            for analysis, question, validation in zip(analyses, generated, validations)
+        ]
+
 
 if __name__ == "__main__":
-    # GPT-4를 LLM으로 초기화 (ChatOpenAI 사용)
-    llm = ChatOpenAI(model="gpt-4", temperature=0.7, openai_api_key=api_key)
-    pipeline = QuestionGeneratorPipeline(llm)
+    # GPT-4를 LLM으로 초기화 (RPM/TPM 스케줄러를 거치는 ChatOpenAI)
+    from qa import make_chat_model
+
+    llm = make_chat_model("gpt-4", temperature=0.7)
+    pipeline = QuestionGeneratorPipeline(llm, cache=default_cache())
 
     # 예시 문항 입력
     example_question = (
@@ -0,0 +1,436 @@
+"""
+파이프라인 단계별 트레이싱(span)과 지연 시간 지표.
+
+문제 분석/생성(qa.py, bulk_generate.py, job_runner.py)과 백엔드의 문법 교정, 문제은행 검색,
+임베딩, DB 쿼리가 함께 사용합니다.
+
+- span(name, **attributes): with 블록 하나가 span 하나입니다. 끝나면 소요 시간을
+  stage_duration_seconds{stage, status} 히스토그램에 기록합니다 (stage 기본값은 name).
+  span 안에서 시작한 span은 자식 span이 됩니다 (스레드 풀에서는 contextvars.copy_context()로 넘김).
+- OpenTelemetry(opentelemetry-api)가 설치되어 있으면 같은 span을 OTel span으로도 만들고,
+  OTEL_EXPORTER_OTLP_ENDPOINT가 설정되어 있으면 configure_tracing()이 OTLP(gRPC)로 내보냅니다.
+  설치되어 있지 않으면(백엔드 기본 환경) 지표만 기록합니다.
+- 지표는 render_metrics()가 Prometheus 텍스트 형식으로 출력합니다 (백엔드 /api/metrics/).
+  기록은 프로세스 메모리의 dict에만 더하므로 span마다 디스크 쓰기가 없습니다 (DB 쿼리마다 span이 있음).
+  TELEMETRY_METRICS_PATH를 설정하면 백그라운드 스레드가 TELEMETRY_FLUSH_INTERVAL초마다(그리고 종료 시)
+  모아 둔 증가분을 SQLite 파일에 한 번에 더하므로 Django, job_runner 워커, bulk_generate 등
+  여러 프로세스의 지표가 한 엔드포인트에 모입니다. 설정하지 않으면 프로세스 안에서만 집계합니다.
+- 파일에 쓰지 못해도(파일 잠금 등) 파이프라인은 멈추지 않고 경고만 남기며, 증가분은 다음 번에 다시 씁니다.
+
+span 속성 이름은 OpenTelemetry GenAI 규약을 따릅니다 (gen_ai.request.model, gen_ai.usage.input_tokens 등).
+langchain 체인/도구/LLM 호출의 span은 langchain_tracing.py가 만듭니다.
+
+표준 라이브러리만 사용하므로(OpenTelemetry는 있으면 사용) 백엔드에서도 파일 경로로 불러 씁니다
+(backend/script_editor/scripts/telemetry.py 참고).
+
+사용법:
+    with span("faiss.search", index="question", k=5) as s:
+        ...
+        s.set_attribute("faiss.results", len(rows))
+
+    @traced("correction.rewrite")
+    async def correct_sentence_with_llm(...): ...
+"""
+
+import bisect
+import contextlib
+import contextvars
+import functools
+import atexit
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # 백엔드 환경에는 OpenTelemetry가 없을 수 있음
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+# 설정하면 여러 프로세스가 이 파일에 지표를 누적 (기본값: 프로세스 안에서만 집계)
+TELEMETRY_METRICS_PATH = os.getenv("TELEMETRY_METRICS_PATH", "")
+# 메모리에 모은 지표를 TELEMETRY_METRICS_PATH에 쓰는 주기(초)
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "10"))
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+
+# 히스토그램 구간(초). FAISS 검색·DB 쿼리(수 ms)와 LLM 호출(수~수십 초)을 한 히스토그램에 담음
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+STAGE_DURATION = "stage_duration_seconds"
+LLM_TOKENS = "llm_tokens_total"
+CACHE_LOOKUPS = "cache_lookups_total"
+
+# 지표 이름 → (Prometheus 형식, 설명)
+METRICS = {
+    STAGE_DURATION: ("histogram", "단계별 소요 시간 (초)"),
+    LLM_TOKENS: ("counter", "LLM 호출 토큰 수 (캐시에서 찾은 응답 제외)"),
+    CACHE_LOOKUPS: ("counter", "캐시 조회 수 (LLM 응답, 임베딩)"),
+}
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+# set_tracer_provider() 전에 만들어도 설정된 provider로 span을 만듦 (ProxyTracer)
+_tracer = otel_trace.get_tracer("suneung_grammer") if otel_trace is not None else None
+
+
+def _format_number(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsStore:
+    """
+    히스토그램과 카운터를 메모리의 dict에 누적합니다 ((지표, 라벨) → {값 종류: 누적값}).
+    히스토그램은 구간별 개수와 sum, count를 저장합니다.
+
+    path가 주어지면 백그라운드 스레드가 flush_interval초마다 아직 쓰지 않은 증가분을 SQLite 파일에
+    한 트랜잭션으로 더하고, samples()/render()는 그 파일(모든 프로세스의 합계)을 읽습니다.
+    """
+
+    def __init__(self, path="", flush_interval=TELEMETRY_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = {}  # path가 있으면 아직 파일에 쓰지 않은 증가분, 없으면 전체 누적값
+        self._flush_lock = threading.Lock()
+        self._conn = None
+        self._flusher_pid = None  # fork된 자식 프로세스에서는 스레드를 다시 띄움
+        if path:
+            atexit.register(self.flush)
+
+    def _add(self, name, labels, values):
+        key = (name, json.dumps(labels, sort_keys=True, ensure_ascii=False))
+        with self._lock:
+            series = self._pending.setdefault(key, {})
+            for sample, value in values:
+                series[sample] = series.get(sample, 0) + value
+        if self.path and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def observe(self, name, value, **labels):
+        """히스토그램 name에 value(초)를 기록합니다."""
+        position = bisect.bisect_left(LATENCY_BUCKETS, value)
+        bucket = repr(LATENCY_BUCKETS[position]) if position < len(LATENCY_BUCKETS) else "+Inf"
+        self._add(name, labels, [(f"bucket:{bucket}", 1), ("sum", value), ("count", 1)])
+
+    def increment(self, name, value=1, **labels):
+        """카운터 name을 value만큼 늘립니다."""
+        if value:
+            self._add(name, labels, [("", value)])
+
+    def _start_flusher(self):
+        with self._flush_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._conn = None  # 부모 프로세스의 연결은 쓰지 않음
+        threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS metrics (
+                    name TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    sample TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (name, labels, sample)
+                )"""
+            )
+            self._conn = conn
+        return self._conn
+
+    def flush(self):
+        """모아 둔 증가분을 path의 SQLite 파일에 더합니다 (path가 없으면 아무것도 하지 않음)."""
+        if not self.path:
+            return
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            rows = [
+                (name, labels, sample, value)
+                for (name, labels), series in pending.items()
+                for sample, value in series.items()
+            ]
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO metrics (name, labels, sample, value) VALUES (?, ?, ?, ?)"
+                        " ON CONFLICT (name, labels, sample) DO UPDATE SET value = value + excluded.value",
+                        rows,
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                logger.warning("지표 기록 실패: %s", e)
+                # 다음 번에 다시 쓰도록 되돌려 둠
+                with self._lock:
+                    for key, series in pending.items():
+                        current = self._pending.setdefault(key, {})
+                        for sample, value in series.items():
+                            current[sample] = current.get(sample, 0) + value
+
+    def samples(self):
+        """{지표 이름: {라벨 JSON: {값 종류: 누적값}}}"""
+        if self.path:
+            self.flush()  # 이 프로세스의 최근 값까지 포함
+            with self._flush_lock:
+                rows = self._connect().execute(
+                    "SELECT name, labels, sample, value FROM metrics ORDER BY name, labels"
+                ).fetchall()
+        else:
+            with self._lock:
+                rows = [
+                    (name, labels, sample, value)
+                    for (name, labels), series in sorted(self._pending.items())
+                    for sample, value in series.items()
+                ]
+        series = {}
+        for name, labels, sample, value in rows:
+            series.setdefault(name, {}).setdefault(labels, {})[sample] = value
+        return series
+
+    def render(self):
+        """누적한 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+        lines = []
+        for name, by_labels in self.samples().items():
+            kind, description = METRICS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, values in by_labels.items():
+                labels = json.loads(key)
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {_format_number(values[''])}")
+                    continue
+                cumulative = 0
+                for bound in LATENCY_BUCKETS:
+                    cumulative += values.get(f"bucket:{bound!r}", 0)
+                    bucket_labels = _format_labels({**labels, "le": repr(bound)})
+                    lines.append(f"{name}_bucket{bucket_labels} {_format_number(cumulative)}")
+                bucket_labels = _format_labels({**labels, "le": "+Inf"})
+                lines.append(f"{name}_bucket{bucket_labels} {_format_number(values['count'])}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {repr(values['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {_format_number(values['count'])}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._flush_lock, self._lock:
+            self._pending = {}
+            if self.path:
+                self._connect().execute("DELETE FROM metrics")
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """프로세스 공유 지표 저장소 (TELEMETRY_METRICS_PATH가 있으면 그 파일)"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsStore(TELEMETRY_METRICS_PATH)
+    return _metrics
+
+
+def render_metrics():
+    return get_metrics().render()
+
+
+def count_cache_lookups(cache, hits=0, misses=0):
+    """cache("llm", "embedding" 등)의 적중/실패 수를 기록합니다."""
+    metrics = get_metrics()
+    metrics.increment(CACHE_LOOKUPS, hits, cache=cache, result="hit")
+    metrics.increment(CACHE_LOOKUPS, misses, cache=cache, result="miss")
+
+
+class Span:
+    """진행 중인 단계 하나. end()에서 OTel span을 닫고 소요 시간을 히스토그램에 기록합니다."""
+
+    def __init__(self, name, parent=None, stage=None, record=True, attributes=None):
+        self.name = name
+        self.stage = stage or name
+        self.record = record  # False이면 trace에만 남기고 히스토그램에는 기록하지 않음
+        self.parent = parent
+        self.attributes = {}
+        self.duration = None
+        self._otel = None
+        if otel_trace is not None:
+            context = None  # None이면 OTel의 현재 context(다른 계측 도구의 span 포함)를 부모로 사용
+            if parent is not None and parent._otel is not None:
+                context = otel_trace.set_span_in_context(parent._otel)
+            self._otel = _tracer.start_span(name, context=context)
+        self._start = time.perf_counter()
+        self.set_attributes(attributes or {})
+
+    def set_attribute(self, key, value):
+        if value is None:
+            return
+        self.attributes[key] = value
+        if self._otel is not None:
+            if not isinstance(value, (bool, int, float, str)):
+                value = str(value)
+            self._otel.set_attribute(key, value)
+
+    def set_attributes(self, attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def end(self, error=None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._start
+        if self._otel is not None:
+            if error is not None:
+                self._otel.record_exception(error)
+                self._otel.set_status(
+                    Status(StatusCode.ERROR, f"{error.__class__.__name__}: {error}")
+                )
+            self._otel.end()
+        if self.record:
+            get_metrics().observe(
+                STAGE_DURATION,
+                self.duration,
+                stage=self.stage,
+                status="ok" if error is None else "error",
+            )
+
+
+def current_span():
+    return _current_span.get()
+
+
+def start_span(name, parent=None, stage=None, record=True, **attributes):
+    """
+    span을 시작만 하고 반환합니다 (끝낼 때 end() 호출). 콜백처럼 시작과 끝이 다른 함수에 있는 경우에 씁니다.
+    parent를 주지 않으면 지금 진행 중인 span(with span(...))의 자식이 됩니다.
+    """
+    return Span(name, parent or _current_span.get(), stage, record, attributes)
+
+
+@contextlib.contextmanager
+def span(name, stage=None, record=True, **attributes):
+    """with 블록을 span 하나로 기록합니다. 블록에서 예외가 나면 status="error"로 기록하고 다시 던집니다."""
+    current = start_span(name, stage=stage, record=record, **attributes)
+    token = _current_span.set(current)
+    try:
+        if current._otel is not None:
+            # httpx 등 다른 OTel 계측 도구의 span도 이 span 아래에 달리도록 OTel 현재 span으로 지정
+            with otel_trace.use_span(
+                current._otel,
+                end_on_exit=False,
+                record_exception=False,
+                set_status_on_exception=False,
+            ):
+                yield current
+        else:
+            yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    else:
+        current.end()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name, stage=None, **attributes):
+    """함수(동기/async) 호출 하나를 span 하나로 기록하는 데코레이터"""
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, stage, **attributes):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name, stage, **attributes):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_llm_call(target, model, prompt_tokens=None, completion_tokens=None, cache_hit=False):
+    """
+    LLM 호출 span에 모델 이름, 토큰 수, 캐시 적중 여부를 기록하고 토큰 수를 지표에 더합니다.
+    캐시에서 찾은 응답은 토큰을 쓰지 않았으므로 llm_tokens_total에 더하지 않습니다.
+    """
+    target.set_attributes(
+        {
+            "gen_ai.request.model": model,
+            "gen_ai.usage.input_tokens": prompt_tokens,
+            "gen_ai.usage.output_tokens": completion_tokens,
+            "llm.cache_hit": bool(cache_hit),
+        }
+    )
+    if cache_hit:
+        return
+    metrics = get_metrics()
+    metrics.increment(LLM_TOKENS, prompt_tokens or 0, model=model, type="prompt")
+    metrics.increment(LLM_TOKENS, completion_tokens or 0, model=model, type="completion")
+
+
+_tracing_configured = False
+
+
+def configure_tracing(service_name):
+    """
+    OTEL_EXPORTER_OTLP_ENDPOINT가 설정되어 있고 OpenTelemetry SDK와 OTLP exporter가 설치되어 있으면
+    이 프로세스의 span을 OTLP(gRPC)로 내보냅니다. 여러 번 호출해도 한 번만 설정하며, 설정했으면 True.
+    서비스 이름은 OTEL_SERVICE_NAME이 있으면 그 값을 사용합니다.
+    """
+    global _tracing_configured
+    if _tracing_configured or otel_trace is None or not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return _tracing_configured
+    try:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OpenTelemetry SDK가 없어 span을 내보내지 않습니다.")
+        return False
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", service_name)})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    otel_trace.set_tracer_provider(provider)
+    _tracing_configured = True
+    return True